@@ -1,14 +1,32 @@
 """Cart API endpoints."""
 
-from typing import Annotated, List, Union
+from typing import Annotated, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request
 from starlette import status
 
-from app.api.v1.dependencies import UOWDependency, current_user
+from app.api.v1.dependencies import (
+    ReadOnlyUOWDependency,
+    UOWDependency,
+    current_user,
+)
 from app.models import User
-from app.schemas.cart import CartCreate, CartUpdate
+from app.schemas.cart import (
+    CartCreate,
+    CartItemOutcome,
+    CartItemUpdates,
+    CartProductIds,
+    CartUpdate,
+)
 from app.services.cart import CartService
+from app.settings import config
+from app.utils.conditional import (
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from app.utils.serialization import RawJSONResponse
 
 router = APIRouter(
     prefix="/cart",
@@ -21,6 +39,7 @@ async def add_product_to_cart(
     user: Annotated[User, Depends(current_user)],
     product: Union[CartCreate, List[CartCreate]],
     uow: UOWDependency,
+    increment: bool = False,
 ) -> Union[int, List[int]]:
     """Add one or multiple products to the user's cart.
 
@@ -29,40 +48,115 @@ async def add_product_to_cart(
         product (Union[CartCreate, List[CartCreate]]): The product(s)
             to be added to the cart.
         uow (UOWDependency): Unit of Work dependency.
+        increment (bool): Increment the quantity of products already
+            in the cart instead of rejecting them.
 
     Returns:
         Union[int, List[int]]: The ID(s) of the added product(s) in the cart.
     """
-    return await CartService().add(uow, product, user)
+    return await CartService().add(uow, product, user, increment)
+
+
+@router.patch("/", status_code=status.HTTP_200_OK)
+async def update_product_quantities(
+    uow: UOWDependency,
+    items: Annotated[
+        CartItemUpdates,
+        Body(min_length=1, max_length=config.CART_BATCH_MAX_ITEMS),
+    ],
+    user: Annotated[User, Depends(current_user)],
+) -> List[CartItemOutcome]:
+    """Update the quantities of many products in the user's cart.
+
+    A body naming a product twice is rejected with 422.
+
+    Args:
+        uow (UOWDependency): Unit of Work dependency.
+        items (List[CartItemUpdate]): The products and their new
+            quantities.
+        user (User): The authenticated user.
+
+    Returns:
+        List[CartItemOutcome]: Whether each product was updated or not
+            found in the cart.
+    """
+    return await CartService().update_many(uow, items, user)
+
+
+@router.delete("/", status_code=status.HTTP_200_OK)
+async def remove_products_from_cart(
+    uow: UOWDependency,
+    user: Annotated[User, Depends(current_user)],
+    # A default, so that a missing list fails min_length with a 422
+    product_ids: Annotated[
+        CartProductIds,
+        Query(min_length=1, max_length=config.CART_BATCH_MAX_ITEMS),
+    ] = [],
+) -> List[CartItemOutcome]:
+    """Remove many products from the user's cart.
+
+    A query naming a product twice is rejected with 422.
+
+    Args:
+        uow (UOWDependency): Unit of Work dependency.
+        user (User): The authenticated user.
+        product_ids (List[int]): IDs of the products to remove.
+
+    Returns:
+        List[CartItemOutcome]: Whether each product was deleted or not
+            found in the cart.
+    """
+    return await CartService().delete_many(uow, product_ids, user)
 
 
 @router.get("/get_all/", status_code=status.HTTP_200_OK)
 async def get_all_products_from_cart(
-    uow: UOWDependency,
+    request: Request,
+    uow: ReadOnlyUOWDependency,
     user: Annotated[User, Depends(current_user)],
+    expand: Optional[Literal["product"]] = None,
 ):
     """Get all products from the user's cart.
 
+    The plain list carries an ETag and a Last-Modified derived from the
+    cart summary; conditional requests are answered with 304 after a
+    primary key lookup.
+
     Args:
-        uow (UOWDependency): Unit of Work dependency.
+        request (Request): The request.
+        uow (ReadOnlyUOWDependency): Unit of Work dependency.
         user (User): The authenticated user.
+        expand (Optional[str]): ``product`` to embed the products and
+            the total price of the cart in the response.
 
     Returns:
-        List: List of products in the user's cart.
+        Union[List, CartExpanded]: List of products in the user's cart,
+            or the expanded cart.
     """
-    return await CartService().get_all(uow, user)
+    if expand == "product":
+        return await CartService().get_all_expanded(uow, user)
+
+    last_modified, *counts = await CartService().get_version(uow, user)
+    etag = make_etag(user.id, last_modified, *counts)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    return set_validators(
+        RawJSONResponse(await CartService().get_all(uow, user)),
+        etag,
+        last_modified,
+    )
 
 
 @router.get("/{product_id}", status_code=status.HTTP_200_OK)
 async def get_one_product_from_cart(
-    uow: UOWDependency,
+    uow: ReadOnlyUOWDependency,
     product_id: int,
     user: Annotated[User, Depends(current_user)],
 ):
     """Get details of a specific product in the user's cart.
 
     Args:
-        uow (UOWDependency): Unit of Work dependency.
+        uow (ReadOnlyUOWDependency): Unit of Work dependency.
         product_id (int): ID of the product to retrieve.
         user (User): The authenticated user.
 
@@ -132,13 +226,13 @@ async def clear_cart(
 @router.get("/total_price/", status_code=status.HTTP_200_OK)
 async def get_total_cart_price(
     user: Annotated[User, Depends(current_user)],
-    uow: UOWDependency,
+    uow: ReadOnlyUOWDependency,
 ) -> float:
     """Get the total price of all products in the user's cart.
 
     Args:
         user (User): The authenticated user.
-        uow (UOWDependency): Unit of Work dependency.
+        uow (ReadOnlyUOWDependency): Unit of Work dependency.
 
     Returns:
         float: The total price of all products in the cart.
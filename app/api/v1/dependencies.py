@@ -3,10 +3,82 @@
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.auth import fastapi_users
+from app.db import get_async_session
+from app.db.db import replica_router
+from app.models import User
 from app.utils.unitofwork import IUnitOfWork, UnitOfWork
 
-UOWDependency = Annotated[IUnitOfWork, Depends(UnitOfWork)]
-
 current_user = fastapi_users.current_user()
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+
+def get_unit_of_work(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    user: Annotated[User, Depends(current_user)],
+) -> IUnitOfWork:
+    """Get a unit of work sharing the session of the request.
+
+    FastAPI resolves ``get_async_session`` once per request, so the
+    user database of the authentication and the unit of work use the
+    same session and hold at most one pooled connection. Commits pin
+    the reads of the user to the primary.
+
+    Args:
+        session (AsyncSession): The session of the request.
+        user (User): The authenticated user.
+
+    Returns:
+        IUnitOfWork: The unit of work.
+    """
+    return UnitOfWork(session=session, pin_key=user.id)
+
+
+async def get_read_only_unit_of_work(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    user: Annotated[User, Depends(current_user)],
+) -> IUnitOfWork:
+    """Get a unit of work for reads, on a replica when possible.
+
+    When the reads of the user go to the primary, the session of the
+    request is shared as for ``get_unit_of_work``.
+
+    Args:
+        session (AsyncSession): The session of the request.
+        user (User): The authenticated user.
+
+    Returns:
+        IUnitOfWork: The unit of work.
+    """
+    engine = await replica_router.read_engine(user.id)
+    if engine is replica_router.primary:
+        return UnitOfWork(session=session)
+    return UnitOfWork(bind=engine)
+
+
+async def get_streaming_unit_of_work(
+    user: Annotated[User, Depends(current_user)],
+) -> IUnitOfWork:
+    """Get a unit of work for streamed reads, owning its session.
+
+    Streamed bodies are sent after the request dependencies are
+    closed, so the session of the request cannot be shared.
+
+    Args:
+        user (User): The authenticated user.
+
+    Returns:
+        IUnitOfWork: The unit of work.
+    """
+    return UnitOfWork(bind=await replica_router.read_engine(user.id))
+
+
+UOWDependency = Annotated[IUnitOfWork, Depends(get_unit_of_work)]
+ReadOnlyUOWDependency = Annotated[
+    IUnitOfWork, Depends(get_read_only_unit_of_work)
+]
+StreamingUOWDependency = Annotated[
+    IUnitOfWork, Depends(get_streaming_unit_of_work)
+]
@@ -0,0 +1,34 @@
+"""Monitoring endpoints, restricted to superusers."""
+
+from fastapi import APIRouter, Depends
+from starlette import status
+
+from app.api.v1.dependencies import current_superuser
+from app.db.db import engine, get_pool_stats
+from app.repositories.products import product_cache
+
+router = APIRouter(
+    prefix="/monitoring",
+    tags=["Monitoring"],
+    dependencies=[Depends(current_superuser)],
+)
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+async def get_cache_stats() -> dict:
+    """Get the hit and miss counters of the caches.
+
+    Returns:
+        dict: The counters of each cache.
+    """
+    return {"products": product_cache.stats()}
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def get_database_pool_stats() -> dict:
+    """Get the connection pool counters of this worker process.
+
+    Returns:
+        dict: The pool usage and checkout wait counters.
+    """
+    return get_pool_stats(engine)
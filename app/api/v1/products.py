@@ -1,14 +1,35 @@
 """API endpoints for products."""
 
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from starlette import status
 
-from app.api.v1.dependencies import UOWDependency, current_user
+from app.api.v1.dependencies import (
+    ReadOnlyUOWDependency,
+    StreamingUOWDependency,
+    UOWDependency,
+    current_user,
+)
 from app.models import User
-from app.schemas.products import ProductsCreate, ProductsUpdate
+from app.schemas.products import (
+    ProductFilter,
+    ProductImportResult,
+    ProductPage,
+    ProductsCreate,
+    ProductsUpdate,
+)
 from app.services.products import ProductsService
+from app.settings import config
+from app.utils.conditional import (
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from app.utils.exports import EXPORT_MEDIA_TYPES
+from app.utils.serialization import RawJSONResponse
 
 router = APIRouter(
     prefix="/products",
@@ -35,40 +56,209 @@ async def add_product(
     return await ProductsService().add(uow, product, user)
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def get_products(
+@router.post(
+    "/import",
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_products(
+    request: Request,
     uow: UOWDependency,
     user: Annotated[User, Depends(current_user)],
-):
-    """Get all products.
+) -> ProductImportResult:
+    """Import products from a CSV or NDJSON upload.
+
+    CSV uploads start with a ``name,description,price`` header row;
+    NDJSON uploads hold one product object per line. The body is
+    processed as it is received.
 
     Args:
+        request (Request): The request streaming the upload.
         uow (UOWDependency): Unit of Work dependency.
         user (User): The authenticated user.
 
     Returns:
-        List: List of products.
+        ProductImportResult: The number of imported and rejected rows
+            and the first errors.
+    """
+    return await ProductsService().import_products(
+        uow,
+        user,
+        request.stream(),
+        request.headers.get("content-type", ""),
+    )
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=ProductPage)
+async def get_products(
+    request: Request,
+    uow: ReadOnlyUOWDependency,
+    user: Annotated[User, Depends(current_user)],
+    filters: Annotated[ProductFilter, Depends()],
+    limit: Annotated[
+        int, Query(ge=1, le=config.PRODUCTS_MAX_PAGE_SIZE)
+    ] = config.PRODUCTS_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Response:
+    """Get a filtered and sorted page of products.
+
+    The response carries an ETag derived from the version of the
+    catalogue and the query string; ``If-None-Match`` is answered with
+    304 after a single aggregate query. There is no Last-Modified, as
+    the latest ``updated_at`` does not change when a product is
+    deleted.
+
+    Args:
+        request (Request): The request.
+        uow (ReadOnlyUOWDependency): Unit of Work dependency.
+        user (User): The authenticated user.
+        filters (ProductFilter): The filters and order, read from the
+            query string.
+        limit (int): The maximum number of products to return.
+        after (Optional[str]): The ``next_cursor`` of the previous page.
+
+    Returns:
+        Response: The ``ProductPage`` of the products and the cursor of
+            the next page.
+    """
+    version = await ProductsService().get_version(uow, user)
+    etag = make_etag(user.id, *version, str(request.query_params))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return set_validators(
+        RawJSONResponse(
+            await ProductsService().get_page(uow, user, limit, after, filters)
+        ),
+        etag,
+    )
+
+
+@router.get(
+    "/search", status_code=status.HTTP_200_OK, response_model=ProductPage
+)
+async def search_products(
+    uow: ReadOnlyUOWDependency,
+    user: Annotated[User, Depends(current_user)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[
+        int, Query(ge=1, le=config.PRODUCTS_MAX_PAGE_SIZE)
+    ] = config.PRODUCTS_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> Response:
+    """Search products by name and description.
+
+    Words are matched by prefix, so the endpoint can back
+    autocompletion. The best matches come first.
+
+    Args:
+        uow (ReadOnlyUOWDependency): Unit of Work dependency.
+        user (User): The authenticated user.
+        q (str): The search text.
+        limit (int): The maximum number of products to return.
+        after (Optional[str]): The ``next_cursor`` of the previous page.
+
+    Returns:
+        Response: The ``ProductPage`` of the products and the cursor of
+            the next page.
+    """
+    return RawJSONResponse(
+        await ProductsService().search(uow, user, q, limit, after)
+    )
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK)
+async def stream_products(
+    uow: StreamingUOWDependency,
+    user: Annotated[User, Depends(current_user)],
+) -> StreamingResponse:
+    """Stream all products as newline-delimited JSON.
+
+    Args:
+        uow (StreamingUOWDependency): Unit of Work dependency.
+        user (User): The authenticated user.
+
+    Returns:
+        StreamingResponse: One product per line.
+    """
+    return StreamingResponse(
+        ProductsService().stream_all(uow, user),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_products(
+    uow: StreamingUOWDependency,
+    user: Annotated[User, Depends(current_user)],
+    export_format: Annotated[
+        Literal["csv", "ndjson", "parquet"], Query(alias="format")
+    ] = "csv",
+) -> StreamingResponse:
+    """Export all products as a CSV, NDJSON or Parquet file.
+
+    Args:
+        uow (StreamingUOWDependency): Unit of Work dependency.
+        user (User): The authenticated user.
+        export_format (str): The file format.
+
+    Returns:
+        StreamingResponse: The file, sent as it is encoded.
     """
-    return await ProductsService().get_all(uow, user)
+    return StreamingResponse(
+        ProductsService().export(uow, user, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="products.{export_format}"'
+            )
+        },
+    )
 
 
 @router.get("/{product_id}", status_code=status.HTTP_200_OK)
 async def get_product(
     product_id: int,
+    request: Request,
+    response: Response,
     uow: UOWDependency,
     user: Annotated[User, Depends(current_user)],
 ):
     """Get details of a specific product.
 
+    The response carries an ETag and a Last-Modified derived from the
+    product's ``updated_at``. It is read from the primary by primary
+    key, not from the product cache, so conditional requests are
+    answered with 304 only for the current version.
+
     Args:
         product_id (int): ID of the product to retrieve.
+        request (Request): The request.
+        response (Response): The response, to set the validators.
         uow (UOWDependency): Unit of Work dependency.
         user (User): The authenticated user.
 
     Returns:
         dict: Details of the requested product.
     """
-    return await ProductsService().get(uow, product_id, user)
+    updated_at = await ProductsService().get_updated_at(uow, product_id, user)
+    etag = make_etag(product_id, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    product = await ProductsService().get(uow, product_id, user, updated_at)
+    set_validators(
+        response,
+        make_etag(product.id, product.updated_at),
+        product.updated_at,
+    )
+    return product
 
 
 @router.patch("/{product_id}", status_code=status.HTTP_200_OK)
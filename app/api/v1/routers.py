@@ -1,9 +1,11 @@
 """Authentication routes for the FastAPI application."""
 
 from app.api.v1.cart import router as cart_router
+from app.api.v1.monitoring import router as monitoring_router
 from app.api.v1.products import router as product_router
 
 all_routers = [
     product_router,
     cart_router,
+    monitoring_router,
 ]
@@ -0,0 +1,75 @@
+"""Check the cart summaries and rebuild them from the cart lines.
+
+Usage:
+    python -m app.commands.cart_summary check
+    python -m app.commands.cart_summary rebuild [--owner-id ID ...]
+
+``check`` exits with status 1 when a summary does not match the cart.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.utils.unitofwork import UnitOfWork
+
+
+async def check() -> int:
+    """Report the owners whose cart summary is inconsistent.
+
+    Returns:
+        int: The exit status, 1 if an inconsistency was found.
+    """
+    uow = UnitOfWork()
+    async with uow:
+        owner_ids = await uow.cart_summary.find_inconsistent()
+    for owner_id in owner_ids:
+        print(f"Inconsistent cart summary for owner {owner_id}")  # noqa: T201
+    print(f"{len(owner_ids)} inconsistent cart summaries")  # noqa: T201
+    return 1 if owner_ids else 0
+
+
+async def rebuild(owner_ids) -> int:
+    """Rebuild the cart summaries.
+
+    Args:
+        owner_ids: The owners to rebuild; all owners when empty.
+
+    Returns:
+        int: The exit status.
+    """
+    uow = UnitOfWork()
+    async with uow:
+        count = await uow.cart_summary.rebuild(owner_ids)
+        await uow.commit()
+    print(f"{count} cart summaries rebuilt")  # noqa: T201
+    return 0
+
+
+def main(argv=None) -> int:
+    """Run the command.
+
+    Args:
+        argv: The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("check", help="Find inconsistent summaries")
+    rebuild_parser = commands.add_parser(
+        "rebuild", help="Recompute summaries from the cart lines"
+    )
+    rebuild_parser.add_argument(
+        "--owner-id", type=int, action="append", dest="owner_ids"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        return asyncio.run(check())
+    return asyncio.run(rebuild(args.owner_ids))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
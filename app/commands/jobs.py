@@ -0,0 +1,128 @@
+"""Run the background job workers outside the application.
+
+Usage:
+    python -m app.commands.jobs run [--queue NAME[:CONCURRENCY] ...]
+    python -m app.commands.jobs run --once
+    python -m app.commands.jobs requeue-failed [--queue NAME]
+
+``run`` takes the queues of ``JOBS_QUEUES`` unless ``--queue`` is given,
+until interrupted; with ``--once`` it exits when the queues are empty.
+Set ``JOBS_WORKER_ENABLED=False`` on the application when its jobs are
+run by this command only.
+"""
+
+import argparse
+import asyncio
+import importlib
+import signal
+import sys
+
+from app.utils.jobs import JobWorker, job_worker, parse_queues
+from app.utils.unitofwork import UnitOfWork
+
+# Modules registering job handlers when imported
+JOB_MODULES = ("app.services.repricing",)
+
+
+def make_worker(queues) -> JobWorker:
+    """Build a worker for some queues, with the configured settings.
+
+    Args:
+        queues: The ``NAME[:CONCURRENCY]`` of the queues; the
+            configured queues when empty.
+
+    Returns:
+        JobWorker: The worker.
+    """
+    if not queues:
+        return job_worker
+    return JobWorker(
+        job_worker.registry,
+        parse_queues(",".join(queues)),
+        poll_interval=job_worker.poll_interval,
+        lease_seconds=job_worker.lease_seconds,
+        retry_base_delay=job_worker.retry_base_delay,
+        retry_max_delay=job_worker.retry_max_delay,
+        shutdown_timeout=job_worker.shutdown_timeout,
+        bind=job_worker.bind,
+    )
+
+
+async def run(worker: JobWorker, once: bool) -> int:
+    """Run the jobs until interrupted, or until the queues are empty.
+
+    Args:
+        worker (JobWorker): The worker.
+        once (bool): Exit when the queues are empty.
+
+    Returns:
+        int: The exit status.
+    """
+    if once:
+        for queue in worker.concurrency:
+            count = await worker.run_pending(queue)
+            print(f"{count} jobs run from queue {queue}")  # noqa: T201
+        return 1 if worker.failed else 0
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+    await worker.start()
+    try:
+        await stopping.wait()
+    finally:
+        await worker.stop()
+    return 0
+
+
+async def requeue_failed(queue) -> int:
+    """Queue the failed jobs again.
+
+    Args:
+        queue: The queue of the jobs; all queues when None.
+
+    Returns:
+        int: The exit status.
+    """
+    uow = UnitOfWork()
+    async with uow:
+        count = await uow.jobs.requeue_failed(queue)
+        await uow.commit()
+    print(f"{count} failed jobs queued again")  # noqa: T201
+    return 0
+
+
+def main(argv=None) -> int:
+    """Run the command.
+
+    Args:
+        argv: The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the job workers")
+    run_parser.add_argument(
+        "--queue", action="append", dest="queues", metavar="NAME[:N]"
+    )
+    run_parser.add_argument(
+        "--once", action="store_true", help="Exit when the queues are empty"
+    )
+    requeue_parser = commands.add_parser(
+        "requeue-failed", help="Retry the jobs that failed for good"
+    )
+    requeue_parser.add_argument("--queue")
+    args = parser.parse_args(argv)
+
+    if args.command == "requeue-failed":
+        return asyncio.run(requeue_failed(args.queue))
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    return asyncio.run(run(make_worker(args.queues), args.once))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,127 @@
 """Database module."""
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.db.replicas import ReplicaRouter
 from app.settings import config
+from app.utils.cache import LRUCache
+from app.utils.instrumentation import record_pool_wait
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool recording how long checkouts wait.
+
+    Attributes:
+        checkouts (int): The number of connections handed out.
+        wait_time (float): The total seconds spent waiting for a
+            connection.
+        max_wait_time (float): The longest wait for a connection.
+        timeouts (int): The number of checkouts that timed out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+            record_pool_wait(waited)
+        self.checkouts += 1
+        return connection
+
+
+def get_engine_options(settings) -> dict:
+    """Get the engine and pool options from a configuration class.
+
+    Args:
+        settings: The configuration class.
 
-engine = create_async_engine(config.DATABASE_URI)
+    Returns:
+        dict: Keyword arguments for ``create_async_engine``.
+    """
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DATABASE_DRIVER == "postgresql+asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": settings.DB_SERVER_SETTINGS,
+        }
+    return options
+
+
+def get_pool_stats(database_engine: AsyncEngine) -> dict:
+    """Get the usage counters of the connection pool of an engine.
+
+    Args:
+        database_engine (AsyncEngine): The engine to inspect.
+
+    Returns:
+        dict: The pool size, the checked in, checked out and overflow
+            connections, and the wait counters when available.
+    """
+    pool = database_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_time=pool.wait_time,
+            max_wait_time=pool.max_wait_time,
+        )
+    return stats
+
+
+engine = create_async_engine(config.DATABASE_URI, **get_engine_options(config))
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+replica_engines = [
+    create_async_engine(uri, **get_engine_options(config))
+    for uri in config.DATABASE_REPLICA_URIS
+]
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    pins=LRUCache(
+        maxsize=config.DB_READ_YOUR_WRITES_MAXSIZE,
+        ttl=config.DB_READ_YOUR_WRITES_SECONDS,
+    ),
+    selection=config.DB_REPLICA_SELECTION,
+    max_lag=config.DB_REPLICA_MAX_LAG,
+    lag_check_interval=config.DB_REPLICA_LAG_CHECK_INTERVAL,
+)
+
 Base = declarative_base()
 
 
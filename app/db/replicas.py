@@ -0,0 +1,183 @@
+"""Routing of read-only units of work to read replicas."""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.cache import AbstractCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the replica
+# has replayed everything it received. A server that is not a standby
+# reports 0, so a second local database can stand in for a replica.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0"
+    ") END"
+)
+
+
+class ReplicaRouter:
+    """Choose the engine of read-only units of work.
+
+    Reads go to a replica unless the caller wrote recently, in which
+    case they are pinned to the primary so they see their own writes.
+    Replicas lagging more than ``max_lag`` seconds, or failing the lag
+    check, are skipped; with no usable replica, reads go to the
+    primary.
+
+    Args:
+        primary (AsyncEngine): The engine of the primary.
+        replicas (Sequence[AsyncEngine]): The engines of the replicas.
+        pins (AbstractCache): The keys pinned to the primary. Its time
+            to live is the read-your-writes window.
+        selection (str): ``"round_robin"`` or ``"least_connections"``,
+            the replica with the fewest checked out connections.
+        max_lag (float): The replication lag, in seconds, above which
+            a replica is skipped.
+        lag_check_interval (float): The number of seconds the lag of a
+            replica is reused before being checked again.
+
+    Attributes:
+        primary_reads (int): The reads routed to the primary.
+        pinned_reads (int): The reads pinned to the primary after a
+            write.
+        replica_reads (int): The reads routed to a replica.
+        lagging_fallbacks (int): The reads sent to the primary as no
+            replica was within the lag guard.
+    """
+
+    SELECTIONS = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        pins: AbstractCache,
+        selection: str = "round_robin",
+        max_lag: float = 1.0,
+        lag_check_interval: float = 5.0,
+    ):
+        if selection not in self.SELECTIONS:
+            raise ValueError(f"Unknown replica selection: {selection}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.pins = pins
+        self.selection = selection
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.replica_reads = 0
+        self.lagging_fallbacks = 0
+        self._turn = itertools.count()
+        self._lags: Dict[AsyncEngine, Tuple[float, float]] = {}
+
+    async def pin(self, key: Hashable) -> None:
+        """Send the reads of a key to the primary for a while.
+
+        Args:
+            key (Hashable): What identifies the writer, e.g. a user ID.
+        """
+        if self.replicas:
+            await self.pins.set(str(key), True)
+
+    async def is_pinned(self, key: Hashable) -> bool:
+        """Check whether the reads of a key go to the primary.
+
+        Args:
+            key (Hashable): What identifies the writer.
+
+        Returns:
+            bool: True if the key wrote within the read-your-writes
+                window.
+        """
+        return await self.pins.get(str(key)) is not None
+
+    async def lag(self, replica: AsyncEngine) -> float:
+        """Get the replication lag of a replica.
+
+        The lag is checked at most once per ``lag_check_interval``;
+        concurrent callers reuse the previous value meanwhile.
+
+        Args:
+            replica (AsyncEngine): The engine of the replica.
+
+        Returns:
+            float: The lag in seconds, infinite if the replica cannot
+                be reached.
+        """
+        checked_at, lag = self._lags.get(replica, (-math.inf, math.inf))
+        now = time.monotonic()
+        if now - checked_at < self.lag_check_interval:
+            return lag
+        self._lags[replica] = (now, lag)
+        try:
+            async with replica.connect() as connection:
+                lag = float(
+                    (await connection.execute(REPLICA_LAG_QUERY)).scalar()
+                )
+        except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError):
+            logger.warning("Replica lag check failed", exc_info=True)
+            lag = math.inf
+        self._lags[replica] = (now, lag)
+        return lag
+
+    async def read_engine(self, key: Optional[Hashable] = None) -> AsyncEngine:
+        """Choose the engine of a read-only unit of work.
+
+        Args:
+            key (Optional[Hashable]): What identifies the reader, to
+                honour its pin to the primary.
+
+        Returns:
+            AsyncEngine: A replica, or the primary.
+        """
+        if not self.replicas:
+            self.primary_reads += 1
+            return self.primary
+        if key is not None and await self.is_pinned(key):
+            self.pinned_reads += 1
+            return self.primary
+
+        candidates = [
+            replica
+            for replica in self.replicas
+            if await self.lag(replica) <= self.max_lag
+        ]
+        if not candidates:
+            self.lagging_fallbacks += 1
+            return self.primary
+
+        self.replica_reads += 1
+        if self.selection == "least_connections":
+            return min(
+                candidates, key=lambda replica: replica.pool.checkedout()
+            )
+        return candidates[next(self._turn) % len(candidates)]
+
+    def stats(self) -> dict:
+        """Get the routing counters.
+
+        Returns:
+            dict: The number of replicas, the reads per destination and
+                the largest known replication lag.
+        """
+        lags = [lag for _, lag in self._lags.values()]
+        return {
+            "replicas": len(self.replicas),
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "replica_reads": self.replica_reads,
+            "lagging_fallbacks": self.lagging_fallbacks,
+            "max_lag_seconds": max(lags, default=0.0),
+        }
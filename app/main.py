@@ -5,13 +5,19 @@ import uvicorn
 from app.utils.factories import (
     create_app,
     custom_openapi,
+    setup_compression,
     setup_cors,
+    setup_instrumentation,
+    setup_jobs,
     setup_routes,
 )
 
 app = create_app()
 
 setup_cors(app)
+setup_instrumentation(app)
+setup_compression(app)
+setup_jobs(app)
 setup_routes(app)
 
 custom_openapi(app)
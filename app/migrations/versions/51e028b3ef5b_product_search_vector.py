@@ -0,0 +1,52 @@
+"""product search vector
+
+Revision ID: 51e028b3ef5b
+Revises: ac58ff4e567b
+Create Date: 2026-10-18 13:02:44.118206+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '51e028b3ef5b'
+down_revision: Union[str, None] = 'ac58ff4e567b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'product',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_product_search_vector',
+        'product',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_product_search_vector',
+        table_name='product',
+        postgresql_using='gin',
+    )
+    op.drop_column('product', 'search_vector')
@@ -0,0 +1,47 @@
+"""product listing indexes
+
+Revision ID: 5ad7a2c3b8e7
+Revises: 51e028b3ef5b
+Create Date: 2026-10-18 13:41:09.604371+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ad7a2c3b8e7'
+down_revision: Union[str, None] = '51e028b3ef5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_product_owner_id_is_active_price_id',
+        'product',
+        ['owner_id', 'is_active', 'price', 'id'],
+    )
+    op.create_index(
+        'ix_product_owner_id_price_id',
+        'product',
+        ['owner_id', 'price', 'id'],
+    )
+    op.create_index(
+        'ix_product_active_owner_id_created_at_id',
+        'product',
+        ['owner_id', 'created_at', 'id'],
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_product_active_owner_id_created_at_id', table_name='product'
+    )
+    op.drop_index('ix_product_owner_id_price_id', table_name='product')
+    op.drop_index(
+        'ix_product_owner_id_is_active_price_id', table_name='product'
+    )
@@ -0,0 +1,106 @@
+"""added cart summary
+
+Revision ID: ac58ff4e567b
+Revises: e56e450f7ae8
+Create Date: 2026-10-18 12:21:09.774310+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac58ff4e567b'
+down_revision: Union[str, None] = 'e56e450f7ae8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cart_summary',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.Float(), server_default='0', nullable=False),
+    sa.Column('item_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('line_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION cart_summary_add(
+            owner integer, price double precision, items integer, lines integer
+        ) RETURNS void AS $$
+        BEGIN
+            INSERT INTO cart_summary AS summary
+                (owner_id, total_price, item_count, line_count, updated_at)
+            VALUES (owner, price, items, lines, now())
+            ON CONFLICT (owner_id) DO UPDATE SET
+                total_price = summary.total_price + EXCLUDED.total_price,
+                item_count = summary.item_count + EXCLUDED.item_count,
+                line_count = summary.line_count + EXCLUDED.line_count,
+                updated_at = EXCLUDED.updated_at;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION cart_summary_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM cart_summary_add(
+                    NEW.owner_id, NEW.price, NEW.quantity, 1
+                );
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM cart_summary_add(
+                    OLD.owner_id, -OLD.price, -OLD.quantity, -1
+                );
+            ELSIF OLD.owner_id = NEW.owner_id THEN
+                PERFORM cart_summary_add(
+                    NEW.owner_id,
+                    NEW.price - OLD.price,
+                    NEW.quantity - OLD.quantity,
+                    0
+                );
+            ELSE
+                PERFORM cart_summary_add(
+                    OLD.owner_id, -OLD.price, -OLD.quantity, -1
+                );
+                PERFORM cart_summary_add(
+                    NEW.owner_id, NEW.price, NEW.quantity, 1
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER cart_summary_maintain
+        AFTER INSERT OR UPDATE OR DELETE ON cart
+        FOR EACH ROW EXECUTE FUNCTION cart_summary_apply()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO cart_summary
+            (owner_id, total_price, item_count, line_count, updated_at)
+        SELECT owner_id, sum(price), sum(quantity), count(*), now()
+        FROM cart
+        GROUP BY owner_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS cart_summary_maintain ON cart')
+    op.execute('DROP FUNCTION IF EXISTS cart_summary_apply()')
+    op.execute(
+        'DROP FUNCTION IF EXISTS cart_summary_add('
+        'integer, double precision, integer, integer)'
+    )
+    op.drop_table('cart_summary')
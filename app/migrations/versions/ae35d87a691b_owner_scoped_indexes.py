@@ -0,0 +1,44 @@
+"""owner scoped indexes
+
+Revision ID: ae35d87a691b
+Revises: 9aeab7183e60
+Create Date: 2026-10-18 10:12:41.318202+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ae35d87a691b'
+down_revision: Union[str, None] = '9aeab7183e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the oldest line of every duplicated (owner_id, product_id)
+    # pair, otherwise the unique constraint cannot be created
+    op.execute(
+        sa.text(
+            'DELETE FROM cart USING cart AS older '
+            'WHERE cart.owner_id = older.owner_id '
+            'AND cart.product_id = older.product_id '
+            'AND cart.id > older.id'
+        )
+    )
+    op.create_unique_constraint(
+        'uq_cart_owner_id_product_id', 'cart', ['owner_id', 'product_id']
+    )
+    op.create_index('ix_cart_owner_id_id', 'cart', ['owner_id', 'id'])
+    op.create_index('ix_product_owner_id_id', 'product', ['owner_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_owner_id_id', table_name='product')
+    op.drop_index('ix_cart_owner_id_id', table_name='cart')
+    op.drop_constraint(
+        'uq_cart_owner_id_product_id', 'cart', type_='unique'
+    )
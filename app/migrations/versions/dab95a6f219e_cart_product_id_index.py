@@ -0,0 +1,25 @@
+"""cart product id index
+
+Revision ID: dab95a6f219e
+Revises: 5ad7a2c3b8e7
+Create Date: 2026-10-18 16:12:47.318204+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dab95a6f219e'
+down_revision: Union[str, None] = '5ad7a2c3b8e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_cart_product_id_id', 'cart', ['product_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cart_product_id_id', table_name='cart')
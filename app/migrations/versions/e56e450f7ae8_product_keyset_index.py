@@ -0,0 +1,29 @@
+"""product keyset index
+
+Revision ID: e56e450f7ae8
+Revises: ae35d87a691b
+Create Date: 2026-10-18 11:04:17.502937+04:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e56e450f7ae8'
+down_revision: Union[str, None] = 'ae35d87a691b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_product_owner_id_created_at_id',
+        'product',
+        ['owner_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_owner_id_created_at_id', table_name='product')
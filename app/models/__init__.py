@@ -1,6 +1,8 @@
-__all__ = ["BaseModel", "Product", "User", "Cart"]
+__all__ = ["BaseModel", "Product", "User", "Cart", "CartSummary", "Job"]
 
 from app.models.base_model import BaseModel
 from app.models.cart import Cart
+from app.models.cart_summary import CartSummary
+from app.models.jobs import Job
 from app.models.products import Product
 from app.models.users import User
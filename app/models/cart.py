@@ -1,11 +1,20 @@
 """Database model representing a shopping cart."""
 
-from sqlalchemy import Boolean, Float, ForeignKey, Integer
+from sqlalchemy import (
+    Boolean,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models import BaseModel
 from app.schemas.cart import CartRead
 
+CART_PRODUCT_UNIQUE_CONSTRAINT = "uq_cart_owner_id_product_id"
+
 
 class Cart(BaseModel):
     """Database model representing a shopping cart.
@@ -25,6 +34,14 @@ class Cart(BaseModel):
     """
 
     __tablename__ = "cart"
+    __table_args__ = (
+        UniqueConstraint(
+            "owner_id", "product_id", name=CART_PRODUCT_UNIQUE_CONSTRAINT
+        ),
+        Index("ix_cart_owner_id_id", "owner_id", "id"),
+        # Finds the lines of a product when its price changes
+        Index("ix_cart_product_id_id", "product_id", "id"),
+    )
 
     price: Mapped[float] = mapped_column(
         Float(precision=2), server_default="0.00"
@@ -0,0 +1,104 @@
+"""Database model representing the totals of a shopping cart."""
+
+from datetime import datetime
+
+from sqlalchemy import DDL, TIMESTAMP, Float, ForeignKey, Integer, event, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.cart import Cart
+
+CART_SUMMARY_ADD_FUNCTION = """
+CREATE OR REPLACE FUNCTION cart_summary_add(
+    owner integer, price double precision, items integer, lines integer
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO cart_summary AS summary
+        (owner_id, total_price, item_count, line_count, updated_at)
+    VALUES (owner, price, items, lines, now())
+    ON CONFLICT (owner_id) DO UPDATE SET
+        total_price = summary.total_price + EXCLUDED.total_price,
+        item_count = summary.item_count + EXCLUDED.item_count,
+        line_count = summary.line_count + EXCLUDED.line_count,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CART_SUMMARY_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION cart_summary_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM cart_summary_add(
+            NEW.owner_id, NEW.price, NEW.quantity, 1
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM cart_summary_add(
+            OLD.owner_id, -OLD.price, -OLD.quantity, -1
+        );
+    ELSIF OLD.owner_id = NEW.owner_id THEN
+        PERFORM cart_summary_add(
+            NEW.owner_id,
+            NEW.price - OLD.price,
+            NEW.quantity - OLD.quantity,
+            0
+        );
+    ELSE
+        PERFORM cart_summary_add(
+            OLD.owner_id, -OLD.price, -OLD.quantity, -1
+        );
+        PERFORM cart_summary_add(
+            NEW.owner_id, NEW.price, NEW.quantity, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CART_SUMMARY_TRIGGER = """
+CREATE TRIGGER cart_summary_maintain
+AFTER INSERT OR UPDATE OR DELETE ON cart
+FOR EACH ROW EXECUTE FUNCTION cart_summary_apply()
+"""
+
+
+class CartSummary(Base):
+    """Database model representing the totals of a user's cart.
+
+    The rows are maintained by the ``cart_summary_maintain`` trigger of
+    the cart table, in the same transaction as the cart changes.
+
+    Attributes:
+        owner_id (int): The owner (user) of the cart, primary key.
+        total_price (float): The sum of the prices of the cart lines.
+        item_count (int): The sum of the quantities of the cart lines.
+        line_count (int): The number of cart lines.
+        updated_at (datetime): The timestamp of the last cart change.
+    """
+
+    __tablename__ = "cart_summary"
+
+    owner_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("user.id"), primary_key=True
+    )
+    total_price: Mapped[float] = mapped_column(
+        Float, nullable=False, server_default="0"
+    )
+    item_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    line_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
+    )
+
+
+for statement in (
+    CART_SUMMARY_ADD_FUNCTION,
+    CART_SUMMARY_TRIGGER_FUNCTION,
+    CART_SUMMARY_TRIGGER,
+):
+    event.listen(Cart.__table__, "after_create", DDL(statement))
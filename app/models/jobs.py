@@ -0,0 +1,71 @@
+"""Database model representing a background job."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import TIMESTAMP, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FAILED = "failed"
+
+
+class Job(BaseModel):
+    """Database model representing a background job.
+
+    A job waits in ``queued`` until ``run_at``. A worker taking it sets
+    it ``running`` and moves ``run_at`` to the end of its lease, so
+    the job is taken again if the worker dies. Succeeded jobs are
+    deleted; jobs out of attempts are kept as ``failed``.
+
+    Attributes:
+        id (int): The primary key of the job.
+        queue (str): The queue of the job.
+        name (str): The name of the registered job handler.
+        payload (dict): The arguments of the handler.
+        status (str): ``queued``, ``running`` or ``failed``.
+        attempts (int): The number of times the job was taken.
+        max_attempts (int): The number of attempts before the job
+            fails for good.
+        run_at (datetime): When the job is due, or when the lease of
+            a running job expires.
+        last_error (str): The error of the last failed attempt.
+        created_at (datetime): The timestamp when the job was
+            enqueued.
+        updated_at (datetime): The timestamp when the job was last
+            updated.
+    """
+
+    __tablename__ = "job"
+    __table_args__ = (
+        # The dequeue takes the due jobs of a queue in run_at order
+        Index(
+            "ix_job_queue_run_at_pending",
+            "queue",
+            "run_at",
+            postgresql_where=text(
+                f"status IN ('{JOB_QUEUED}', '{JOB_RUNNING}')"
+            ),
+        ),
+    )
+
+    queue: Mapped[str] = mapped_column(String(50), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default="{}"
+    )
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=JOB_QUEUED
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
@@ -1,11 +1,30 @@
 """Database model representing a product."""
 
-from sqlalchemy import Boolean, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base_model import BaseModel
 from app.schemas.products import ProductRead
 
+PRODUCT_SEARCH_CONFIG = "simple"
+PRODUCT_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', "
+    "coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', "
+    "coalesce(description, '')), 'B')"
+)
+
 
 class Product(BaseModel):
     """Database model representing a product.
@@ -22,9 +41,41 @@ class Product(BaseModel):
             created.
         updated_at (datetime): The timestamp when the product was
             last updated.
+        search_vector (str): The full-text search document, generated
+            from the name and the description. Deferred, so it is only
+            loaded when explicitly requested.
     """
 
     __tablename__ = "product"
+    __table_args__ = (
+        Index("ix_product_owner_id_id", "owner_id", "id"),
+        Index(
+            "ix_product_owner_id_created_at_id",
+            "owner_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_product_owner_id_is_active_price_id",
+            "owner_id",
+            "is_active",
+            "price",
+            "id",
+        ),
+        Index("ix_product_owner_id_price_id", "owner_id", "price", "id"),
+        Index(
+            "ix_product_active_owner_id_created_at_id",
+            "owner_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_product_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String(150), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
@@ -35,6 +86,11 @@ class Product(BaseModel):
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=False
     )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(PRODUCT_SEARCH_VECTOR, persisted=True),
+        deferred=True,
+    )
 
     def to_pydantic_model(self):
         """Convert the database model to a Pydantic model (ProductRead).
@@ -1,10 +1,30 @@
 """Repository for interacting with the Cart model in the database."""
 
-from sqlalchemy import and_, delete, func, select, update
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from app.models import User
-from app.models.cart import Cart
+from sqlalchemy import (
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    text,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from app.models import CartSummary, Product, User
+from app.models.cart import CART_PRODUCT_UNIQUE_CONSTRAINT, Cart
 from app.repositories.repository import BaseRepository
+from app.schemas.cart import CartItemExpanded, CartRead
 
 
 class CartRepository(BaseRepository):
@@ -12,26 +32,83 @@ class CartRepository(BaseRepository):
 
     Attributes:
         model: The Cart model.
+        read_schema: The CartRead schema.
         session: The database session.
     """
 
     model = Cart
+    read_schema = CartRead
 
     async def get_total_price(self, user: User):
         """Get the total price of all products in the user's cart.
 
+        Reads the cart summary by primary key instead of summing the
+        cart lines.
+
         Args:
             user (User): The user for whom to calculate the total price.
 
         Returns:
-            float: The total price of all products in the user's cart.
+            float: The total price of all products in the user's cart,
+                or None if the cart is empty.
         """
-        statement = select(func.sum(Cart.price)).where(
-            Cart.owner_id == user.id
+        statement = select(CartSummary.total_price).where(
+            and_(
+                CartSummary.owner_id == user.id,
+                CartSummary.line_count > 0,
+            )
         )
         result = await self.session.execute(statement)
         return result.scalar_one_or_none()
 
+    async def get_version(self, owner: User) -> Tuple[Optional[datetime], ...]:
+        """Get the version of the user's cart.
+
+        Reads the cart summary by primary key. Its ``updated_at`` is
+        bumped by the trigger on every change of a cart line,
+        deletions included.
+
+        Args:
+            owner (User): The owner of the cart.
+
+        Returns:
+            tuple: The last modification time, or None if the cart was
+                never used, followed by the line and item counts.
+        """
+        statement = select(
+            CartSummary.updated_at,
+            CartSummary.line_count,
+            CartSummary.item_count,
+        ).where(CartSummary.owner_id == owner.id)
+        result = await self.session.execute(statement)
+        return tuple(result.one_or_none() or (None, 0, 0))
+
+    async def get_all_with_products(
+        self, user: User
+    ) -> List[CartItemExpanded]:
+        """Get all cart items of a user joined with their products.
+
+        Args:
+            user (User): The owner of the cart.
+
+        Returns:
+            List[CartItemExpanded]: The cart items with their products.
+        """
+        statement = (
+            select(self.model, Product)
+            .join(Product, Product.id == self.model.product_id)
+            .where(self.model.owner_id == user.id)
+            .order_by(self.model.id)
+        )
+        result = await self.session.execute(statement)
+        return [
+            CartItemExpanded(
+                **cart.to_pydantic_model().model_dump(),
+                product=product.to_pydantic_model(),
+            )
+            for cart, product in result.all()
+        ]
+
     async def get_by_product_id(self, product_id: int, user: User):
         """Get a cart item by product ID for a specific user.
 
@@ -81,6 +158,291 @@ class CartRepository(BaseRepository):
 
         return result.scalar_one()
 
+    async def lock_products(self, product_ids: List[int]) -> None:
+        """Lock products against price changes until the end of the
+        transaction.
+
+        A price change locks its product ``FOR UPDATE`` and reprices
+        the cart lines it sees, so every write that prices a cart line
+        takes this ``FOR SHARE`` lock first: the line is then either
+        seen by the repricing or priced after it. The lock is taken by
+        its own statement, in ID order, so that the statements that
+        follow read the price committed by a change they waited for.
+
+        Args:
+            product_ids (List[int]): The IDs of the products.
+        """
+        statement = (
+            select(Product.id)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update(read=True)
+        )
+        await self.session.execute(statement)
+
+    async def update_quantity(
+        self, product_id: int, quantity: int, user: User
+    ) -> Optional[int]:
+        """Set the quantity of a cart item and reprice it in one statement.
+
+        The price is computed in SQL from the current product price,
+        locked with ``lock_products``.
+
+        Args:
+            product_id (int): The ID of the product.
+            quantity (int): The new quantity.
+            user (User): The owner of the cart.
+
+        Returns:
+            Optional[int]: The product ID of the updated cart item, or
+                None if the product is not in the cart.
+        """
+        await self.lock_products([product_id])
+        unit_price = (
+            select(Product.price)
+            .where(Product.id == self.model.product_id)
+            .scalar_subquery()
+        )
+        statement = (
+            update(self.model)
+            .where(
+                and_(
+                    self.model.product_id == product_id,
+                    self.model.owner_id == user.id,
+                )
+            )
+            .values(quantity=quantity, price=unit_price * quantity)
+            .returning(self.model.product_id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def update_quantities(
+        self, quantities: Dict[int, int], user: User
+    ) -> List[int]:
+        """Set the quantities of many cart items in one statement.
+
+        Runs a single ``UPDATE ... FROM (VALUES ...)`` joined with the
+        product table, so every line is repriced in SQL from the
+        current product price, locked with ``lock_products``.
+
+        Args:
+            quantities (Dict[int, int]): The new quantity of each
+                product ID.
+            user (User): The owner of the cart.
+
+        Returns:
+            List[int]: The product IDs of the updated cart items;
+                products not in the cart are skipped.
+        """
+        await self.lock_products(list(quantities))
+        requested = values(
+            column("product_id", Integer),
+            column("quantity", Integer),
+            name="requested",
+        ).data(list(quantities.items()))
+        statement = (
+            update(self.model)
+            .where(
+                and_(
+                    self.model.owner_id == user.id,
+                    self.model.product_id == requested.c.product_id,
+                    Product.id == self.model.product_id,
+                )
+            )
+            .values(
+                quantity=requested.c.quantity,
+                price=Product.price * requested.c.quantity,
+            )
+            .returning(self.model.product_id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
+    async def count_by_product_id(self, product_id: int, limit: int) -> int:
+        """Count the cart lines holding a product, up to a limit.
+
+        Args:
+            product_id (int): The ID of the product.
+            limit (int): The count at which to stop counting.
+
+        Returns:
+            int: The number of lines, at most ``limit``.
+        """
+        lines = (
+            select(literal(1))
+            .where(self.model.product_id == product_id)
+            .limit(limit)
+            .subquery()
+        )
+        result = await self.session.execute(
+            select(func.count()).select_from(lines)
+        )
+        return result.scalar_one()
+
+    async def reprice_by_product_id(
+        self,
+        product_id: int,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        lock_timeout_ms: Optional[int] = None,
+    ) -> List[int]:
+        """Recompute the price of the cart lines holding a product.
+
+        Runs a single ``UPDATE cart SET price = product.price *
+        cart.quantity FROM product``. With a ``limit``, only the next
+        lines by ID after ``after_id`` are repriced, so a large fan-out
+        can be walked in short batches.
+
+        Args:
+            product_id (int): The ID of the product.
+            after_id (int): The ID of the last line already repriced.
+            limit (Optional[int]): The number of lines to reprice; all
+                remaining lines when omitted.
+            lock_timeout_ms (Optional[int]): How long to wait for the
+                row locks before failing, for the rest of the
+                transaction.
+
+        Returns:
+            List[int]: The IDs of the repriced lines.
+        """
+        if lock_timeout_ms is not None:
+            await self.session.execute(
+                text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+            )
+        lines = and_(
+            self.model.product_id == product_id,
+            self.model.id > after_id,
+        )
+        if limit is not None:
+            batch = (
+                select(self.model.id)
+                .where(lines)
+                .order_by(self.model.id)
+                .limit(limit)
+            )
+            lines = self.model.id.in_(batch.scalar_subquery())
+        statement = (
+            update(self.model)
+            .where(and_(lines, Product.id == self.model.product_id))
+            .values(price=Product.price * self.model.quantity)
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
+    async def add_priced(
+        self, product_id: int, quantity: int, user: User
+    ) -> Optional[int]:
+        """Add a cart item priced from the product in one statement.
+
+        Runs a single ``INSERT ... SELECT ... FROM product FOR SHARE``,
+        so the price is read from the database rather than from the
+        product cache, and a concurrent price change either waits for
+        this transaction or is seen by it.
+
+        Args:
+            product_id (int): The ID of the product.
+            quantity (int): The quantity of the product.
+            user (User): The owner of the cart and of the product.
+
+        Returns:
+            Optional[int]: The product ID of the added item, or None if
+                the user has no such product.
+        """
+        source = (
+            select(
+                Product.id,
+                literal(quantity, Integer),
+                literal(user.id, Integer),
+                Product.price * quantity,
+                true(),
+            )
+            .where(and_(Product.id == product_id, Product.owner_id == user.id))
+            .with_for_update(read=True)
+        )
+        statement = (
+            insert(self.model)
+            .from_select(
+                ["product_id", "quantity", "owner_id", "price", "is_active"],
+                source,
+            )
+            .returning(self.model.product_id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def upsert_many(
+        self, items: List[dict], user: User, increment: bool = False
+    ) -> List[int]:
+        """Add cart items or update the existing ones in one statement.
+
+        Runs a single ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``
+        joined with the product table, so the prices are computed in
+        SQL and no row is read beforehand; the products are locked
+        with ``lock_products``. Items repeated in ``items`` are merged
+        first, as a row can only be affected once.
+
+        Args:
+            items (List[dict]): The ``product_id`` and ``quantity`` of
+                each item.
+            user (User): The owner of the cart.
+            increment (bool): Add the quantity to the one already in
+                the cart instead of replacing it.
+
+        Returns:
+            List[int]: The product IDs of the added or updated items;
+                products not owned by the user are skipped.
+        """
+        quantities = {}
+        for item in items:
+            previous = quantities.get(item["product_id"], 0)
+            quantities[item["product_id"]] = item["quantity"] + (
+                previous if increment else 0
+            )
+
+        await self.lock_products(list(quantities))
+        requested = values(
+            column("product_id", Integer),
+            column("quantity", Integer),
+            name="requested",
+        ).data(list(quantities.items()))
+        source = (
+            select(
+                requested.c.product_id,
+                requested.c.quantity,
+                literal(user.id, Integer),
+                Product.price * requested.c.quantity,
+                true(),
+            )
+            .select_from(requested)
+            .join(Product, Product.id == requested.c.product_id)
+            .where(Product.owner_id == user.id)
+        )
+        statement = insert(self.model).from_select(
+            ["product_id", "quantity", "owner_id", "price", "is_active"],
+            source,
+        )
+
+        quantity = statement.excluded.quantity
+        if increment:
+            quantity = self.model.quantity + statement.excluded.quantity
+        unit_price = (
+            select(Product.price)
+            .where(Product.id == literal_column("excluded.product_id"))
+            .scalar_subquery()
+        )
+        statement = statement.on_conflict_do_update(
+            constraint=CART_PRODUCT_UNIQUE_CONSTRAINT,
+            set_={
+                "quantity": quantity,
+                "price": unit_price * quantity,
+                "updated_at": func.now(),
+            },
+        ).returning(self.model.product_id)
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
     async def delete_by_owner_id_and_product_id(
         self, product_id: int, user: User
     ):
@@ -105,6 +467,41 @@ class CartRepository(BaseRepository):
         )
         return await self.session.execute(statement)
 
+    async def delete_by_product_ids(
+        self, product_ids: List[int], user: User
+    ) -> List[int]:
+        """Delete many cart items of a user in one statement.
+
+        The IDs are sent as a single array parameter, compared with
+        ``= ANY``, so the statement is the same for any number of IDs.
+
+        Args:
+            product_ids (List[int]): The IDs of the products to remove.
+            user (User): The owner of the cart.
+
+        Returns:
+            List[int]: The product IDs of the deleted cart items.
+        """
+        statement = (
+            delete(self.model)
+            .where(
+                and_(
+                    self.model.owner_id == user.id,
+                    self.model.product_id
+                    == any_(
+                        bindparam(
+                            "product_ids",
+                            product_ids,
+                            type_=ARRAY(Integer),
+                        )
+                    ),
+                )
+            )
+            .returning(self.model.product_id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
     async def delete_all_by_owner_id(self, user: User):
         """Delete all cart items for a specific user.
 
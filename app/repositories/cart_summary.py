@@ -0,0 +1,97 @@
+"""Repository for interacting with the CartSummary model."""
+
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, or_, select, text
+
+from app.models import Cart, CartSummary
+from app.repositories.repository import BaseRepository
+
+PRICE_TOLERANCE = 0.005
+
+
+class CartSummaryRepository(BaseRepository):
+    """Repository for checking and rebuilding the cart summaries.
+
+    The summaries are maintained by a database trigger; this
+    repository only verifies them against the cart lines.
+
+    Attributes:
+        model: The CartSummary model.
+        session: The database session.
+    """
+
+    model = CartSummary
+
+    @staticmethod
+    def _actual_totals(owner_ids: Optional[List[int]] = None):
+        statement = select(
+            Cart.owner_id.label("owner_id"),
+            func.sum(Cart.price).label("total_price"),
+            func.sum(Cart.quantity).label("item_count"),
+            func.count().label("line_count"),
+        ).group_by(Cart.owner_id)
+        if owner_ids:
+            statement = statement.where(Cart.owner_id.in_(owner_ids))
+        return statement
+
+    async def find_inconsistent(self) -> List[int]:
+        """Get the owners whose summary does not match their cart.
+
+        Returns:
+            List[int]: The IDs of the owners with a wrong summary.
+        """
+        actual = self._actual_totals().subquery()
+        statement = (
+            select(func.coalesce(actual.c.owner_id, self.model.owner_id))
+            .select_from(
+                actual.join(
+                    self.model,
+                    self.model.owner_id == actual.c.owner_id,
+                    full=True,
+                )
+            )
+            .where(
+                or_(
+                    func.coalesce(actual.c.line_count, 0)
+                    != func.coalesce(self.model.line_count, 0),
+                    func.coalesce(actual.c.item_count, 0)
+                    != func.coalesce(self.model.item_count, 0),
+                    func.abs(
+                        func.coalesce(actual.c.total_price, 0)
+                        - func.coalesce(self.model.total_price, 0)
+                    )
+                    > PRICE_TOLERANCE,
+                )
+            )
+        )
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
+    async def rebuild(self, owner_ids: Optional[List[int]] = None) -> int:
+        """Recompute the summaries from the cart lines.
+
+        The cart table is locked against writes until the transaction
+        ends, so no trigger update is lost during the rebuild.
+
+        Args:
+            owner_ids (Optional[List[int]]): The owners to rebuild; all
+                owners when omitted.
+
+        Returns:
+            int: The number of summaries written.
+        """
+        await self.session.execute(text("LOCK TABLE cart IN SHARE MODE"))
+        delete_statement = delete(self.model)
+        if owner_ids:
+            delete_statement = delete_statement.where(
+                self.model.owner_id.in_(owner_ids)
+            )
+        await self.session.execute(delete_statement)
+
+        insert_statement = insert(self.model).from_select(
+            ["owner_id", "total_price", "item_count", "line_count"],
+            self._actual_totals(owner_ids),
+        )
+        result = await self.session.execute(insert_statement)
+        return result.rowcount
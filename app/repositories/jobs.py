@@ -0,0 +1,197 @@
+"""Repository for interacting with the Job model."""
+
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import Row, delete, func, select, update
+
+from app.models import Job
+from app.models.jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from app.repositories.repository import BaseRepository
+
+
+class JobsRepository(BaseRepository):
+    """Repository for enqueuing, taking and settling background jobs.
+
+    Jobs are enqueued with the session of the caller, so they are
+    committed, or rolled back, with the rest of its transaction.
+
+    Attributes:
+        model: The Job model.
+        session: The database session.
+    """
+
+    model = Job
+
+    async def enqueue(
+        self,
+        name: str,
+        payload: dict,
+        queue: str,
+        max_attempts: int,
+        delay: float = 0.0,
+    ) -> int:
+        """Add a job to a queue.
+
+        Args:
+            name (str): The name of the job handler.
+            payload (dict): The arguments of the handler, as JSON.
+            queue (str): The queue of the job.
+            max_attempts (int): The number of attempts before the job
+                fails for good.
+            delay (float): The seconds to wait before running the job.
+
+        Returns:
+            int: The ID of the job.
+        """
+        return await self.add(
+            {
+                "name": name,
+                "payload": payload,
+                "queue": queue,
+                "max_attempts": max_attempts,
+                "run_at": func.now() + timedelta(seconds=delay),
+            }
+        )
+
+    async def dequeue(
+        self, queue: str, limit: int, lease_seconds: float
+    ) -> List[Row]:
+        """Take the due jobs of a queue.
+
+        Runs a single ``UPDATE job ... WHERE id IN (SELECT ... FOR
+        UPDATE SKIP LOCKED)``: jobs locked by another worker are
+        skipped instead of waited for, so any number of workers can
+        poll the same queue. The taken jobs are set ``running`` until
+        ``now() + lease_seconds``; a running job whose lease expired,
+        as its worker died, is due again.
+
+        Args:
+            queue (str): The queue to take jobs from.
+            limit (int): The largest number of jobs to take.
+            lease_seconds (float): How long the jobs are reserved.
+
+        Returns:
+            List[Row]: The ``id``, ``name``, ``payload``, ``attempts``
+                and ``max_attempts`` of the taken jobs.
+        """
+        due = (
+            select(self.model.id)
+            .where(
+                self.model.queue == queue,
+                self.model.status.in_((JOB_QUEUED, JOB_RUNNING)),
+                self.model.run_at <= func.now(),
+            )
+            .order_by(self.model.run_at, self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(self.model)
+            .where(self.model.id.in_(due.scalar_subquery()))
+            .values(
+                status=JOB_RUNNING,
+                attempts=self.model.attempts + 1,
+                run_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(
+                self.model.id,
+                self.model.name,
+                self.model.payload,
+                self.model.attempts,
+                self.model.max_attempts,
+            )
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def complete(self, job_id: int, attempt: int) -> bool:
+        """Delete a job that succeeded.
+
+        Args:
+            job_id (int): The ID of the job.
+            attempt (int): The attempt that succeeded. A job taken
+                again since, as its lease expired, is left alone.
+
+        Returns:
+            bool: True if the job was deleted.
+        """
+        statement = (
+            delete(self.model)
+            .where(self.model.id == job_id, self.model.attempts == attempt)
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none() is not None
+
+    async def retry(
+        self, job_id: int, attempt: int, delay: float, error: str
+    ) -> bool:
+        """Queue a job that failed again after a delay.
+
+        Args:
+            job_id (int): The ID of the job.
+            attempt (int): The attempt that failed.
+            delay (float): The seconds to wait before the next attempt.
+            error (str): The error of the attempt.
+
+        Returns:
+            bool: True if the job was queued again.
+        """
+        return await self._settle(
+            job_id,
+            attempt,
+            status=JOB_QUEUED,
+            run_at=func.now() + timedelta(seconds=delay),
+            last_error=error,
+        )
+
+    async def fail(self, job_id: int, attempt: int, error: str) -> bool:
+        """Mark a job as failed for good.
+
+        Args:
+            job_id (int): The ID of the job.
+            attempt (int): The attempt that failed.
+            error (str): The error of the attempt.
+
+        Returns:
+            bool: True if the job was marked as failed.
+        """
+        return await self._settle(
+            job_id, attempt, status=JOB_FAILED, last_error=error
+        )
+
+    async def _settle(self, job_id: int, attempt: int, **values) -> bool:
+        statement = (
+            update(self.model)
+            .where(
+                self.model.id == job_id,
+                self.model.attempts == attempt,
+                self.model.status == JOB_RUNNING,
+            )
+            .values(**values)
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none() is not None
+
+    async def requeue_failed(self, queue: Optional[str] = None) -> int:
+        """Queue the failed jobs again, with fresh attempts.
+
+        Args:
+            queue (Optional[str]): The queue of the jobs; all queues
+                when omitted.
+
+        Returns:
+            int: The number of jobs queued again.
+        """
+        statement = (
+            update(self.model)
+            .where(self.model.status == JOB_FAILED)
+            .values(status=JOB_QUEUED, attempts=0, run_at=func.now())
+            .returning(self.model.id)
+        )
+        if queue is not None:
+            statement = statement.where(self.model.queue == queue)
+        result = await self.session.execute(statement)
+        return len(result.scalars().all())
@@ -1,7 +1,35 @@
 """Repository for interacting with the Product model in the database."""
 
-from app.models import Product
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    cast,
+    func,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app.models import Product, User
+from app.models.products import PRODUCT_SEARCH_CONFIG
 from app.repositories.repository import BaseRepository
+from app.schemas.products import ProductFilter, ProductRead
+from app.settings import config
+from app.utils.cache import AbstractCache, create_cache
+
+product_cache = create_cache(
+    enabled=config.PRODUCT_CACHE_ENABLED,
+    maxsize=config.PRODUCT_CACHE_MAXSIZE,
+    ttl=config.PRODUCT_CACHE_TTL,
+    model=ProductRead,
+    prefix="product",
+    redis_url=config.PRODUCT_CACHE_REDIS_URL,
+)
 
 
 class ProductsRepository(BaseRepository):
@@ -10,6 +38,315 @@ class ProductsRepository(BaseRepository):
     Attributes:
         model: The Product model.
         session: The database session.
+        read_schema: The ProductRead schema.
+        cache: The read-through cache of ``get``.
     """
 
     model = Product
+    read_schema = ProductRead
+    cache: AbstractCache = product_cache
+
+    @staticmethod
+    def cache_key(id: int, owner: User) -> str:
+        """Get the cache key of a product.
+
+        Args:
+            id (int): The ID of the product.
+            owner (User): The owner of the product.
+
+        Returns:
+            str: The cache key.
+        """
+        return f"{owner.id}:{id}"
+
+    async def get(
+        self, id: int, owner: User, updated_at: Optional[datetime] = None
+    ) -> ProductRead:
+        """Get a product, reading the cache before the database.
+
+        On a miss, the product read from the database is cached only if
+        no product was invalidated since before the read, so a value
+        read before a concurrent change is never cached after its
+        invalidation.
+
+        Args:
+            id (int): The ID of the product.
+            owner (User): The owner of the product.
+            updated_at (Optional[datetime]): The modification time of
+                the product in the database; a cached product with
+                another one is read again.
+
+        Returns:
+            ProductRead: The retrieved product.
+        """
+        key = self.cache_key(id, owner)
+        product = await self.cache.get(key)
+        if (
+            product is not None
+            and updated_at is not None
+            and product.updated_at != updated_at
+        ):
+            product = None
+        if product is None:
+            version = await self.cache.version()
+            product = await super().get(id, owner)
+            await self.cache.set_if_unchanged(key, product, version)
+        return product
+
+    async def get_updated_at(self, id: int, owner: User) -> Optional[datetime]:
+        """Get the modification time of a product from the database.
+
+        Args:
+            id (int): The ID of the product.
+            owner (User): The owner of the product.
+
+        Returns:
+            Optional[datetime]: The modification time, or None if the
+                product does not exist.
+        """
+        statement = select(self.model.updated_at).where(
+            and_(self.model.id == id, self.model.owner_id == owner.id)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def invalidate(self, id: int, owner: User) -> None:
+        """Remove a product from the cache.
+
+        Must be called once the change to the product is committed.
+
+        Args:
+            id (int): The ID of the product.
+            owner (User): The owner of the product.
+        """
+        await self.cache.delete(self.cache_key(id, owner))
+
+    async def get_price_for_update(
+        self, id: int, owner: User
+    ) -> Optional[float]:
+        """Get the price of a product and lock it until the end of the
+        transaction.
+
+        Args:
+            id (int): The ID of the product.
+            owner (User): The owner of the product.
+
+        Returns:
+            Optional[float]: The current price, or None if the product
+                does not exist.
+        """
+        statement = (
+            select(self.model.price)
+            .where(and_(self.model.id == id, self.model.owner_id == owner.id))
+            .with_for_update()
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    def page_statement(
+        self,
+        owner: User,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        filters: Optional[ProductFilter] = None,
+    ) -> Select:
+        """Build the query of a filtered and sorted page of products.
+
+        Every combination of filters compiles to one query whose
+        order matches one of the ``(owner_id, ...)`` product indexes.
+
+        Args:
+            owner (User): The owner of the products.
+            limit (int): The maximum number of products to return.
+            after (Optional[Tuple[Any, int]]): The sort value and
+                ``id`` of the last product of the previous page.
+            filters (Optional[ProductFilter]): The filters and order,
+                oldest first by default.
+
+        Returns:
+            Select: The query of the ``read_columns``, fetching one
+                product more than ``limit`` to detect the last page.
+        """
+        filters = filters or ProductFilter()
+        sort_column = getattr(self.model, filters.sort_column)
+        statement = select(*self.read_columns).where(
+            self.model.owner_id == owner.id
+        )
+        if filters.is_active is not None:
+            statement = statement.where(
+                self.model.is_active == filters.is_active
+            )
+        if filters.price_min is not None:
+            statement = statement.where(self.model.price >= filters.price_min)
+        if filters.price_max is not None:
+            statement = statement.where(self.model.price <= filters.price_max)
+        if filters.created_after is not None:
+            statement = statement.where(
+                self.model.created_at >= filters.created_after
+            )
+        if filters.created_before is not None:
+            statement = statement.where(
+                self.model.created_at < filters.created_before
+            )
+
+        sort_key = tuple_(sort_column, self.model.id)
+        if filters.descending:
+            if after is not None:
+                statement = statement.where(sort_key < tuple_(*after))
+            order = (sort_column.desc(), self.model.id.desc())
+        else:
+            if after is not None:
+                statement = statement.where(sort_key > tuple_(*after))
+            order = (sort_column, self.model.id)
+        return statement.order_by(*order).limit(limit + 1)
+
+    async def get_page(
+        self,
+        owner: User,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        filters: Optional[ProductFilter] = None,
+    ) -> Tuple[Sequence[Row], Optional[Tuple[Any, int]]]:
+        """Get a filtered and sorted page of products.
+
+        Keyset pagination: the page starts right after the given sort
+        key, so the cost of a page does not depend on its position.
+
+        Args:
+            owner (User): The owner of the products.
+            limit (int): The maximum number of products to return.
+            after (Optional[Tuple[Any, int]]): The sort value and
+                ``id`` of the last product of the previous page.
+            filters (Optional[ProductFilter]): The filters and order,
+                oldest first by default.
+
+        Returns:
+            tuple: The ``read_columns`` of the products, as plain rows,
+                and the sort key of the last one, or None if there are
+                no more products.
+        """
+        filters = filters or ProductFilter()
+        result = await self.session.execute(
+            self.page_statement(owner, limit, after, filters)
+        )
+        rows = result.all()
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (getattr(rows[-1], filters.sort_column), rows[-1].id)
+        return rows, next_key
+
+    async def search(
+        self,
+        owner: User,
+        terms: List[str],
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Tuple[Sequence[Row], Optional[Tuple[float, int]]]:
+        """Search products by name and description, best match first.
+
+        Every term must match the start of a word, so partial input
+        can be used for autocompletion. Matches come from the GIN index
+        of ``search_vector``; names rank above descriptions. Results
+        are ordered by ``(rank DESC, id)`` and paginated by keyset.
+
+        Args:
+            owner (User): The owner of the products.
+            terms (List[str]): The search terms, made of word
+                characters only.
+            limit (int): The maximum number of products to return.
+            after (Optional[Tuple[float, int]]): The rank and ``id`` of
+                the last product of the previous page.
+
+        Returns:
+            tuple: The ``read_columns`` of the products followed by
+                their rank, as plain rows, and the sort key of the last
+                one, or None if there are no more products.
+        """
+        query = func.to_tsquery(
+            cast(PRODUCT_SEARCH_CONFIG, REGCONFIG),
+            " & ".join(f"{term}:*" for term in terms),
+        )
+        rank = func.ts_rank(self.model.search_vector, query).label("rank")
+        statement = select(*self.read_columns, rank).where(
+            self.model.owner_id == owner.id,
+            self.model.search_vector.bool_op("@@")(query),
+        )
+        if after is not None:
+            after_rank, after_id = after
+            statement = statement.where(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, self.model.id > after_id),
+                )
+            )
+        statement = statement.order_by(rank.desc(), self.model.id).limit(
+            limit + 1
+        )
+        result = await self.session.execute(statement)
+        rows = result.all()
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1].rank, rows[-1].id)
+        return rows, next_key
+
+    async def copy_many(self, data: List[dict]) -> int:
+        """Add multiple products with ``COPY``.
+
+        Uses asyncpg ``copy_records_to_table`` when the session runs on
+        asyncpg and falls back to multi-row INSERTs otherwise. The
+        products are loaded within the transaction of the session.
+
+        Args:
+            data (List[dict]): The products to add, all with the same
+                columns.
+
+        Returns:
+            int: The number of added products.
+        """
+        if not data:
+            return 0
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        if not hasattr(driver_connection, "copy_records_to_table"):
+            return len(await self.add_many(data))
+
+        # The driver begins its transaction on the first statement only,
+        # COPY must not run before it.
+        await connection.exec_driver_sql("SELECT 1")
+        columns = list(data[0])
+        await driver_connection.copy_records_to_table(
+            self.model.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in data],
+            columns=columns,
+        )
+        return len(data)
+
+    async def stream_all(
+        self, owner: User, chunk_size: int
+    ) -> AsyncIterator[Row]:
+        """Stream all products of an owner with a server-side cursor.
+
+        Rows are plain column tuples fetched ``chunk_size`` at a time,
+        so memory use does not grow with the number of products.
+
+        Args:
+            owner (User): The owner of the products.
+            chunk_size (int): The number of rows fetched per round-trip.
+
+        Yields:
+            Row: The columns of a product.
+        """
+        statement = (
+            select(*self.read_columns)
+            .where(self.model.owner_id == owner.id)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream(statement)
+        async for row in result:
+            yield row
@@ -1,8 +1,20 @@
 """Repository module."""
 
 from abc import ABC, abstractmethod
-
-from sqlalchemy import and_, delete, insert, select, update
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Column,
+    Row,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
@@ -75,10 +87,20 @@ class AbstractRepository(ABC):
 
 class BaseRepository(AbstractRepository):
     model = None
+    read_schema: Optional[Type[BaseModel]] = None
+    bulk_insert_batch_size = 1000
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def read_columns(self) -> List[Column]:
+        """List[Column]: The columns of ``read_schema``, in its order."""
+        return [
+            self.model.__table__.c[name]
+            for name in self.read_schema.model_fields
+        ]
+
     async def add(self, data: dict) -> int:
         """Add a new record to the repository.
 
@@ -92,6 +114,29 @@ class BaseRepository(AbstractRepository):
         result = await self.session.execute(statement)
         return result.scalar_one()
 
+    async def add_many(self, data: List[dict]) -> List[int]:
+        """Add multiple records with multi-row INSERT statements.
+
+        Rows are sent in batches of ``bulk_insert_batch_size`` to stay
+        well below the bind parameter limit of the driver.
+
+        Args:
+            data (List[dict]): The records to be added.
+
+        Returns:
+            List[int]: The IDs of the added records.
+        """
+        ids = []
+        for start in range(0, len(data), self.bulk_insert_batch_size):
+            end = start + self.bulk_insert_batch_size
+            batch = data[start:end]
+            statement = (
+                insert(self.model).values(batch).returning(self.model.id)
+            )
+            result = await self.session.execute(statement)
+            ids.extend(result.scalars().all())
+        return ids
+
     async def get_all(self, owner: User):
         """Get all records from the repository for a specific owner.
 
@@ -105,6 +150,43 @@ class BaseRepository(AbstractRepository):
         result = await self.session.execute(statement)
         return [row[0].to_pydantic_model() for row in result.all()]
 
+    async def get_all_rows(self, owner: User) -> Sequence[Row]:
+        """Get all records of an owner as plain column tuples.
+
+        Skips building ORM objects and models, for callers that
+        serialize the rows directly.
+
+        Args:
+            owner (User): The owner of the records.
+
+        Returns:
+            Sequence[Row]: The ``read_columns`` of the records.
+        """
+        statement = select(*self.read_columns).where(
+            self.model.owner_id == owner.id
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def get_version(self, owner: User) -> Tuple[Optional[datetime], ...]:
+        """Get the version of all records of an owner.
+
+        One aggregate query, answered from the ``(owner_id, ...)``
+        indexes, that changes whenever a record is added or updated.
+
+        Args:
+            owner (User): The owner of the records.
+
+        Returns:
+            tuple: The last modification time, or None if there are no
+                records, followed by the number of records.
+        """
+        statement = select(
+            func.max(self.model.updated_at), func.count(self.model.id)
+        ).where(self.model.owner_id == owner.id)
+        result = await self.session.execute(statement)
+        return tuple(result.one())
+
     async def get(self, id: int, owner: User):
         """Get a specific record from the repository.
 
@@ -125,6 +207,25 @@ class BaseRepository(AbstractRepository):
         result = result.scalar_one()
         return result.to_pydantic_model()
 
+    async def get_many(self, ids: List[int], owner: User):
+        """Get several records of a specific owner with one query.
+
+        Args:
+            ids (List[int]): The IDs of the records.
+            owner (User): The owner of the records.
+
+        Returns:
+            list: The retrieved records; missing IDs are skipped.
+        """
+        statement = select(self.model).where(
+            and_(
+                self.model.id.in_(ids),
+                self.model.owner_id == owner.id,
+            )
+        )
+        result = await self.session.execute(statement)
+        return [row.to_pydantic_model() for row in result.scalars().all()]
+
     async def update(self, id: int, data: dict, owner: User):
         """Update a specific record in the repository.
 
@@ -145,7 +246,7 @@ class BaseRepository(AbstractRepository):
                 )
             )
             .values(**data)
-            .returning(self.model.product_id)
+            .returning(self.model.id)
         )
         result = await self.session.execute(statement)
         return result.scalar_one()
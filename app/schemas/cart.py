@@ -1,8 +1,11 @@
 """Pydantic models representing the shopping cart."""
 
 from datetime import datetime
+from typing import Annotated, List, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, Field
+
+from app.schemas.products import ProductRead
 
 
 class CartRead(BaseModel):
@@ -37,6 +40,29 @@ class CartRead(BaseModel):
         from_attributes = True
 
 
+class CartItemExpanded(CartRead):
+    """Pydantic model representing a cart item with its product.
+
+    Attributes:
+        product (ProductRead): The product of the cart item.
+    """
+
+    product: ProductRead
+
+
+class CartExpanded(BaseModel):
+    """Pydantic model representing a cart with its products and total.
+
+    Attributes:
+        items (List[CartItemExpanded]): The cart items with their
+            products.
+        total_price (float): The total price of the cart items.
+    """
+
+    items: List[CartItemExpanded]
+    total_price: float
+
+
 class CartCreate(BaseModel):
     """Pydantic model representing the creation of a shopping cart item.
 
@@ -65,3 +91,70 @@ class CartUpdate(BaseModel):
     """
 
     quantity: int = Field(1, gt=0)
+
+
+class CartItemUpdate(CartUpdate):
+    """Pydantic model representing the new quantity of a cart item.
+
+    Attributes:
+        product_id (int): The ID of the product in the cart.
+        quantity (int): The new quantity of the product in the cart.
+    """
+
+    product_id: int
+
+
+def unique_product_ids(product_ids: List[int]) -> List[int]:
+    """Reject a batch that names a product more than once.
+
+    Args:
+        product_ids (List[int]): The product IDs of the batch.
+
+    Returns:
+        List[int]: The product IDs, unchanged.
+
+    Raises:
+        ValueError: If a product ID is repeated.
+    """
+    if len(set(product_ids)) != len(product_ids):
+        raise ValueError("Duplicate product IDs")
+    return product_ids
+
+
+def unique_cart_items(items: List[CartItemUpdate]) -> List[CartItemUpdate]:
+    """Reject a batch of cart items that names a product more than once.
+
+    Args:
+        items (List[CartItemUpdate]): The cart items of the batch.
+
+    Returns:
+        List[CartItemUpdate]: The cart items, unchanged.
+
+    Raises:
+        ValueError: If a product ID is repeated.
+    """
+    unique_product_ids([item.product_id for item in items])
+    return items
+
+
+# Batch request bodies; a repeated product is a validation error (422)
+CartProductIds = Annotated[List[int], AfterValidator(unique_product_ids)]
+CartItemUpdates = Annotated[
+    List[CartItemUpdate], AfterValidator(unique_cart_items)
+]
+
+
+class CartItemOutcome(BaseModel):
+    """Pydantic model representing the outcome of a batch cart change.
+
+    There is one outcome per product of the request, in request order;
+    a request naming a product twice is rejected before any change.
+
+    Attributes:
+        product_id (int): The ID of the product.
+        status (str): ``"updated"`` or ``"deleted"`` if the change was
+            applied, ``"not_found"`` if the product is not in the cart.
+    """
+
+    product_id: int
+    status: Literal["updated", "deleted", "not_found"]
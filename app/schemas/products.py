@@ -1,8 +1,9 @@
 """Pydantic models representing the products schema."""
 
 from datetime import datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ProductRead(BaseModel):
@@ -38,16 +39,64 @@ class ProductRead(BaseModel):
         from_attributes = True
 
 
+class ProductPage(BaseModel):
+    """Pydantic model representing a page of products.
+
+    Attributes:
+        items (List[ProductRead]): The products of the page.
+        next_cursor (Optional[str]): The cursor of the next page, or
+            None if this is the last page.
+    """
+
+    items: List[ProductRead]
+    next_cursor: Optional[str] = None
+
+
+class ProductFilter(BaseModel):
+    """Pydantic model representing the filters and order of a listing.
+
+    Attributes:
+        is_active (Optional[bool]): Only products with this status.
+        price_min (Optional[float]): The minimum price, inclusive.
+        price_max (Optional[float]): The maximum price, inclusive.
+        created_after (Optional[datetime]): The earliest creation
+            time, inclusive.
+        created_before (Optional[datetime]): The latest creation time,
+            exclusive.
+        sort (str): The sort column, prefixed with ``-`` for
+            descending order. Ties are broken by ID.
+    """
+
+    is_active: Optional[bool] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    sort: Literal[
+        "created_at", "-created_at", "price", "-price"
+    ] = "created_at"
+
+    @property
+    def sort_column(self) -> str:
+        """str: The name of the sort column."""
+        return self.sort.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        """bool: Whether the products are sorted in descending order."""
+        return self.sort.startswith("-")
+
+
 class ProductsCreate(BaseModel):
     """Pydantic model representing the creation of a product.
 
     Attributes:
-        name (str): The name of the product.
+        name (str): The name of the product (at most 150 characters).
         description (str): The description of the product.
         price (float): The price of the product.
     """
 
-    name: str
+    name: str = Field(max_length=150)
     description: str
     price: float
 
@@ -64,3 +113,29 @@ class ProductsUpdate(BaseModel):
     name: str
     description: str
     price: float
+
+
+class ProductImportError(BaseModel):
+    """Pydantic model representing a rejected row of an import.
+
+    Attributes:
+        line (int): The line of the row in the uploaded file.
+        error (str): Why the row was rejected.
+    """
+
+    line: int
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    """Pydantic model representing the outcome of a product import.
+
+    Attributes:
+        imported (int): The number of imported products.
+        failed (int): The number of rejected rows.
+        errors (List[ProductImportError]): The first rejected rows.
+    """
+
+    imported: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = []
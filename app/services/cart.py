@@ -3,13 +3,20 @@
 from typing import List, Union, overload
 
 from fastapi import HTTPException, status
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.exc import IntegrityError
 
 from app.api.v1.dependencies import UOWDependency
 from app.models import User
-from app.schemas.cart import CartCreate, CartUpdate
-from app.services.products import ProductsService
+from app.schemas.cart import (
+    CartCreate,
+    CartExpanded,
+    CartItemOutcome,
+    CartItemUpdate,
+    CartRead,
+    CartUpdate,
+)
 from app.services.validators import ProductInCartValidator
+from app.utils.serialization import dumps, rows_to_dicts
 
 
 class CartService:
@@ -19,24 +26,36 @@ class CartService:
         add: Add one or multiple products to the user's cart.
         add_one: Add a single product to the user's cart.
         add_many: Add multiple products to the user's cart.
+        upsert: Add products to the cart or increment their quantity.
         get_all: Get all products from the user's cart.
+        get_version: Get the version of the user's cart.
+        get_all_expanded: Get the cart with its products and total.
         get: Get a specific product from the user's cart.
         update: Update the quantity of a product in the user's cart.
+        update_many: Update the quantities of many products at once.
         delete: Remove a product from the user's cart.
+        delete_many: Remove many products from the user's cart at once.
         delete_all: Remove all products from the user's cart.
         get_total_price: Get the total price of all products in the
             user's cart.
-        is_in_cart: Check if a product is already in the user's cart.
     """
 
     @overload
     def add(
-        self, uow: UOWDependency, product: CartCreate, user: User
+        self,
+        uow: UOWDependency,
+        product: CartCreate,
+        user: User,
+        increment: bool = False,
     ) -> int: ...
 
     @overload
     def add(
-        self, uow: UOWDependency, products: List[CartCreate], user: User
+        self,
+        uow: UOWDependency,
+        products: List[CartCreate],
+        user: User,
+        increment: bool = False,
     ) -> List[int]: ...
 
     async def add(
@@ -44,6 +63,7 @@ class CartService:
         uow: UOWDependency,
         products: Union[CartCreate, List[CartCreate]],
         user: User,
+        increment: bool = False,
     ) -> Union[int, List[int]]:
         """Add one or multiple products to the user's cart.
 
@@ -52,12 +72,17 @@ class CartService:
             products (Union[CartCreate, List[CartCreate]]): The product
                 or list of products to add.
             user (User): The user for whom to add the products.
+            increment (bool): Increment the quantity of the products
+                already in the cart instead of rejecting them.
 
         Returns:
             Union[int, List[int]]: The product ID(s) that were added
                 to the cart.
         """
-        if isinstance(products, list):
+        if increment:
+            async with uow:
+                result = await self.upsert(uow, products, user)
+        elif isinstance(products, list):
             async with uow:
                 result = await self.add_many(uow, products, user)
         else:
@@ -70,6 +95,9 @@ class CartService:
     ):
         """Add a single product to the user's cart.
 
+        The line is priced in SQL from the current product price, not
+        from the product cache, which may be stale in other processes.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             product (CartCreate): The product to add.
@@ -78,23 +106,32 @@ class CartService:
         Returns:
             int: The product ID that was added to the cart.
         """
-        cart_dict = product.model_dump()
-        cart_dict["owner_id"] = user.id
-        is_product_in_cart, _product = await self.is_in_cart(
-            uow, product.product_id, user
-        )
-        validator = ProductInCartValidator()
-        validator(is_product_in_cart)
-        cart_dict["price"] = _product.price * product.quantity
-        await uow.cart.add(cart_dict)
+        try:
+            product_id = await uow.cart.add_priced(
+                product.product_id, product.quantity, user
+            )
+        except IntegrityError as error:
+            ProductInCartValidator()(error)
+        if product_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found",
+            )
         await uow.commit()
-        return product.product_id
+        return product_id
 
     async def add_many(
         self, uow: UOWDependency, products: List[CartCreate], user: User
     ):
         """Add multiple products to the user's cart.
 
+        The products are locked against price changes and fetched
+        with one query each, and all lines are inserted with one
+        multi-row INSERT; products already in the cart are rejected by
+        the unique cart constraint. The whole
+        batch is committed once, so either every product is added or
+        none is.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             products (List[CartCreate]): The list of products to add.
@@ -102,26 +139,142 @@ class CartService:
 
         Returns:
             List[int]: The list of product IDs that were added to the cart.
+
+        Raises:
+            HTTPException: If a product does not exist or is already
+                in the cart.
         """
-        result = []
-        for product in products:
-            product_id = await self.add_one(uow, product, user)
-            result.append(product_id)
-        return result
+        product_ids = [product.product_id for product in products]
+        if not product_ids:
+            return []
+
+        if len(set(product_ids)) != len(product_ids):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Duplicate products in request",
+            )
+
+        await uow.cart.lock_products(product_ids)
+        found = {
+            _product.id: _product
+            for _product in await uow.products.get_many(product_ids, user)
+        }
+        if len(found) != len(set(product_ids)):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found",
+            )
+
+        try:
+            await uow.cart.add_many(
+                [
+                    {
+                        **product.model_dump(),
+                        "owner_id": user.id,
+                        "price": found[product.product_id].price
+                        * product.quantity,
+                    }
+                    for product in products
+                ]
+            )
+        except IntegrityError as error:
+            ProductInCartValidator()(error)
+        await uow.commit()
+        return product_ids
 
     @staticmethod
-    async def get_all(uow: UOWDependency, user: User):
+    async def upsert(
+        uow: UOWDependency,
+        products: Union[CartCreate, List[CartCreate]],
+        user: User,
+    ) -> Union[int, List[int]]:
+        """Add products to the cart or increment their quantity.
+
+        Every product is added or incremented by a single atomic
+        statement, without reading the cart first.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            products (Union[CartCreate, List[CartCreate]]): The product
+                or list of products to add.
+            user (User): The user for whom to add the products.
+
+        Returns:
+            Union[int, List[int]]: The product ID(s) that were added
+                or incremented.
+
+        Raises:
+            HTTPException: If a product does not exist.
+        """
+        items = products if isinstance(products, list) else [products]
+        product_ids = [product.product_id for product in items]
+        if not product_ids:
+            return []
+
+        upserted = await uow.cart.upsert_many(
+            [product.model_dump() for product in items], user, increment=True
+        )
+        if set(upserted) != set(product_ids):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found",
+            )
+        await uow.commit()
+        return product_ids if isinstance(products, list) else product_ids[0]
+
+    @staticmethod
+    async def get_all(uow: UOWDependency, user: User) -> bytes:
         """Get all products from the user's cart.
 
+        The items are serialized straight from the rows; see
+        ``app.utils.serialization``.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             user (User): The user for whom to retrieve the cart items.
 
         Returns:
-            List: The list of cart items.
+            bytes: The JSON encoded list of ``CartRead`` items.
         """
         async with uow:
-            return await uow.cart.get_all(user)
+            rows = await uow.cart.get_all_rows(user)
+        return dumps(rows_to_dicts(list(CartRead.model_fields), rows))
+
+    @staticmethod
+    async def get_version(uow: UOWDependency, user: User) -> tuple:
+        """Get the version of the user's cart.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The owner of the cart.
+
+        Returns:
+            tuple: The last modification time of the cart followed by
+                its line and item counts.
+        """
+        async with uow:
+            return await uow.cart.get_version(user)
+
+    @staticmethod
+    async def get_all_expanded(uow: UOWDependency, user: User) -> CartExpanded:
+        """Get the user's cart with its products and total price.
+
+        The cart items and their products are read with one joined
+        query.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user for whom to retrieve the cart.
+
+        Returns:
+            CartExpanded: The cart items with their products and the
+                total price.
+        """
+        async with uow:
+            items = await uow.cart.get_all_with_products(user)
+        return CartExpanded(
+            items=items, total_price=sum(item.price for item in items)
+        )
 
     @staticmethod
     async def get(uow: UOWDependency, product_id: int, user: User):
@@ -145,8 +298,8 @@ class CartService:
                 detail="Product not found",
             )
 
+    @staticmethod
     async def update(
-        self,
         uow: UOWDependency,
         product_id: int,
         product: CartUpdate,
@@ -154,6 +307,8 @@ class CartService:
     ):
         """Update the quantity of a product in the user's cart.
 
+        The line is updated and repriced by a single statement.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             product_id (int): The ID of the product to update.
@@ -163,21 +318,49 @@ class CartService:
         Returns:
             int: The updated product ID.
         """
-        product_dict = product.model_dump()
-        is_product_in_cart, _product = await self.is_in_cart(
-            uow, product_id, user
-        )
-        if is_product_in_cart is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found",
-            )
-        product_dict["price"] = _product.price * product.quantity
         async with uow:
-            await uow.cart.update_by_product_id(product_id, product_dict, user)
+            updated = await uow.cart.update_quantity(
+                product_id, product.quantity, user
+            )
+            if updated is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Product not found",
+                )
             await uow.commit()
             return product_id
 
+    @staticmethod
+    async def update_many(
+        uow: UOWDependency, items: List[CartItemUpdate], user: User
+    ) -> List[CartItemOutcome]:
+        """Update the quantities of many products in the user's cart.
+
+        All lines are updated and repriced by a single statement and
+        committed once.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            items (List[CartItemUpdate]): The products and their new
+                quantities, each product once.
+            user (User): The owner of the cart.
+
+        Returns:
+            List[CartItemOutcome]: The outcome of each product, in
+                request order.
+        """
+        quantities = {item.product_id: item.quantity for item in items}
+        async with uow:
+            updated = set(await uow.cart.update_quantities(quantities, user))
+            await uow.commit()
+        return [
+            CartItemOutcome(
+                product_id=product_id,
+                status="updated" if product_id in updated else "not_found",
+            )
+            for product_id in quantities
+        ]
+
     @staticmethod
     async def delete(uow: UOWDependency, product_id: int, user: User):
         """Remove a product from the user's cart.
@@ -197,6 +380,37 @@ class CartService:
             await uow.commit()
             return result
 
+    @staticmethod
+    async def delete_many(
+        uow: UOWDependency, product_ids: List[int], user: User
+    ) -> List[CartItemOutcome]:
+        """Remove many products from the user's cart.
+
+        All lines are deleted by a single statement and committed once.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            product_ids (List[int]): The IDs of the products to
+                remove, each product once.
+            user (User): The owner of the cart.
+
+        Returns:
+            List[CartItemOutcome]: The outcome of each product, in
+                request order.
+        """
+        async with uow:
+            deleted = set(
+                await uow.cart.delete_by_product_ids(product_ids, user)
+            )
+            await uow.commit()
+        return [
+            CartItemOutcome(
+                product_id=product_id,
+                status="deleted" if product_id in deleted else "not_found",
+            )
+            for product_id in product_ids
+        ]
+
     @staticmethod
     async def delete_all(uow: UOWDependency, user: User):
         """Remove all products from the user's cart.
@@ -233,27 +447,3 @@ class CartService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cart is empty",
             )
-
-    @staticmethod
-    async def is_in_cart(uow, product_id, user):
-        """Check if a product is already in the user's cart.
-
-        Args:
-            uow: The unit of work dependency.
-            product_id: The ID of the product to check.
-            user: The user for whom to check the cart.
-
-        Returns:
-            tuple: A tuple containing a boolean indicating if the
-                product is in the cart and the product information.
-        """
-        try:
-            _product = await ProductsService().get(uow, product_id, user)
-        except NoResultFound:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found",
-            )
-
-        is_product_in_cart = await uow.cart.get_by_product_id(product_id, user)
-        return is_product_in_cart, _product
@@ -3,6 +3,7 @@
 from typing import Any, Dict, Optional, Union
 
 from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
     BaseUserManager,
     IntegerIDMixin,
@@ -16,7 +17,8 @@ from app.models import User
 from app.repositories.users import UsersRepository
 from app.services.validators import PasswordValidator, TelephoneValidator
 from app.settings import config
-from app.settings.auth import get_user_table
+from app.settings.auth import get_user_table, invalidate_cached_user
+from app.utils.hashing import password_hasher
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int], UsersRepository):
@@ -104,7 +106,7 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int], UsersRepository):
         )
         password = user_dict.pop("password")
         user_dict.pop("confirm_password")
-        user_dict["hashed_password"] = self.password_helper.hash(password)
+        user_dict["hashed_password"] = await password_hasher.hash(password)
         try:
             created_user = await self.user_db.create(user_dict)
         except IntegrityError as e:
@@ -143,13 +145,62 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int], UsersRepository):
                 await self.validate_password(value, update_dict)
                 validated_update_dict[
                     "hashed_password"
-                ] = self.password_helper.hash(value)
+                ] = await password_hasher.hash(value)
             elif field == "telephone" and value is not None:
                 await self.validate_telephone(update_dict)
                 validated_update_dict[field] = value
             else:
                 validated_update_dict[field] = value
-        return await self.user_db.update(user, validated_update_dict)
+        updated_user = await self.user_db.update(user, validated_update_dict)
+        await invalidate_cached_user(user.id)
+        return updated_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[models.UP]:
+        """Authenticate a user by email and password.
+
+        The password is verified on the password hashing executor so
+        that logins do not block the event loop.
+
+        Args:
+            credentials (OAuth2PasswordRequestForm): The login form.
+
+        Returns:
+            Optional[models.UP]: The user, or None if the credentials
+                are invalid.
+
+        Raises:
+            HTTPException: If the password hashing executor is
+                saturated.
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway so that unknown emails take as long to reject
+            await password_hasher.hash(credentials.password)
+            return None
+
+        verified, updated_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_hash})
+            await invalidate_cached_user(user.id)
+        return user
+
+    async def on_after_delete(
+        self, user: models.UP, request: Optional[Request] = None
+    ) -> None:
+        """Drop a deleted user from the authenticated user cache.
+
+        Args:
+            user (models.UP): The deleted user.
+            request (Optional[Request]): The request object.
+        """
+        await invalidate_cached_user(user.id)
 
 
 async def get_user_manager(user_db=Depends(get_user_table)):
@@ -1,8 +1,34 @@
 """Service class for handling product-related operations."""
 
+import re
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
 from app.api.v1.dependencies import UOWDependency
 from app.models import User
-from app.schemas.products import ProductsCreate, ProductsUpdate
+from app.schemas.products import (
+    ProductFilter,
+    ProductImportError,
+    ProductImportResult,
+    ProductRead,
+    ProductsCreate,
+    ProductsUpdate,
+)
+from app.services.repricing import cart_repricer
+from app.settings import config
+from app.utils.exports import EXPORT_ENCODERS, batched, parquet_available
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import dumps, rows_to_dicts
+from app.utils.uploads import (
+    CSV_MEDIA_TYPES,
+    NDJSON_MEDIA_TYPES,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+)
 
 
 class ProductsService:
@@ -32,6 +58,84 @@ class ProductsService:
             await uow.commit()
             return product_id
 
+    @staticmethod
+    async def import_products(
+        uow: UOWDependency,
+        user: User,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+    ) -> ProductImportResult:
+        """Import products from a streamed CSV or NDJSON upload.
+
+        Rows are validated one by one and loaded in chunks of
+        ``PRODUCTS_IMPORT_CHUNK_SIZE`` with ``COPY``. Invalid rows are
+        counted and reported, up to ``PRODUCTS_IMPORT_MAX_ERRORS``,
+        without aborting the import. The valid rows are committed
+        together at the end of the upload.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user importing the products.
+            chunks (AsyncIterator[bytes]): The body of the upload.
+            content_type (str): The content type of the upload.
+
+        Returns:
+            ProductImportResult: The number of imported and rejected
+                rows and the first errors.
+
+        Raises:
+            HTTPException: If the content type is not supported or the
+                upload is malformed as a whole.
+        """
+        media_type = content_type.split(";")[0].strip().lower()
+        lines = iter_lines(chunks, config.PRODUCTS_IMPORT_MAX_LINE_LENGTH)
+        if media_type in CSV_MEDIA_TYPES:
+            records = iter_csv_records(
+                lines, config.PRODUCTS_IMPORT_MAX_LINE_LENGTH
+            )
+        elif media_type in NDJSON_MEDIA_TYPES:
+            records = iter_ndjson_records(lines)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Expected a CSV or NDJSON upload",
+            )
+
+        result = ProductImportResult()
+        batch = []
+        async with uow:
+            async for line, record, error in records:
+                if error is None:
+                    try:
+                        product = ProductsCreate.model_validate(record)
+                    except ValidationError as validation_error:
+                        error = "; ".join(
+                            f"{'.'.join(map(str, detail['loc']))}: "
+                            f"{detail['msg']}"
+                            for detail in validation_error.errors()
+                        )
+                if error is not None:
+                    result.failed += 1
+                    if len(result.errors) < config.PRODUCTS_IMPORT_MAX_ERRORS:
+                        result.errors.append(
+                            ProductImportError(line=line, error=error)
+                        )
+                    continue
+
+                batch.append(
+                    {
+                        **product.model_dump(),
+                        "owner_id": user.id,
+                        "is_active": False,
+                    }
+                )
+                if len(batch) >= config.PRODUCTS_IMPORT_CHUNK_SIZE:
+                    result.imported += await uow.products.copy_many(batch)
+                    batch = []
+            result.imported += await uow.products.copy_many(batch)
+            await uow.commit()
+        return result
+
     @staticmethod
     async def get_all(uow: UOWDependency, user: User):
         """Get all products for a given user.
@@ -50,13 +154,204 @@ class ProductsService:
             return await uow.products.get_all(user)
 
     @staticmethod
-    async def get(uow: UOWDependency, product_id: int, user: User):
+    async def get_page(
+        uow: UOWDependency,
+        user: User,
+        limit: int,
+        after: Optional[str] = None,
+        filters: Optional[ProductFilter] = None,
+    ) -> bytes:
+        """Get a filtered and sorted page of products for a given user.
+
+        The page is serialized straight from the rows; see
+        ``app.utils.serialization``.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user for whom to retrieve products.
+            limit (int): The maximum number of products to return.
+            after (Optional[str]): The cursor returned with the
+                previous page, for the same filters.
+            filters (Optional[ProductFilter]): The filters and order,
+                oldest first by default.
+
+        Returns:
+            bytes: The JSON encoded ``ProductPage``.
+
+        Raises:
+            HTTPException: If the cursor is invalid.
+        """
+        filters = filters or ProductFilter()
+        after_key = None
+        if after is not None:
+            try:
+                value, product_id = decode_cursor(after)
+                if filters.sort_column == "price":
+                    value = float(value)
+                else:
+                    value = datetime.fromisoformat(value)
+                after_key = (value, int(product_id))
+            except (TypeError, ValueError) as error:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor",
+                ) from error
+
+        async with uow:
+            rows, next_key = await uow.products.get_page(
+                user, limit, after_key, filters
+            )
+        return ProductsService._encode_page(rows, next_key)
+
+    @staticmethod
+    async def get_version(uow: UOWDependency, user: User) -> tuple:
+        """Get the version of the products of a given user.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The owner of the products.
+
+        Returns:
+            tuple: The last modification time and the number of
+                products.
+        """
+        async with uow:
+            return await uow.products.get_version(user)
+
+    @staticmethod
+    async def search(
+        uow: UOWDependency,
+        user: User,
+        q: str,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> bytes:
+        """Search the products of a given user.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user whose products are searched.
+            q (str): The search text; every word must match the start
+                of a word of the name or the description.
+            limit (int): The maximum number of products to return.
+            after (Optional[str]): The cursor returned with the
+                previous page.
+
+        Returns:
+            bytes: The JSON encoded ``ProductPage`` of the best
+                matching products.
+
+        Raises:
+            HTTPException: If the cursor is invalid.
+        """
+        after_key = None
+        if after is not None:
+            try:
+                rank, product_id = decode_cursor(after)
+                after_key = (float(rank), int(product_id))
+            except (TypeError, ValueError) as error:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor",
+                ) from error
+
+        terms = re.findall(r"[^\W_]+", q.lower())
+        if not terms:
+            return ProductsService._encode_page([], None)
+        async with uow:
+            rows, next_key = await uow.products.search(
+                user, terms, limit, after_key
+            )
+        return ProductsService._encode_page(rows, next_key)
+
+    @staticmethod
+    def _encode_page(rows, next_key) -> bytes:
+        """Serialize product rows and a sort key as a ``ProductPage``."""
+        return dumps(
+            {
+                "items": rows_to_dicts(list(ProductRead.model_fields), rows),
+                "next_cursor": encode_cursor(*next_key) if next_key else None,
+            }
+        )
+
+    @staticmethod
+    def stream_all(uow: UOWDependency, user: User) -> AsyncIterator[bytes]:
+        """Stream all products of a given user as NDJSON.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user for whom to retrieve products.
+
+        Returns:
+            AsyncIterator[bytes]: The products, one JSON object per
+                line.
+        """
+        return ProductsService.export(uow, user, "ndjson")
+
+    @staticmethod
+    def export(
+        uow: UOWDependency, user: User, export_format: str
+    ) -> AsyncIterator[bytes]:
+        """Export all products of a given user.
+
+        Rows are read with a server-side cursor and encoded straight
+        from the column tuples, ``STREAM_CHUNK_SIZE`` rows at a time.
+        The unit of work is entered by the returned generator, so the
+        session stays open while the response is being sent.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            user (User): The user for whom to export products.
+            export_format (str): ``"csv"``, ``"ndjson"`` or
+                ``"parquet"``.
+
+        Returns:
+            AsyncIterator[bytes]: The encoded file, piece by piece.
+
+        Raises:
+            HTTPException: If Parquet is requested but ``pyarrow`` is
+                not installed.
+        """
+        if export_format == "parquet" and not parquet_available():
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Parquet export is not available",
+            )
+        return ProductsService._export(
+            uow, user, EXPORT_ENCODERS[export_format]
+        )
+
+    @staticmethod
+    async def _export(
+        uow: UOWDependency, user: User, encoder
+    ) -> AsyncIterator[bytes]:
+        """Encode the products of a user with the given encoder."""
+        async with uow:
+            rows = uow.products.stream_all(user, config.STREAM_CHUNK_SIZE)
+            columns = uow.products.read_columns
+            async for chunk in encoder(
+                columns, batched(rows, config.STREAM_CHUNK_SIZE)
+            ):
+                yield chunk
+
+    @staticmethod
+    async def get(
+        uow: UOWDependency,
+        product_id: int,
+        user: User,
+        updated_at: Optional[datetime] = None,
+    ):
         """Get a specific product by ID for a given user.
 
+        Products are served from the product cache when possible.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             product_id (int): The ID of the product to retrieve.
             user (User): The user for whom to retrieve the product.
+            updated_at (Optional[datetime]): The modification time read
+                from the database; a cached product of another version
+                is not served.
 
         Returns:
             Product: The retrieved product.
@@ -66,7 +361,33 @@ class ProductsService:
                 product is not found.
         """
         async with uow:
-            return await uow.products.get(product_id, user)
+            return await uow.products.get(product_id, user, updated_at)
+
+    @staticmethod
+    async def get_updated_at(
+        uow: UOWDependency, product_id: int, user: User
+    ) -> datetime:
+        """Get the modification time of a product from the database.
+
+        Args:
+            uow (UOWDependency): The unit of work dependency.
+            product_id (int): The ID of the product.
+            user (User): The owner of the product.
+
+        Returns:
+            datetime: The modification time of the product.
+
+        Raises:
+            HTTPException: If the product is not found.
+        """
+        async with uow:
+            updated_at = await uow.products.get_updated_at(product_id, user)
+        if updated_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found",
+            )
+        return updated_at
 
     @staticmethod
     async def update(
@@ -77,6 +398,10 @@ class ProductsService:
     ):
         """Update a specific product by ID for a given user.
 
+        When the price changes, the cart lines holding the product are
+        repriced in the same transaction if they are few; otherwise a
+        job repricing them in batches is enqueued in that transaction.
+
         Args:
             uow (UOWDependency): The unit of work dependency.
             product_id (int): The ID of the product to update.
@@ -92,9 +417,20 @@ class ProductsService:
         """
         product_dict = product.model_dump()
         async with uow:
+            previous_price = await uow.products.get_price_for_update(
+                product_id, user
+            )
+            if previous_price is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Product not found",
+                )
             await uow.products.update(product_id, product_dict, user)
+            if product.price != previous_price:
+                await cart_repricer.reprice(uow, product_id)
             await uow.commit()
-            return product_id
+            await uow.products.invalidate(product_id, user)
+        return product_id
 
     @staticmethod
     async def delete(uow: UOWDependency, product_id: int, user: User):
@@ -115,4 +451,5 @@ class ProductsService:
         async with uow:
             result = await uow.products.delete(product_id, user)
             await uow.commit()
+            await uow.products.invalidate(product_id, user)
             return result
@@ -0,0 +1,223 @@
+"""Repricing of the cart lines of products whose price changed.
+
+``Cart.price`` is a snapshot of the product price times the quantity,
+so a price change must be carried to every cart holding the product.
+The lines are repriced by one set-based UPDATE: inline, in the
+transaction updating the product, when the product is in few carts;
+otherwise by a background job, enqueued in that transaction, in short
+batches committed one by one, so that no transaction holds many cart
+row locks under load.
+"""
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy import exc
+
+from app.api.v1.dependencies import UOWDependency
+from app.settings import config
+from app.utils.jobs import job_registry
+from app.utils.unitofwork import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# Raised by asyncpg when lock_timeout expires
+LOCK_NOT_AVAILABLE = "LockNotAvailableError"
+
+REPRICE_CART_JOB = "cart.reprice"
+REPRICING_QUEUE = "repricing"
+
+
+class CartRepricer:
+    """Reprice the cart lines of products, inline or in batches.
+
+    Args:
+        inline_limit (int): The largest number of lines repriced in the
+            transaction of the product update.
+        batch_size (int): The number of lines per batch.
+        batch_pause (float): The seconds to wait between batches.
+        lock_timeout_ms (int): How long a batch may wait for a row
+            lock before it is retried.
+        max_retries (int): The number of consecutive lock timeouts
+            after which a batched run fails, to be retried as a job.
+
+    Attributes:
+        inline_runs (int): The price changes repriced inline.
+        deferred_runs (int): The price changes deferred to a job.
+        failed_runs (int): The batched runs that failed.
+        lines_repriced (int): The cart lines repriced.
+        batches (int): The batches committed.
+        lock_timeouts (int): The batches that timed out on a lock.
+        max_batch_seconds (float): The longest batch or inline update.
+    """
+
+    def __init__(
+        self,
+        inline_limit: int,
+        batch_size: int,
+        batch_pause: float,
+        lock_timeout_ms: int,
+        max_retries: int,
+    ):
+        self.inline_limit = inline_limit
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.lock_timeout_ms = lock_timeout_ms
+        self.max_retries = max_retries
+        self.inline_runs = 0
+        self.deferred_runs = 0
+        self.failed_runs = 0
+        self.lines_repriced = 0
+        self.batches = 0
+        self.lock_timeouts = 0
+        self.max_batch_seconds = 0.0
+
+    async def reprice(self, uow: UOWDependency, product_id: int) -> bool:
+        """Reprice the lines of a product, or enqueue their repricing.
+
+        Must run in the transaction changing the product price, so the
+        new price is committed together with the repriced lines or, if
+        the product is in too many carts, with the job repricing them.
+
+        Args:
+            uow (UOWDependency): The unit of work updating the product.
+            product_id (int): The ID of the product.
+
+        Returns:
+            bool: True if the repricing was deferred to a job.
+        """
+        fan_out = await uow.cart.count_by_product_id(
+            product_id, self.inline_limit + 1
+        )
+        if fan_out > self.inline_limit:
+            await job_registry.enqueue(
+                uow, REPRICE_CART_JOB, {"product_id": product_id}
+            )
+            self.deferred_runs += 1
+            return True
+
+        started = time.perf_counter()
+        repriced = await uow.cart.reprice_by_product_id(product_id)
+        elapsed = time.perf_counter() - started
+        self.inline_runs += 1
+        self.lines_repriced += len(repriced)
+        self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
+        if repriced:
+            logger.info(
+                "Repriced %d cart lines of product %d inline in %.1f ms",
+                len(repriced),
+                product_id,
+                elapsed * 1000,
+            )
+        return False
+
+    async def reprice_in_batches(self, product_id: int) -> int:
+        """Reprice all the lines of a product in short transactions.
+
+        The lines are walked by ID, ``batch_size`` at a time, each
+        batch committed on its own with a lock timeout. A batch timing
+        out on a row lock is retried after a growing pause; after
+        ``max_retries`` consecutive timeouts the run fails. As the
+        repricing is idempotent, the job running it can then be
+        retried from the start.
+
+        Args:
+            product_id (int): The ID of the product.
+
+        Returns:
+            int: The number of lines repriced.
+
+        Raises:
+            DBAPIError: If a batch fails, or times out on a row lock
+                more than ``max_retries`` times in a row.
+        """
+        started = time.perf_counter()
+        after_id = 0
+        total = 0
+        batches = 0
+        retries = 0
+        while True:
+            batch_started = time.perf_counter()
+            try:
+                async with UnitOfWork() as uow:
+                    repriced = await uow.cart.reprice_by_product_id(
+                        product_id,
+                        after_id,
+                        self.batch_size,
+                        lock_timeout_ms=self.lock_timeout_ms,
+                    )
+                    await uow.commit()
+            except exc.DBAPIError as error:
+                lock_timeout = LOCK_NOT_AVAILABLE in str(error.orig)
+                if lock_timeout:
+                    self.lock_timeouts += 1
+                if not lock_timeout or retries >= self.max_retries:
+                    self.failed_runs += 1
+                    logger.error(
+                        "Repricing of product %d failed after %d lines",
+                        product_id,
+                        total,
+                    )
+                    raise
+                retries += 1
+                await asyncio.sleep(self.batch_pause * 2**retries)
+                continue
+
+            retries = 0
+            batches += 1
+            total += len(repriced)
+            self.batches += 1
+            self.lines_repriced += len(repriced)
+            self.max_batch_seconds = max(
+                self.max_batch_seconds, time.perf_counter() - batch_started
+            )
+            if len(repriced) < self.batch_size:
+                break
+            after_id = max(repriced)
+            await asyncio.sleep(self.batch_pause)
+
+        logger.info(
+            "Repriced %d cart lines of product %d in %d batches in %.1f ms",
+            total,
+            product_id,
+            batches,
+            (time.perf_counter() - started) * 1000,
+        )
+        return total
+
+    def stats(self) -> dict:
+        """Get the repricing counters.
+
+        Returns:
+            dict: The runs, lines, batches and lock timeouts so far,
+                and the longest batch in seconds.
+        """
+        return {
+            "inline_runs": self.inline_runs,
+            "deferred_runs": self.deferred_runs,
+            "failed_runs": self.failed_runs,
+            "lines_repriced": self.lines_repriced,
+            "batches": self.batches,
+            "lock_timeouts": self.lock_timeouts,
+            "max_batch_seconds": self.max_batch_seconds,
+        }
+
+
+cart_repricer = CartRepricer(
+    inline_limit=config.CART_REPRICE_INLINE_LIMIT,
+    batch_size=config.CART_REPRICE_BATCH_SIZE,
+    batch_pause=config.CART_REPRICE_BATCH_PAUSE,
+    lock_timeout_ms=config.CART_REPRICE_LOCK_TIMEOUT_MS,
+    max_retries=config.CART_REPRICE_MAX_RETRIES,
+)
+
+
+@job_registry.job(REPRICE_CART_JOB, queue=REPRICING_QUEUE)
+async def reprice_cart(payload: dict) -> None:
+    """Reprice the cart lines of a product in batches.
+
+    Args:
+        payload (dict): The ``product_id`` of the product.
+    """
+    await cart_repricer.reprice_in_batches(payload["product_id"])
@@ -3,8 +3,11 @@
 import re
 
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from starlette import status
 
+from app.models.cart import CART_PRODUCT_UNIQUE_CONSTRAINT
+
 
 class PasswordValidator:
     """Validator for checking the validity of passwords.
@@ -53,17 +56,22 @@ class TelephoneValidator:
 class ProductInCartValidator:
     """Validator for checking if a product is already in the cart.
 
+    The check is backed by the unique ``(owner_id, product_id)``
+    constraint of the cart table: the row is inserted and a violation
+    of that constraint is translated into a conflict.
+
     Args:
-        product: The product to check.
+        error (IntegrityError): The error raised by the insert.
 
     Raises:
         HTTPException: If the product is already in the cart.
+        IntegrityError: If another constraint was violated.
     """
 
-    def __call__(self, product):
-        if product is not None:
+    def __call__(self, error: IntegrityError):
+        if CART_PRODUCT_UNIQUE_CONSTRAINT in str(error.orig):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Product is already in cart",
-            )
-        return True
+            ) from error
+        raise error
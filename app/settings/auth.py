@@ -1,24 +1,119 @@
 """Authentication settings for the FastAPI Users package."""
 
-from typing import Annotated
+from typing import Annotated, Optional
 
+import jwt
 from fastapi import Depends
+from fastapi_users import exceptions
 from fastapi_users.authentication import (
     AuthenticationBackend,
     CookieTransport,
     JWTStrategy,
 )
+from fastapi_users.jwt import decode_jwt
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.db.db import get_async_session
 from app.models import User
 from app.settings import config
+from app.utils.cache import LRUCache
 
 cookie_transport = CookieTransport(
     cookie_max_age=3600, cookie_name="unimartcookie"
 )
 
+user_cache = LRUCache(
+    maxsize=config.AUTH_USER_CACHE_MAXSIZE, ttl=config.AUTH_USER_CACHE_TTL
+)
+
+
+async def invalidate_cached_user(user_id: int) -> None:
+    """Remove a user from the authenticated user cache.
+
+    Must be called whenever the user is updated, deactivated, deleted
+    or logs out.
+
+    Args:
+        user_id (int): The ID of the user.
+    """
+    await user_cache.delete(str(user_id))
+
+
+class CachedJWTStrategy(JWTStrategy):
+    """JWT strategy caching the users it authenticates.
+
+    The token is still decoded and verified on every request, but the
+    user row is loaded only on a cache miss. Entries are plain column
+    snapshots and every hit builds a new detached ``User``, so requests
+    never share an instance. The cache is local to the worker process;
+    its short TTL bounds how long other workers may serve a stale user.
+    """
+
+    async def read_token(
+        self, token: Optional[str], user_manager
+    ) -> Optional[User]:
+        """Get the user of a token, from the cache when possible.
+
+        Args:
+            token (Optional[str]): The JWT read from the cookie.
+            user_manager: The user manager.
+
+        Returns:
+            Optional[User]: The authenticated user, or None if the
+                token is invalid or the user does not exist.
+        """
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(
+                token,
+                self.decode_key,
+                self.token_audience,
+                algorithms=[self.algorithm],
+            )
+            user_id = user_manager.parse_id(data.get("sub"))
+        except (jwt.PyJWTError, exceptions.InvalidID):
+            return None
+
+        snapshot = await user_cache.get(str(user_id))
+        if snapshot is not None:
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return user
+
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+        # The session is shared with the unit of work of the request:
+        # detach the user so its commits and rollbacks leave it loaded
+        user_manager.user_db.session.expunge(user)
+        await user_cache.set(
+            str(user_id),
+            {
+                attribute.key: getattr(user, attribute.key)
+                for attribute in inspect(User).column_attrs
+            },
+        )
+        return user
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        """Drop the user from the cache on logout.
+
+        Args:
+            token (str): The JWT of the session.
+            user (User): The user logging out.
+
+        Raises:
+            StrategyDestroyNotSupportedError: Always, as a JWT cannot
+                be revoked.
+        """
+        await invalidate_cached_user(user.id)
+        await super().destroy_token(token, user)
+
 
 def get_jwt_strategy() -> JWTStrategy:
     """Get the JWT (JSON Web Token) authentication strategy.
@@ -26,7 +121,7 @@ def get_jwt_strategy() -> JWTStrategy:
     Returns:
         JWTStrategy: The JWT authentication strategy.
     """
-    return JWTStrategy(secret=config.JWT_SECRET, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=config.JWT_SECRET, lifetime_seconds=3600)
 
 
 auth_backend = AuthenticationBackend(
@@ -41,6 +136,9 @@ async def get_user_table(
 ):
     """Get the SQLAlchemyUserDatabase instance for the User model.
 
+    The session is the one of the request, shared with its unit of
+    work.
+
     Args:
         session (AsyncSession): The asynchronous database session.
 
@@ -60,6 +60,42 @@ class Config:
 
     DATABASE_URI = DATABASE_DRIVER + DATABASE_LOGIN + DATABASE_CONNECT
 
+    # Database engine and connection pool (per worker process)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() in (
+        "true",
+        "1",
+        "True",
+    )
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    DB_SERVER_SETTINGS: ClassVar[dict[str, str]] = {
+        "application_name": os.getenv("DB_APPLICATION_NAME", "unimart"),
+        "statement_timeout": os.getenv("DB_STATEMENT_TIMEOUT", "0"),
+    }
+
+    # Read replicas: comma-separated URIs, empty to read from the primary
+    DATABASE_REPLICA_URIS = tuple(
+        uri.strip()
+        for uri in os.getenv("DATABASE_REPLICA_URIS", "").split(",")
+        if uri.strip()
+    )
+    # "round_robin" or "least_connections"
+    DB_REPLICA_SELECTION = os.getenv("DB_REPLICA_SELECTION", "round_robin")
+    DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "1"))
+    DB_REPLICA_LAG_CHECK_INTERVAL = float(
+        os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "5")
+    )
+    # Seconds the reads of a user stay on the primary after a write
+    DB_READ_YOUR_WRITES_SECONDS = float(
+        os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5")
+    )
+    DB_READ_YOUR_WRITES_MAXSIZE = int(
+        os.getenv("DB_READ_YOUR_WRITES_MAXSIZE", "100000")
+    )
+
     # Test database
     TEST_POSTGRES_DB = os.getenv("TEST_POSTGRES_DB")
     TEST_POSTGRES_USER = os.getenv("TEST_POSTGRES_USER")
@@ -76,6 +112,96 @@ class Config:
     TEST_DATABASE_URI = (
         TEST_DATABASE_DRIVER + TEST_DATABASE_LOGIN + TEST_DATABASE_CONNECT
     )
+    # A second local instance or database; the test database by default
+    TEST_DATABASE_REPLICA_URI = os.getenv(
+        "TEST_DATABASE_REPLICA_URI", TEST_DATABASE_URI
+    )
+
+    # Pagination and streaming
+    PRODUCTS_PAGE_SIZE = int(os.getenv("PRODUCTS_PAGE_SIZE", "50"))
+    PRODUCTS_MAX_PAGE_SIZE = int(os.getenv("PRODUCTS_MAX_PAGE_SIZE", "500"))
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+    # Largest number of cart items changed by one batch request
+    CART_BATCH_MAX_ITEMS = int(os.getenv("CART_BATCH_MAX_ITEMS", "500"))
+
+    # Cart repricing after a product price change: up to the inline
+    # limit, lines are repriced with the product update, beyond it in
+    # batches run by a background job
+    CART_REPRICE_INLINE_LIMIT = int(
+        os.getenv("CART_REPRICE_INLINE_LIMIT", "500")
+    )
+    CART_REPRICE_BATCH_SIZE = int(os.getenv("CART_REPRICE_BATCH_SIZE", "1000"))
+    CART_REPRICE_BATCH_PAUSE = float(
+        os.getenv("CART_REPRICE_BATCH_PAUSE", "0.05")
+    )
+    CART_REPRICE_LOCK_TIMEOUT_MS = int(
+        os.getenv("CART_REPRICE_LOCK_TIMEOUT_MS", "1000")
+    )
+    CART_REPRICE_MAX_RETRIES = int(os.getenv("CART_REPRICE_MAX_RETRIES", "5"))
+
+    # Background jobs. Workers run in the application process when
+    # enabled, or alone with ``python -m app.commands.jobs run``.
+    # JOBS_QUEUES lists the queues taken, with the number of jobs each
+    # runs at once per process, as "name:concurrency,..."
+    JOBS_WORKER_ENABLED = os.getenv("JOBS_WORKER_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "True",
+    )
+    JOBS_QUEUES = os.getenv("JOBS_QUEUES", "default:4,repricing:1")
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))
+    JOBS_LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "300"))
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+    JOBS_RETRY_BASE_DELAY = float(os.getenv("JOBS_RETRY_BASE_DELAY", "1.0"))
+    JOBS_RETRY_MAX_DELAY = float(os.getenv("JOBS_RETRY_MAX_DELAY", "300"))
+    JOBS_SHUTDOWN_TIMEOUT = float(os.getenv("JOBS_SHUTDOWN_TIMEOUT", "10"))
+
+    # Bulk product import
+    PRODUCTS_IMPORT_CHUNK_SIZE = int(
+        os.getenv("PRODUCTS_IMPORT_CHUNK_SIZE", "1000")
+    )
+    PRODUCTS_IMPORT_MAX_ERRORS = int(
+        os.getenv("PRODUCTS_IMPORT_MAX_ERRORS", "100")
+    )
+    PRODUCTS_IMPORT_MAX_LINE_LENGTH = int(
+        os.getenv("PRODUCTS_IMPORT_MAX_LINE_LENGTH", "65536")
+    )
+
+    # SQL instrumentation and metrics
+    INSTRUMENTATION_ENABLED = os.getenv(
+        "INSTRUMENTATION_ENABLED", "True"
+    ).lower() in ("true", "1", "True")
+    SLOW_QUERY_THRESHOLD_MS = float(
+        os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")
+    )
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+
+    # Response compression
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "True",
+    )
+    COMPRESSION_MINIMUM_SIZE = int(
+        os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")
+    )
+    # Most preferred first; br and zstd need brotli and zstandard
+    COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip")
+    COMPRESSION_LEVELS: ClassVar[dict[str, int]] = {
+        "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        "br": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+        "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    }
+
+    # Product cache, in Redis when a URL is set; the in-process cache
+    # is not invalidated across workers, so it is opt-in
+    PRODUCT_CACHE_REDIS_URL = os.getenv("PRODUCT_CACHE_REDIS_URL")
+    PRODUCT_CACHE_ENABLED = os.getenv(
+        "PRODUCT_CACHE_ENABLED", str(bool(PRODUCT_CACHE_REDIS_URL))
+    ).lower() in ("true", "1", "True")
+    PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "60"))
+    PRODUCT_CACHE_MAXSIZE = int(os.getenv("PRODUCT_CACHE_MAXSIZE", "10000"))
 
     # Allowed hosts
     ALLOWED_HOSTS: ClassVar = ["*"]
@@ -102,6 +228,12 @@ class Config:
 
     COOKIE_MAX_AGE = 3600
 
+    # Authenticated user cache (per worker process)
+    AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+    AUTH_USER_CACHE_MAXSIZE = int(
+        os.getenv("AUTH_USER_CACHE_MAXSIZE", "10000")
+    )
+
     # jwt secret and algorithm
     JWT_SECRET = "$CekpeTHo$"
     JWT_ALGORITHM = "HS256"
@@ -112,6 +244,15 @@ class Config:
     PWD_HASH_ITERATIONS = 100_000
     DK_LEN = 32
 
+    # Password hashing executor ("thread" or "process")
+    PASSWORD_HASHER_EXECUTOR = os.getenv("PASSWORD_HASHER_EXECUTOR", "thread")
+    PASSWORD_HASHER_WORKERS = int(
+        os.getenv("PASSWORD_HASHER_WORKERS", str(os.cpu_count() or 1))
+    )
+    PASSWORD_HASHER_MAX_PENDING = int(
+        os.getenv("PASSWORD_HASHER_MAX_PENDING", "64")
+    )
+
 
 class DevelopmentConfig(Config):
     """Development-specific configuration class.
@@ -121,10 +262,17 @@ class DevelopmentConfig(Config):
     Attributes:
         DEBUG (bool): Indicates whether the application is in debug
             mode (set to True in development).
+        DB_POOL_SIZE (int): The number of pooled database connections
+            (small in development).
+        DB_MAX_OVERFLOW (int): The number of connections allowed above
+            the pool size.
     """
 
     DEBUG = True
 
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+
 
 class TestingConfig(Config):
     """Testing-specific configuration class.
@@ -135,10 +283,25 @@ class TestingConfig(Config):
         DEBUG (bool): Indicates whether the application is in debug
             mode (set to True in testing).
         TESTING (bool): Indicates that the application is in testing mode.
+        PRODUCT_CACHE_ENABLED (bool): Whether product reads are cached
+            (off, as the tests recreate the tables and reuse the IDs).
+        DB_POOL_SIZE (int): The number of pooled database connections.
+        DB_MAX_OVERFLOW (int): The number of connections allowed above
+            the pool size.
+        DB_POOL_TIMEOUT (float): Seconds to wait for a connection
+            (short, so pool exhaustion fails tests fast).
+        JOBS_WORKER_ENABLED (bool): Whether the application runs the
+            job workers (off, tests run the jobs themselves).
     """
 
     DEBUG = True
     TESTING = True
+    PRODUCT_CACHE_ENABLED = False
+
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "2"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    JOBS_WORKER_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -149,10 +312,25 @@ class ProductionConfig(Config):
     Attributes:
         DEBUG (bool): Indicates whether the application is in debug
             mode (set to False in production).
+        DB_POOL_SIZE (int): The number of pooled database connections
+            per worker process.
+        DB_MAX_OVERFLOW (int): The number of connections allowed above
+            the pool size.
+        DB_POOL_TIMEOUT (float): Seconds to wait for a connection.
+        DB_SERVER_SETTINGS (dict): PostgreSQL session settings, with a
+            default statement timeout in production.
     """
 
     DEBUG = False
 
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_SERVER_SETTINGS: ClassVar[dict[str, str]] = {
+        "application_name": os.getenv("DB_APPLICATION_NAME", "unimart"),
+        "statement_timeout": os.getenv("DB_STATEMENT_TIMEOUT", "30000"),
+    }
+
 
 class ConfigFactory:
     """Factory class for obtaining the appropriate configuration class
@@ -0,0 +1,331 @@
+"""Cache backends used to avoid repeated database reads."""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class AbstractCache(ABC):
+    """Interface of an asynchronous key-value cache.
+
+    A read-through fill must not store a value read before a
+    concurrent invalidation, or the cache keeps serving the old value
+    until it expires. Every ``delete`` therefore bumps a version of
+    the cache; a fill reads ``version`` before reading the database
+    and stores its value with ``set_if_unchanged``.
+
+    Attributes:
+        hits (int): The number of lookups answered by the cache.
+        misses (int): The number of lookups not found in the cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value from the cache.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in the cache.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a value from the cache and bump its version.
+
+        Args:
+            key (str): The key of the value.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def version(self) -> Optional[int]:
+        """Get the number of invalidations of the cache so far.
+
+        Returns:
+            Optional[int]: The version, or None if it is unknown.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_if_unchanged(
+        self, key: str, value: Any, version: Optional[int]
+    ) -> bool:
+        """Store a value unless the cache was invalidated meanwhile.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+            version (Optional[int]): The version read before the value.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Get the hit and miss counters of the cache.
+
+        Returns:
+            dict: The counters.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class LRUCache(AbstractCache):
+    """In-process cache with a size bound and a time to live.
+
+    Invalidations reach only the process that makes them, so values
+    that other processes change must not be cached here.
+
+    Args:
+        maxsize (int): The maximum number of entries; the least
+            recently used entry is evicted first.
+        ttl (float): The number of seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return self._record(value)
+            del self._entries[key]
+        return self._record(None)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self.invalidations += 1
+
+    async def version(self) -> Optional[int]:
+        return self.invalidations
+
+    async def set_if_unchanged(
+        self, key: str, value: Any, version: Optional[int]
+    ) -> bool:
+        if version != self.invalidations:
+            return False
+        await self.set(key, value)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+
+class RedisCache(AbstractCache):
+    """Cache shared between processes, stored in Redis.
+
+    Values are Pydantic models serialized as JSON. Redis errors are
+    logged and treated as misses, so an unavailable Redis only costs
+    database reads.
+
+    The version is a counter in Redis, incremented in the same
+    transaction as each deletion. A fill watches it, so a deletion by
+    any process between the read of the version and the store aborts
+    the store.
+
+    Args:
+        client: The ``redis.asyncio`` client.
+        model (Type[BaseModel]): The model of the cached values.
+        ttl (float): The number of seconds an entry stays valid.
+        prefix (str): The prefix of the Redis keys.
+    """
+
+    def __init__(
+        self, client, model: Type[BaseModel], ttl: float, prefix: str
+    ):
+        super().__init__()
+        self.client = client
+        self.model = model
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = 0
+        self.version_key = f"{prefix}:invalidations"
+
+    @classmethod
+    def from_url(
+        cls, url: str, model: Type[BaseModel], ttl: float, prefix: str
+    ) -> "RedisCache":
+        """Create a cache connected to the Redis server at ``url``.
+
+        Raises:
+            ImportError: If the ``redis`` package is not installed.
+        """
+        from redis import asyncio as aioredis
+
+        return cls(aioredis.from_url(url), model, ttl, prefix)
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            payload = await self.client.get(f"{self.prefix}:{key}")
+        except Exception:
+            self.errors += 1
+            logger.exception("Redis cache read failed")
+            payload = None
+        if payload is None:
+            return self._record(None)
+        return self._record(self.model.model_validate_json(payload))
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await self.client.set(
+                f"{self.prefix}:{key}",
+                value.model_dump_json(),
+                px=int(self.ttl * 1000),
+            )
+        except Exception:
+            self.errors += 1
+            logger.exception("Redis cache write failed")
+
+    async def delete(self, key: str) -> None:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(f"{self.prefix}:{key}")
+                pipe.incr(self.version_key)
+                await pipe.execute()
+        except Exception:
+            self.errors += 1
+            logger.exception("Redis cache invalidation failed")
+
+    async def version(self) -> Optional[int]:
+        try:
+            return int(await self.client.get(self.version_key) or 0)
+        except Exception:
+            self.errors += 1
+            logger.exception("Redis cache read failed")
+            return None
+
+    async def set_if_unchanged(
+        self, key: str, value: Any, version: Optional[int]
+    ) -> bool:
+        from redis.exceptions import WatchError
+
+        if version is None:
+            return False
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(self.version_key)
+                current = int(await pipe.get(self.version_key) or 0)
+                if current != version:
+                    return False
+                pipe.multi()
+                pipe.set(
+                    f"{self.prefix}:{key}",
+                    value.model_dump_json(),
+                    px=int(self.ttl * 1000),
+                )
+                await pipe.execute()
+        except WatchError:
+            return False
+        except Exception:
+            self.errors += 1
+            logger.exception("Redis cache write failed")
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {**super().stats(), "errors": self.errors}
+
+
+class NullCache(AbstractCache):
+    """Cache that stores nothing, used when caching is disabled."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._record(None)
+
+    async def set(self, key: str, value: Any) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def version(self) -> Optional[int]:
+        return None
+
+    async def set_if_unchanged(
+        self, key: str, value: Any, version: Optional[int]
+    ) -> bool:
+        return False
+
+
+def create_cache(
+    enabled: bool,
+    maxsize: int,
+    ttl: float,
+    model: Type[BaseModel],
+    prefix: str,
+    redis_url: Optional[str] = None,
+) -> AbstractCache:
+    """Create a cache from configuration values.
+
+    With a Redis URL the cache is only in Redis, so an invalidation is
+    seen by every process at once. Without one, it is an in-process
+    cache, which suits a single worker process only.
+
+    Args:
+        enabled (bool): Whether caching is enabled.
+        maxsize (int): The size bound of the in-process cache.
+        ttl (float): The time to live of the entries, in seconds.
+        model (Type[BaseModel]): The model of the cached values.
+        prefix (str): The prefix of the shared cache keys.
+        redis_url (Optional[str]): The URL of a Redis server to share
+            the cache between processes.
+
+    Returns:
+        AbstractCache: The configured cache.
+    """
+    if not enabled:
+        return NullCache()
+    if redis_url:
+        return RedisCache.from_url(redis_url, model, ttl, prefix)
+    return LRUCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,289 @@
+"""Response compression with negotiated content encodings.
+
+``CompressionMiddleware`` compresses response bodies with the best
+encoding the client accepts among gzip and, when their optional
+modules are installed, brotli (``brotli``) and zstd (``zstandard``).
+Bodies are compressed chunk by chunk as they are sent, so streamed
+responses are never buffered whole.
+"""
+
+import zlib
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Media types that are already compressed
+INCOMPRESSIBLE_MEDIA_TYPES = (
+    "application/vnd.apache.parquet",
+    "application/gzip",
+    "application/zip",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+class Compressor:
+    """Incremental compressor for one response body.
+
+    Attributes:
+        compress (Callable[[bytes], bytes]): Compress a chunk; the
+            output may be buffered until later chunks.
+        finish (Callable[[], bytes]): Flush the remaining output and
+            end the stream.
+    """
+
+    def __init__(
+        self,
+        compress: Callable[[bytes], bytes],
+        finish: Callable[[], bytes],
+    ):
+        self.compress = compress
+        self.finish = finish
+
+
+def gzip_compressor(level: int) -> Compressor:
+    """Create a gzip compressor.
+
+    Args:
+        level (int): The compression level, from 1 to 9.
+
+    Returns:
+        Compressor: The compressor.
+    """
+    compressobj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return Compressor(compressobj.compress, compressobj.flush)
+
+
+def brotli_compressor(quality: int) -> Compressor:
+    """Create a brotli compressor.
+
+    Args:
+        quality (int): The compression quality, from 0 to 11.
+
+    Returns:
+        Compressor: The compressor.
+    """
+    compressor = brotli.Compressor(quality=quality)
+    return Compressor(compressor.process, compressor.finish)
+
+
+def zstd_compressor(level: int) -> Compressor:
+    """Create a zstd compressor.
+
+    Args:
+        level (int): The compression level, from 1 to 22.
+
+    Returns:
+        Compressor: The compressor.
+    """
+    compressobj = zstandard.ZstdCompressor(level=level).compressobj()
+    return Compressor(compressobj.compress, compressobj.flush)
+
+
+def available_encodings(
+    preferred: Iterable[str], levels: Dict[str, int]
+) -> Dict[str, Callable[[], Compressor]]:
+    """Get the compressor factories of the usable encodings.
+
+    Args:
+        preferred (Iterable[str]): The encodings, most preferred
+            first. Encodings whose module is missing are skipped.
+        levels (Dict[str, int]): The compression level per encoding.
+
+    Returns:
+        Dict[str, Callable[[], Compressor]]: The compressor factories,
+            in order of preference.
+    """
+    factories = {
+        "gzip": gzip_compressor,
+        "br": brotli_compressor if brotli is not None else None,
+        "zstd": zstd_compressor if zstandard is not None else None,
+    }
+    encodings = {}
+    for encoding in preferred:
+        factory = factories.get(encoding)
+        if factory is not None:
+            encodings[encoding] = partial(factory, levels[encoding])
+    return encodings
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Choose the content encoding of a response.
+
+    Args:
+        accept_encoding (str): The ``Accept-Encoding`` request header.
+        supported (List[str]): The encodings of the server, most
+            preferred first.
+
+    Returns:
+        Optional[str]: The most preferred supported encoding accepted
+            by the client, or None.
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    for encoding in supported:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies shorter than ``minimum_size``, responses that already have
+    a ``Content-Encoding`` and already compressed media types are sent
+    untouched. A strong ``ETag`` is made weak, as the compressed bytes
+    differ from the identity representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Dict[str, Callable[[], Compressor]],
+        minimum_size: int = 1024,
+    ):
+        self.app = app
+        self.encodings = encodings
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""),
+            list(self.encodings),
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(
+            send, encoding, self.encodings[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """ASGI send wrapper compressing one response."""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        factory: Callable[[], Compressor],
+        minimum_size: int,
+    ):
+        self.send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.start is not None:
+            message = await self._send_start(message)
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = self.compressor.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += self.compressor.finish()
+        if body or not more_body:
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": body,
+                    "more_body": more_body,
+                }
+            )
+
+    async def _send_start(self, first: Message) -> Message:
+        """Send the held start message, deciding how to encode.
+
+        Args:
+            first (Message): The first body message.
+
+        Returns:
+            Message: The body message to handle in place of ``first``.
+        """
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        body = first.get("body", b"")
+        more_body = first.get("more_body", False)
+        media_type = headers.get("content-type", "")
+        self.passthrough = (
+            "content-encoding" in headers
+            or media_type.startswith(INCOMPRESSIBLE_MEDIA_TYPES)
+            or (not more_body and len(body) < self.minimum_size)
+        )
+        if not self.passthrough:
+            self.compressor = self.factory()
+            headers["Content-Encoding"] = self.encoding
+            if "content-length" in headers:
+                del headers["content-length"]
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if not more_body:
+                # The whole body is known: send it with its length
+                body = self.compressor.compress(body)
+                body += self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                self.passthrough = True
+                await self.send(start)
+                return {"type": "http.response.body", "body": body}
+        await self.send(start)
+        return first
+
+
+def parse_encodings(value: str) -> Tuple[str, ...]:
+    """Parse a comma-separated list of content encodings.
+
+    Args:
+        value (str): E.g. ``"br,zstd,gzip"``.
+
+    Returns:
+        Tuple[str, ...]: The encodings, in order.
+    """
+    return tuple(
+        encoding.strip().lower()
+        for encoding in value.split(",")
+        if encoding.strip()
+    )
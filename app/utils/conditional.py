@@ -0,0 +1,123 @@
+"""HTTP conditional requests (ETag and Last-Modified).
+
+Read endpoints derive a validator from a cheap version query, answer
+``If-None-Match`` and ``If-Modified-Since`` with ``304 Not Modified``
+when the client copy is current, and only load and serialize the body
+otherwise.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from starlette import status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong entity tag from the parts of a version.
+
+    Args:
+        *parts (Any): Whatever identifies the representation, e.g. an
+            ID and an ``updated_at``, or a collection aggregate and the
+            query string.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    normalized = [
+        part.isoformat() if isinstance(part, datetime) else part
+        for part in parts
+    ]
+    digest = hashlib.sha1(repr(normalized).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+def _opaque(etag: str) -> str:
+    """Strip the weakness indicator, for weak comparison."""
+    return etag.strip().removeprefix("W/")
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """Check whether the client copy of a representation is current.
+
+    ``If-None-Match`` is compared with the weak comparison function,
+    so it also matches tags weakened by compression; when it is present
+    ``If-Modified-Since`` is ignored, as required by RFC 9110.
+
+    Args:
+        request (Request): The request.
+        etag (str): The entity tag of the current representation.
+        last_modified (Optional[datetime]): When the representation
+            last changed.
+
+    Returns:
+        bool: True if ``304 Not Modified`` can be answered.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {
+            _opaque(tag) for tag in if_none_match.split(",")
+        }
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    """Add the validators of a representation to a response.
+
+    Responses are private to the user and must be revalidated before
+    being reused.
+
+    Args:
+        response (Response): The response.
+        etag (str): The entity tag of the representation.
+        last_modified (Optional[datetime]): When the representation
+            last changed.
+
+    Returns:
+        Response: The same response.
+    """
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(
+    etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    """Build a ``304 Not Modified`` response.
+
+    Args:
+        etag (str): The entity tag of the current representation.
+        last_modified (Optional[datetime]): When the representation
+            last changed.
+
+    Returns:
+        Response: The empty response carrying the validators.
+    """
+    return set_validators(
+        Response(status_code=status.HTTP_304_NOT_MODIFIED),
+        etag,
+        last_modified,
+    )
@@ -0,0 +1,192 @@
+"""Streaming encoders for table exports.
+
+The encoders consume batches of plain row tuples and yield the encoded
+file piece by piece, one piece per batch, without building models for
+the rows.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+
+from sqlalchemy import Column
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+async def batched(
+    rows: AsyncIterator[Sequence], size: int
+) -> AsyncIterator[List[Sequence]]:
+    """Group rows into lists of at most ``size`` rows.
+
+    Args:
+        rows (AsyncIterator[Sequence]): The rows.
+        size (int): The maximum number of rows of a batch.
+
+    Yields:
+        List[Sequence]: The batches.
+    """
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _plain(value):
+    """Convert a value to a type the text encoders handle."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def encode_csv(
+    columns: List[Column], batches: AsyncIterator[List[Sequence]]
+) -> AsyncIterator[bytes]:
+    """Encode batches of rows as CSV with a header row.
+
+    Args:
+        columns (List[Column]): The columns of the rows.
+        batches (AsyncIterator[List[Sequence]]): The rows.
+
+    Yields:
+        bytes: The header, then one piece per batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_plain(value) for value in row] for row in batch])
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(
+    columns: List[Column], batches: AsyncIterator[List[Sequence]]
+) -> AsyncIterator[bytes]:
+    """Encode batches of rows as newline-delimited JSON objects.
+
+    Args:
+        columns (List[Column]): The columns of the rows.
+        batches (AsyncIterator[List[Sequence]]): The rows.
+
+    Yields:
+        bytes: One piece per batch.
+    """
+    names = [column.name for column in columns]
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_plain) + "\n"
+            for row in batch
+        ).encode()
+
+
+class _ChunkSink:
+    """Write-only file collecting what the Parquet writer produces.
+
+    Tracks the position itself, so the collected bytes can be handed
+    out and dropped while the writer keeps computing its offsets.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    """Check that the optional ``pyarrow`` dependency is installed.
+
+    Returns:
+        bool: True if Parquet exports are possible.
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+async def encode_parquet(
+    columns: List[Column], batches: AsyncIterator[List[Sequence]]
+) -> AsyncIterator[bytes]:
+    """Encode batches of rows as Parquet, one row group per batch.
+
+    Requires the optional ``pyarrow`` dependency.
+
+    Args:
+        columns (List[Column]): The columns of the rows.
+        batches (AsyncIterator[List[Sequence]]): The rows.
+
+    Yields:
+        bytes: One piece per row group, then the file footer.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema(
+        [
+            (column.name, arrow_types[column.type.python_type])
+            for column in columns
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in batches:
+            values = list(zip(*batch))
+            writer.write_table(
+                pa.table(
+                    {
+                        column.name: values[index]
+                        for index, column in enumerate(columns)
+                    },
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+    "parquet": encode_parquet,
+}
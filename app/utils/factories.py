@@ -7,7 +7,28 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
 from app.api.v1.auth import set_up_auth_routes
+from app.db.db import (
+    engine,
+    get_pool_stats,
+    replica_engines,
+    replica_router,
+)
+from app.repositories.products import product_cache
+from app.services.repricing import cart_repricer
 from app.settings import config
+from app.utils.compression import (
+    CompressionMiddleware,
+    available_encodings,
+    parse_encodings,
+)
+from app.utils.hashing import password_hasher
+from app.utils.instrumentation import (
+    InstrumentationMiddleware,
+    instrument_engine,
+    metrics,
+    metrics_endpoint,
+)
+from app.utils.jobs import job_worker
 
 
 def create_app() -> FastAPI:
@@ -16,7 +37,9 @@ def create_app() -> FastAPI:
     Returns:
         FastAPI: The FastAPI application instance.
     """
-    return FastAPI(**config.FASTAPI_SETTINGS)
+    application = FastAPI(**config.FASTAPI_SETTINGS)
+    application.add_event_handler("shutdown", password_hasher.shutdown)
+    return application
 
 
 def setup_cors(application: FastAPI) -> None:
@@ -35,6 +58,93 @@ def setup_cors(application: FastAPI) -> None:
     )
 
 
+def setup_instrumentation(application: FastAPI) -> None:
+    """Set up the SQL instrumentation middleware and the metrics
+        endpoint for the FastAPI application.
+
+    Args:
+        application (FastAPI): The FastAPI application instance.
+    """
+    if not config.INSTRUMENTATION_ENABLED:
+        return
+    for database_engine in (engine, *replica_engines):
+        instrument_engine(
+            database_engine, config.SLOW_QUERY_THRESHOLD_MS / 1000
+        )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_db_pool_{name}": value
+            for name, value in get_pool_stats(engine).items()
+        }
+    )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_db_replica_{name}": value
+            for name, value in replica_router.stats().items()
+        }
+    )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_product_cache_{name}": value
+            for name, value in product_cache.stats().items()
+            if isinstance(value, (int, float))
+        }
+    )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_cart_repricing_{name}": value
+            for name, value in cart_repricer.stats().items()
+        }
+    )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_jobs_{name}": value
+            for name, value in job_worker.stats().items()
+        }
+    )
+    metrics.collectors.append(
+        lambda: {
+            f"unimart_password_hasher_{name}": value
+            for name, value in password_hasher.stats().items()
+        }
+    )
+    application.add_middleware(InstrumentationMiddleware)
+    application.add_route(
+        config.METRICS_PATH, metrics_endpoint, include_in_schema=False
+    )
+
+
+def setup_compression(application: FastAPI) -> None:
+    """Set up response compression for the FastAPI application.
+
+    Args:
+        application (FastAPI): The FastAPI application instance.
+    """
+    if not config.COMPRESSION_ENABLED:
+        return
+    encodings = available_encodings(
+        parse_encodings(config.COMPRESSION_ENCODINGS),
+        config.COMPRESSION_LEVELS,
+    )
+    application.add_middleware(
+        CompressionMiddleware,
+        encodings=encodings,
+        minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    )
+
+
+def setup_jobs(application: FastAPI) -> None:
+    """Run the background job workers with the FastAPI application.
+
+    Args:
+        application (FastAPI): The FastAPI application instance.
+    """
+    if not config.JOBS_WORKER_ENABLED:
+        return
+    application.add_event_handler("startup", job_worker.start)
+    application.add_event_handler("shutdown", job_worker.stop)
+
+
 def setup_routes(application: FastAPI) -> None:
     """Set up API routes for the FastAPI application.
 
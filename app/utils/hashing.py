@@ -0,0 +1,171 @@
+"""Password hashing off the event loop.
+
+Hashing and verifying passwords is deliberately slow CPU work. Running
+it inline blocks the worker's event loop and stalls every concurrent
+request, so it is executed on a bounded thread or process pool.
+"""
+
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+
+from app.settings import config
+
+password_helper = PasswordHelper()
+
+
+def _hash(password: str) -> str:
+    """Hash a password with the default password helper.
+
+    Args:
+        password (str): The plain password.
+
+    Returns:
+        str: The password hash.
+    """
+    return password_helper.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password with the default password helper.
+
+    Args:
+        plain_password (str): The plain password.
+        hashed_password (str): The stored password hash.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches and
+            the new hash if the stored one must be upgraded.
+    """
+    return password_helper.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Run password hashing on a bounded executor.
+
+    At most ``max_pending`` operations may be running or queued at
+    once. Further calls are rejected with ``429 Too Many Requests``
+    instead of queueing without bound behind a login storm.
+
+    Attributes:
+        executor_type (str): ``"thread"`` or ``"process"``.
+        max_workers (int): The number of executor workers.
+        max_pending (int): The maximum number of running and queued
+            operations.
+        pending (int): The number of running and queued operations.
+    """
+
+    def __init__(self, executor_type: str, max_workers: int, max_pending: int):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Executor: The executor, created on first use."""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run a function on the executor.
+
+        With a process pool ``func`` and its arguments must be
+        picklable, i.e. module-level functions.
+
+        Args:
+            func (Callable): The function to run.
+            *args (Any): The arguments of the function.
+
+        Returns:
+            Any: The result of the function.
+
+        Raises:
+            HTTPException: If too many operations are already pending.
+        """
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, partial(func, *args)
+            )
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password.
+
+        Args:
+            password (str): The plain password.
+
+        Returns:
+            str: The password hash.
+        """
+        return await self.run(_hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password against its hash.
+
+        Args:
+            plain_password (str): The plain password.
+            hashed_password (str): The stored password hash.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matches
+                and the new hash if the stored one must be upgraded.
+        """
+        return await self.run(
+            _verify_and_update, plain_password, hashed_password
+        )
+
+    def stats(self) -> dict:
+        """Get the executor statistics.
+
+        Returns:
+            dict: The workers, pending and maximum pending operations.
+        """
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self) -> None:
+        """Shut the executor down, waiting for pending operations."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=config.PASSWORD_HASHER_EXECUTOR,
+    max_workers=config.PASSWORD_HASHER_WORKERS,
+    max_pending=config.PASSWORD_HASHER_MAX_PENDING,
+)
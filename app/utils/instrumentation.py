@@ -0,0 +1,282 @@
+"""Per-request SQL instrumentation, slow query logging and metrics."""
+
+import logging
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Database usage attributed to one request.
+
+    Attributes:
+        statements (int): The number of SQL statements executed.
+        db_time (float): The seconds spent executing statements.
+        pool_wait (float): The seconds spent waiting for a pooled
+            connection.
+    """
+
+    __slots__ = ("statements", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """Format the statistics as a ``Server-Timing`` header value.
+
+        Args:
+            total (float): The seconds spent handling the request.
+
+        Returns:
+            str: The header value, durations in milliseconds.
+        """
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} '
+            f'statements", pool;dur={self.pool_wait * 1000:.2f}, '
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class RouteMetrics:
+    """Aggregated usage of one route.
+
+    Attributes:
+        count (int): The number of requests.
+        duration (float): The total seconds spent handling requests.
+        statements (int): The total number of SQL statements.
+        db_time (float): The total seconds spent executing statements.
+        pool_wait (float): The total seconds spent waiting for a
+            pooled connection.
+    """
+
+    __slots__ = ("count", "duration", "statements", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+
+class MetricsRegistry:
+    """In-process aggregates exposed in the Prometheus text format.
+
+    Attributes:
+        collectors (List[Callable]): Functions returning extra
+            ``(name, value)`` gauges, e.g. pool or cache counters.
+    """
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.routes = defaultdict(RouteMetrics)
+        self.statements = 0
+        self.slow_queries = 0
+        self.collectors: List[Callable[[], Dict[str, float]]] = []
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        stats: RequestStats,
+    ) -> None:
+        """Record a finished request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The path template of the matched route.
+            status_code (int): The response status code.
+            duration (float): The seconds spent handling the request.
+            stats (RequestStats): The database usage of the request.
+        """
+        self.requests[(method, route, status_code)] += 1
+        aggregate = self.routes[(method, route)]
+        aggregate.count += 1
+        aggregate.duration += duration
+        aggregate.statements += stats.statements
+        aggregate.db_time += stats.db_time
+        aggregate.pool_wait += stats.pool_wait
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = [
+            "# TYPE unimart_http_requests_total counter",
+            *(
+                f'unimart_http_requests_total{{method="{method}",'
+                f'route="{route}",status="{status_code}"}} {count}'
+                for (method, route, status_code), count in sorted(
+                    self.requests.items()
+                )
+            ),
+        ]
+        route_metrics: List[Tuple[str, str]] = [
+            ("unimart_http_request_duration_seconds_sum", "duration"),
+            ("unimart_http_request_duration_seconds_count", "count"),
+            ("unimart_db_statements_total", "statements"),
+            ("unimart_db_time_seconds_total", "db_time"),
+            ("unimart_db_pool_wait_seconds_total", "pool_wait"),
+        ]
+        for name, attribute in route_metrics:
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(
+                f'{name}{{method="{method}",route="{route}"}} '
+                f"{getattr(aggregate, attribute)}"
+                for (method, route), aggregate in sorted(self.routes.items())
+            )
+        lines.extend(
+            [
+                "# TYPE unimart_db_statements_all_total counter",
+                f"unimart_db_statements_all_total {self.statements}",
+                "# TYPE unimart_db_slow_queries_total counter",
+                f"unimart_db_slow_queries_total {self.slow_queries}",
+            ]
+        )
+        for collector in self.collectors:
+            for name, value in collector().items():
+                lines.extend([f"# TYPE {name} gauge", f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(
+    engine: AsyncEngine, slow_query_threshold: float
+) -> None:
+    """Attribute the statements of an engine to the current request.
+
+    Statements slower than the threshold are logged without their
+    parameters, which may hold personal data.
+
+    Args:
+        engine (AsyncEngine): The engine to instrument.
+        slow_query_threshold (float): The duration, in seconds, from
+            which a statement is logged as slow.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        metrics.statements += 1
+        stats = request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+        if elapsed >= slow_query_threshold:
+            metrics.slow_queries += 1
+            logger.warning(
+                "Slow query (%.1f ms, %d parameters redacted): %s",
+                elapsed * 1000,
+                len(parameters) if parameters else 0,
+                statement,
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute does not run for a failed statement
+        if context.connection is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
+
+
+def record_pool_wait(waited: float) -> None:
+    """Attribute the wait for a pooled connection to the request.
+
+    Args:
+        waited (float): The seconds spent waiting.
+    """
+    stats = request_stats.get()
+    if stats is not None:
+        stats.pool_wait += waited
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware collecting the database usage of each request.
+
+    Adds a ``Server-Timing`` header and records the request in the
+    metrics registry. Streamed bodies are passed through untouched.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    stats.server_timing(time.perf_counter() - started),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - started,
+                stats,
+            )
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Expose the metrics in the Prometheus text format.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        PlainTextResponse: The exposition text.
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4"
+    )
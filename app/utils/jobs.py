@@ -0,0 +1,401 @@
+"""Background jobs kept in a PostgreSQL queue.
+
+Jobs are rows of the ``job`` table. A service enqueues one with the
+unit of work of its request, so the job exists if and only if the
+transaction commits. ``JobWorker`` polls the queues, taking due jobs
+with ``SELECT ... FOR UPDATE SKIP LOCKED`` so that several processes
+can share them, runs their handlers, and retries failed jobs with an
+exponential backoff. It runs in the application process, started and
+stopped with it, or alone with ``python -m app.commands.jobs run``.
+
+Handlers are coroutine functions taking the JSON payload of the job::
+
+    @job_registry.job("cart.reprice", queue="repricing")
+    async def reprice_cart(payload: dict) -> None:
+        ...
+
+    await job_registry.enqueue(uow, "cart.reprice", {"product_id": 1})
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import Row, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.repositories.jobs import JobsRepository
+from app.settings import config
+from app.utils.unitofwork import IUnitOfWork, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+DEFAULT_QUEUE = "default"
+
+
+class JobDefinition:
+    """A registered job handler.
+
+    Attributes:
+        handler (JobHandler): The coroutine function running the job.
+        queue (str): The queue its jobs are enqueued in.
+        max_attempts (int): The number of attempts before a job fails
+            for good.
+    """
+
+    def __init__(self, handler: JobHandler, queue: str, max_attempts: int):
+        self.handler = handler
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+
+class JobRegistry:
+    """The job handlers, by name.
+
+    Args:
+        max_attempts (int): The default number of attempts of a job.
+
+    Attributes:
+        definitions (Dict[str, JobDefinition]): The registered jobs.
+        enqueued (int): The jobs enqueued by this process.
+    """
+
+    def __init__(self, max_attempts: int):
+        self.max_attempts = max_attempts
+        self.definitions: Dict[str, JobDefinition] = {}
+        self.enqueued = 0
+
+    def job(
+        self,
+        name: str,
+        queue: str = DEFAULT_QUEUE,
+        max_attempts: Optional[int] = None,
+    ) -> Callable[[JobHandler], JobHandler]:
+        """Register a job handler.
+
+        Args:
+            name (str): The name of the job, stored with each job.
+            queue (str): The queue its jobs are enqueued in.
+            max_attempts (Optional[int]): The number of attempts before
+                a job fails for good; the registry default if omitted.
+
+        Returns:
+            Callable[[JobHandler], JobHandler]: A decorator registering
+                the handler and returning it unchanged.
+        """
+
+        def register(handler: JobHandler) -> JobHandler:
+            if name in self.definitions:
+                raise ValueError(f"Job already registered: {name}")
+            self.definitions[name] = JobDefinition(
+                handler, queue, max_attempts or self.max_attempts
+            )
+            return handler
+
+        return register
+
+    async def enqueue(
+        self,
+        uow: IUnitOfWork,
+        name: str,
+        payload: Optional[dict] = None,
+        delay: float = 0.0,
+    ) -> int:
+        """Enqueue a job in the transaction of a unit of work.
+
+        The job is only visible to the workers once the unit of work
+        commits, and is discarded if it rolls back.
+
+        Args:
+            uow (IUnitOfWork): The unit of work of the caller.
+            name (str): The name of a registered job.
+            payload (Optional[dict]): The arguments of the handler; it
+                must be serializable to JSON.
+            delay (float): The seconds to wait before running the job.
+
+        Returns:
+            int: The ID of the job.
+        """
+        definition = self.definitions.get(name)
+        if definition is None:
+            raise ValueError(f"Unknown job: {name}")
+        job_id = await uow.jobs.enqueue(
+            name,
+            payload or {},
+            definition.queue,
+            definition.max_attempts,
+            delay,
+        )
+        self.enqueued += 1
+        return job_id
+
+
+class JobWorker:
+    """Run the jobs of some queues, each with a concurrency limit.
+
+    Each queue has its own polling loop, which takes at most as many
+    jobs as it has free slots, so a queue never runs more than its
+    limit of jobs at once in this process. A job is deleted when its
+    handler returns. When the handler raises, the job is queued again
+    after ``retry_base_delay * 2 ** (attempts - 1)`` seconds, with
+    jitter, up to ``retry_max_delay``; after ``max_attempts`` it is
+    kept as ``failed``.
+
+    Args:
+        registry (JobRegistry): The job handlers.
+        concurrency (Dict[str, int]): The queues to take jobs from,
+            with the number of jobs each runs at once.
+        poll_interval (float): The seconds to wait after finding a
+            queue empty.
+        lease_seconds (float): How long a job is reserved by the worker
+            taking it; after that it is taken again, so it must exceed
+            the longest run of a handler.
+        retry_base_delay (float): The delay before the first retry.
+        retry_max_delay (float): The longest delay between attempts.
+        shutdown_timeout (float): The seconds ``stop`` waits for the
+            running jobs before cancelling them.
+        bind (Optional[AsyncEngine]): The engine of the queue.
+            Defaults to the primary.
+
+    Attributes:
+        taken (int): The jobs taken.
+        succeeded (int): The jobs that succeeded.
+        retried (int): The failed attempts queued again.
+        failed (int): The jobs that failed for good.
+        poll_errors (int): The polls that failed on a database error.
+        max_job_seconds (float): The longest run of a handler.
+    """
+
+    def __init__(
+        self,
+        registry: JobRegistry,
+        concurrency: Dict[str, int],
+        poll_interval: float = 1.0,
+        lease_seconds: float = 300.0,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 300.0,
+        shutdown_timeout: float = 10.0,
+        bind: Optional[AsyncEngine] = None,
+    ):
+        self.registry = registry
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.shutdown_timeout = shutdown_timeout
+        self.bind = bind
+        self.taken = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.poll_errors = 0
+        self.max_job_seconds = 0.0
+        self._pollers: List[asyncio.Task] = []
+        self._running: Dict[str, Set[asyncio.Task]] = {
+            queue: set() for queue in concurrency
+        }
+
+    async def start(self) -> None:
+        """Start polling the queues in the background."""
+        if self._pollers:
+            return
+        for queue in self.concurrency:
+            self._pollers.append(asyncio.create_task(self._poll(queue)))
+        logger.info(
+            "Job worker started on %s",
+            ", ".join(
+                f"{queue} ({limit})"
+                for queue, limit in self.concurrency.items()
+            ),
+        )
+
+    async def stop(self) -> None:
+        """Stop polling and wait for the running jobs.
+
+        Jobs still running after ``shutdown_timeout`` are cancelled;
+        they are taken again once their lease expires.
+        """
+        pollers, self._pollers = self._pollers, []
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        running = set().union(*self._running.values())
+        if not running:
+            return
+        _, pending = await asyncio.wait(running, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run_pending(self, queue: str) -> int:
+        """Run the due jobs of a queue until none is left.
+
+        Args:
+            queue (str): The queue to empty.
+
+        Returns:
+            int: The number of jobs run.
+        """
+        count = 0
+        while True:
+            jobs = await self._dequeue(queue, self.concurrency.get(queue, 1))
+            if not jobs:
+                return count
+            await asyncio.gather(*(self._run(job) for job in jobs))
+            count += len(jobs)
+
+    async def _poll(self, queue: str) -> None:
+        limit = self.concurrency[queue]
+        running = self._running[queue]
+        while True:
+            free = limit - len(running)
+            jobs = []
+            try:
+                jobs = await self._dequeue(queue, free)
+            except (exc.SQLAlchemyError, OSError):
+                self.poll_errors += 1
+                logger.warning("Polling queue %s failed", queue, exc_info=True)
+            for job in jobs:
+                task = asyncio.create_task(self._run(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            if len(running) >= limit:
+                await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+            elif len(jobs) < free:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _dequeue(self, queue: str, limit: int) -> List[Row]:
+        async with UnitOfWork(bind=self.bind) as uow:
+            jobs = await uow.jobs.dequeue(queue, limit, self.lease_seconds)
+            await uow.commit()
+        self.taken += len(jobs)
+        return jobs
+
+    async def _run(self, job: Row) -> None:
+        """Run one taken job and settle it."""
+        definition = self.registry.definitions.get(job.name)
+        if definition is None:
+            await self._fail(job, f"Unknown job: {job.name}")
+            return
+        if job.attempts > job.max_attempts:
+            # Its lease expired on the last attempt: the worker died
+            await self._fail(job, "Lease expired on the last attempt")
+            return
+
+        started = time.perf_counter()
+        try:
+            await definition.handler(job.payload)
+        except Exception as error:
+            logger.warning(
+                "Job %d (%s) failed on attempt %d of %d",
+                job.id,
+                job.name,
+                job.attempts,
+                job.max_attempts,
+                exc_info=True,
+            )
+            message = f"{type(error).__name__}: {error}"
+            if job.attempts >= job.max_attempts:
+                await self._fail(job, message)
+            else:
+                await self._retry(job, message)
+            return
+        finally:
+            self.max_job_seconds = max(
+                self.max_job_seconds, time.perf_counter() - started
+            )
+
+        await self._settle(
+            job, lambda jobs: jobs.complete(job.id, job.attempts)
+        )
+        self.succeeded += 1
+
+    async def _retry(self, job: Row, error: str) -> None:
+        delay = min(
+            self.retry_base_delay * 2 ** (job.attempts - 1),
+            self.retry_max_delay,
+        )
+        delay = random.uniform(delay / 2, delay)
+        await self._settle(
+            job, lambda jobs: jobs.retry(job.id, job.attempts, delay, error)
+        )
+        self.retried += 1
+
+    async def _fail(self, job: Row, error: str) -> None:
+        logger.error("Job %d (%s) failed: %s", job.id, job.name, error)
+        await self._settle(
+            job, lambda jobs: jobs.fail(job.id, job.attempts, error)
+        )
+        self.failed += 1
+
+    async def _settle(
+        self, job: Row, settle: Callable[[JobsRepository], Awaitable[bool]]
+    ) -> None:
+        """Record the outcome of a job.
+
+        On a database error the job is left as it is, to be taken
+        again when its lease expires.
+        """
+        try:
+            async with UnitOfWork(bind=self.bind) as uow:
+                await settle(uow.jobs)
+                await uow.commit()
+        except (exc.SQLAlchemyError, OSError):
+            logger.exception("Recording the outcome of job %d failed", job.id)
+
+    def stats(self) -> dict:
+        """Get the job counters.
+
+        Returns:
+            dict: The jobs enqueued, taken, running and settled so far,
+                and the longest run of a handler in seconds.
+        """
+        return {
+            "enqueued": self.registry.enqueued,
+            "taken": self.taken,
+            "running": sum(len(tasks) for tasks in self._running.values()),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "poll_errors": self.poll_errors,
+            "max_job_seconds": self.max_job_seconds,
+        }
+
+
+def parse_queues(value: str) -> Dict[str, int]:
+    """Parse a comma-separated list of queues and their concurrency.
+
+    Args:
+        value (str): E.g. ``"default:4,repricing:1"``; a queue without
+            a concurrency runs one job at a time.
+
+    Returns:
+        Dict[str, int]: The concurrency of each queue.
+    """
+    queues = {}
+    for item in value.split(","):
+        name, _, limit = item.strip().partition(":")
+        if name:
+            queues[name] = max(int(limit or "1"), 1)
+    return queues
+
+
+job_registry = JobRegistry(max_attempts=config.JOBS_MAX_ATTEMPTS)
+
+job_worker = JobWorker(
+    job_registry,
+    parse_queues(config.JOBS_QUEUES),
+    poll_interval=config.JOBS_POLL_INTERVAL,
+    lease_seconds=config.JOBS_LEASE_SECONDS,
+    retry_base_delay=config.JOBS_RETRY_BASE_DELAY,
+    retry_max_delay=config.JOBS_RETRY_MAX_DELAY,
+    shutdown_timeout=config.JOBS_SHUTDOWN_TIMEOUT,
+)
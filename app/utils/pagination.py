@@ -0,0 +1,56 @@
+"""Helpers for keyset (cursor) pagination."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor.
+
+    Args:
+        *values: The values of the sort key, e.g. ``created_at`` and
+            ``id``.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    payload = json.dumps(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): The cursor received from the client.
+
+    Returns:
+        list: The values of the sort key, datetimes as ISO strings.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from error
+    if not isinstance(values, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
@@ -1,10 +1,14 @@
 """Unit of Work module."""
 
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Hashable, Optional, Type
 
-from app.db.db import async_session_maker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.db.db import async_session_maker, replica_router
 from app.repositories.cart import CartRepository
+from app.repositories.cart_summary import CartSummaryRepository
+from app.repositories.jobs import JobsRepository
 from app.repositories.products import ProductsRepository
 from app.repositories.users import UsersRepository
 
@@ -13,6 +17,8 @@ class IUnitOfWork(ABC):
     products: Type[ProductsRepository]
     users: Type[UsersRepository]
     cart: Type[CartRepository]
+    cart_summary: Type[CartSummaryRepository]
+    jobs: Type[JobsRepository]
 
     @abstractmethod
     def __init__(self):
@@ -41,26 +47,115 @@ class IUnitOfWork(ABC):
 
 
 class UnitOfWork(IUnitOfWork):
-    def __init__(self):
+    """Unit of Work opening its resources lazily.
+
+    The session is created on first repository access and, as an
+    ``AsyncSession`` checks out a connection only when it runs its first
+    statement, a unit of work that never queries never touches the
+    pool. Repositories are created on first access as well.
+
+    A unit of work can instead be given the session of the request, so
+    that it shares one session and connection with the authentication
+    dependencies. It then ends the transaction on exit but leaves
+    closing the session to its owner.
+
+    Args:
+        session (Optional[AsyncSession]): A session to share. If None,
+            the unit of work opens and closes its own.
+        bind (Optional[AsyncEngine]): The engine of its own session,
+            e.g. a read replica. Defaults to the primary.
+        pin_key (Optional[Hashable]): What identifies the writer. Its
+            reads are pinned to the primary after each commit, so they
+            see the committed changes.
+    """
+
+    def __init__(
+        self,
+        session: Optional[AsyncSession] = None,
+        bind: Optional[AsyncEngine] = None,
+        pin_key: Optional[Hashable] = None,
+    ):
         self.session_factory = async_session_maker
+        self.bind = bind
+        self.pin_key = pin_key
+        self._session = session
+        self._owns_session = session is None
+        self._repositories = {}
+        self._depth = 0
+
+    @property
+    def session(self) -> AsyncSession:
+        """Get the session of the unit of work, creating it if needed."""
+        if self._session is None:
+            if self.bind is None:
+                self._session = self.session_factory()
+            else:
+                self._session = self.session_factory(bind=self.bind)
+        return self._session
+
+    def _repository(self, repository_class):
+        repository = self._repositories.get(repository_class)
+        if repository is None:
+            repository = repository_class(self.session)
+            self._repositories[repository_class] = repository
+        return repository
+
+    @property
+    def products(self) -> ProductsRepository:
+        return self._repository(ProductsRepository)
+
+    @property
+    def users(self) -> UsersRepository:
+        return self._repository(UsersRepository)
+
+    @property
+    def cart(self) -> CartRepository:
+        return self._repository(CartRepository)
+
+    @property
+    def cart_summary(self) -> CartSummaryRepository:
+        return self._repository(CartSummaryRepository)
+
+    @property
+    def jobs(self) -> JobsRepository:
+        return self._repository(JobsRepository)
 
     async def __aenter__(self):
-        """Enter the asynchronous context, creating repositories."""
-        self.session = self.session_factory()
-        self.products = ProductsRepository(self.session)
-        self.users = UsersRepository(self.session)
-        self.cart = CartRepository(self.session)
+        """Enter the asynchronous context.
+
+        Nested contexts share the resources of the outermost one.
+        """
+        self._depth += 1
+        return self
 
     async def __aexit__(self, *args):
-        """Exit the asynchronous context, rolling back changes and
-        closing the session.
+        """Exit the asynchronous context, rolling back uncommitted
+        changes and closing the session if the unit of work owns it.
+
+        The rollback is skipped when no transaction is open, i.e. after
+        a commit or when no statement was executed. Either way the
+        connection goes back to the pool.
         """
-        await self.rollback()
-        await self.session.close()
+        self._depth -= 1
+        if self._depth or self._session is None:
+            return
+        if not self._owns_session:
+            if self._session.in_transaction():
+                await self.rollback()
+            return
+        try:
+            if self._session.in_transaction():
+                await self.rollback()
+            await self._session.close()
+        finally:
+            self._session = None
+            self._repositories = {}
 
     async def commit(self):
         """Commit changes made during the Unit of Work."""
         await self.session.commit()
+        if self.pin_key is not None:
+            await replica_router.pin(self.pin_key)
 
     async def rollback(self):
         """Rollback changes made during the Unit of Work."""
@@ -0,0 +1,156 @@
+"""Incremental parsing of uploaded CSV and NDJSON files.
+
+The parsers consume the request body chunk by chunk and yield one
+record at a time, so memory use is bounded by the longest record, not
+by the size of the file. Every record is yielded as a
+``(line, record, error)`` tuple: malformed records carry an error
+message instead of aborting the whole upload.
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+NDJSON_MEDIA_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+)
+
+
+def _line_too_long(line: int) -> HTTPException:
+    """Build the error raised when a line exceeds the length limit."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Line {line} is too long",
+    )
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_length: int
+) -> AsyncIterator[Tuple[int, str]]:
+    """Split a UTF-8 byte stream into numbered lines.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the upload.
+        max_line_length (int): The maximum number of characters of a
+            line.
+
+    Yields:
+        Tuple[int, str]: The line number, from 1, and the line without
+            its line break.
+
+    Raises:
+        HTTPException: If the upload is not valid UTF-8 or a line is
+            longer than ``max_line_length``.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    number = 0
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                number += 1
+                yield number, line.rstrip("\r")
+            if len(buffer) > max_line_length:
+                raise _line_too_long(number + 1)
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Line {number + 1} is not valid UTF-8",
+        ) from error
+    if buffer:
+        yield number + 1, buffer.rstrip("\r")
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[Tuple[int, str]], max_record_length: int
+) -> AsyncIterator[Record]:
+    """Parse CSV lines into records keyed by the header row.
+
+    Quoted fields may contain line breaks: lines are accumulated until
+    the quotes of the record are balanced.
+
+    Args:
+        lines (AsyncIterator[Tuple[int, str]]): The numbered lines.
+        max_record_length (int): The maximum number of characters of a
+            record.
+
+    Yields:
+        Record: The first line of the record and the record or an
+            error message.
+
+    Raises:
+        HTTPException: If a record is longer than
+            ``max_record_length``.
+    """
+    header = None
+    pending = []
+    pending_length = 0
+    quotes = 0
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+        pending.append(line)
+        pending_length += len(line) + 1
+        quotes += line.count('"')
+        if quotes % 2:
+            if pending_length > max_record_length:
+                raise _line_too_long(start)
+            continue
+
+        text = "\n".join(pending)
+        pending, pending_length, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as error:
+            yield start, None, f"Invalid CSV: {error}"
+            continue
+
+        if header is None:
+            header = [value.strip() for value in values]
+        elif len(values) != len(header):
+            error = f"Expected {len(header)} fields, got {len(values)}"
+            yield start, None, error
+        else:
+            yield start, dict(zip(header, values)), None
+
+    if pending:
+        yield start, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[Tuple[int, str]]
+) -> AsyncIterator[Record]:
+    """Parse NDJSON lines into records.
+
+    Args:
+        lines (AsyncIterator[Tuple[int, str]]): The numbered lines.
+
+    Yields:
+        Record: The line number and the record or an error message.
+    """
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield number, None, f"Invalid JSON: {error}"
+            continue
+        if isinstance(record, dict):
+            yield number, record, None
+        else:
+            yield number, None, "Expected a JSON object"
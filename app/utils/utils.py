@@ -5,6 +5,7 @@ import hashlib
 import hmac
 
 from app.settings import config
+from app.utils.hashing import password_hasher
 
 
 def hash_password(password, pwd_salt=config.PWD_HASH_SALT):
@@ -41,5 +42,6 @@ async def compare_passwords(db_pwd, received_pwd, pwd_salt) -> bool:
     Returns:
         bool: True if the passwords match, False otherwise.
     """
-    received_pwd = hash_password(received_pwd, pwd_salt)["hashed_password"]
+    hashed = await password_hasher.run(hash_password, received_pwd, pwd_salt)
+    received_pwd = hashed["hashed_password"]
     return hmac.compare_digest(db_pwd, received_pwd)
@@ -0,0 +1,146 @@
+"""Benchmark of the bulk cart insert path against the per-item path.
+
+Usage:
+    python -m tests.benchmarks.cart_add_many --sizes 1 10 50 100
+
+The schema is recreated in the test database (``TEST_DATABASE_URI``),
+a user with products is seeded and each batch size is added to the
+cart with the legacy per-item loop (one commit per line) and with
+``CartService.add_many``. Query count and median latency are reported.
+"""
+
+import argparse
+import asyncio
+import time
+from statistics import median
+
+from app.models import User
+from app.schemas.cart import CartCreate
+from app.services.cart import CartService
+from app.settings import config
+from app.utils.unitofwork import UnitOfWork
+from tests.benchmarks.utils import (
+    QueryCounter,
+    create_benchmark_engine,
+    reset_schema,
+    write_report,
+)
+
+
+async def seed(products_count: int):
+    """Create a user owning ``products_count`` products.
+
+    Args:
+        products_count (int): The number of products to create.
+
+    Returns:
+        tuple: The seeded user and the IDs of its products.
+    """
+    uow = UnitOfWork()
+    async with uow:
+        user_id = await uow.users.add(
+            {
+                "email": "bench@example.com",
+                "hashed_password": "not-a-real-hash",
+                "telephone": "+70000000000",
+                "is_active": True,
+                "is_superuser": False,
+                "is_verified": True,
+            }
+        )
+        user = User(id=user_id)
+        product_ids = await uow.products.add_many(
+            [
+                {
+                    "name": f"Product {number}",
+                    "description": "Benchmark product",
+                    "price": 10.0 + number,
+                    "owner_id": user_id,
+                }
+                for number in range(products_count)
+            ]
+        )
+        await uow.commit()
+    return user, product_ids
+
+
+async def clear_cart(user: User) -> None:
+    """Remove every line from the user's cart.
+
+    Args:
+        user (User): The owner of the cart.
+    """
+    uow = UnitOfWork()
+    async with uow:
+        await uow.cart.delete_all_by_owner_id(user)
+        await uow.commit()
+
+
+async def add_per_item(items, user):
+    """Add the items one by one, as the service used to."""
+    service = CartService()
+    for item in items:
+        uow = UnitOfWork()
+        async with uow:
+            await service.add_one(uow, item, user)
+
+
+async def add_bulk(items, user):
+    """Add the items with the bulk path."""
+    await CartService().add(UnitOfWork(), items, user)
+
+
+async def measure(engine, strategy, items, user, repeat):
+    """Run one strategy several times and collect its statistics."""
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        await clear_cart(user)
+        with QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            await strategy(items, user)
+            timings.append(time.perf_counter() - started)
+        queries = counter.count
+    return {"queries": queries, "median_ms": median(timings) * 1000}
+
+
+async def main(args):
+    """Run the benchmark and report its results."""
+    engine = create_benchmark_engine(args.database_uri)
+    await reset_schema(engine)
+    user, product_ids = await seed(max(args.sizes))
+
+    report = {}
+    for size in args.sizes:
+        items = [
+            CartCreate(product_id=product_id, quantity=2)
+            for product_id in product_ids[:size]
+        ]
+        report[size] = {
+            "per_item": await measure(
+                engine, add_per_item, items, user, args.repeat
+            ),
+            "bulk": await measure(engine, add_bulk, items, user, args.repeat),
+        }
+        print(  # noqa: T201
+            f"{size:>6} items | per-item "
+            f"{report[size]['per_item']['queries']:>5} queries "
+            f"{report[size]['per_item']['median_ms']:>9.2f} ms | bulk "
+            f"{report[size]['bulk']['queries']:>3} queries "
+            f"{report[size]['bulk']['median_ms']:>8.2f} ms"
+        )
+
+    await engine.dispose()
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[1, 10, 50, 100, 500]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-uri", default=config.TEST_DATABASE_URI)
+    parser.add_argument("--output", help="Write the results as JSON")
+    asyncio.run(main(parser.parse_args()))
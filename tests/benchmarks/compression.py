@@ -0,0 +1,161 @@
+"""Benchmark of response compression: bytes on the wire and CPU cost.
+
+Usage:
+    python -m tests.benchmarks.compression --rows 1000 --repeat 50
+
+Sends a product list page (JSON) and a product export (NDJSON streamed
+in batches) of ``--rows`` rows through ``CompressionMiddleware`` with
+every available encoding, and reports the bytes on the wire, the
+compression ratio and the median process CPU time per response, with
+its overhead over the identity row, which is the cost of producing the
+body alone. No database is needed: the rows are synthetic.
+"""
+
+import argparse
+import asyncio
+import time
+from statistics import median
+
+from app.settings import config
+from app.utils.compression import CompressionMiddleware, available_encodings
+from app.utils.exports import encode_ndjson
+from app.utils.serialization import dumps, rows_to_dicts
+from tests.benchmarks.serialization import NAMES, make_rows
+from tests.benchmarks.utils import write_report
+
+BATCH_SIZE = 100
+
+
+class _Column:
+    """Stand-in for a table column, as the export encoders need."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def make_json_app(rows: list):
+    """Build an application sending the rows as one JSON page."""
+    body = dumps({"items": rows_to_dicts(NAMES, rows), "next_cursor": None})
+
+    async def application(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return application
+
+
+def make_ndjson_app(rows: list):
+    """Build an application streaming the rows as NDJSON batches."""
+    columns = [_Column(name) for name in NAMES]
+
+    async def batches():
+        for start in range(0, len(rows), BATCH_SIZE):
+            end = start + BATCH_SIZE
+            yield rows[start:end]
+
+    async def application(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        async for chunk in encode_ndjson(columns, batches()):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    return application
+
+
+async def request(application, encoding: str) -> int:
+    """Send one request and count the body bytes on the wire."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    sent = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await application(scope, receive, send)
+    return sent
+
+
+async def measure(application, encoding: str, repeat: int) -> dict:
+    """Time the responses of one encoding and collect their statistics."""
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        sent = await request(application, encoding)
+        timings.append(time.process_time() - started)
+    return {"bytes": sent, "cpu_ms": median(timings) * 1000}
+
+
+async def run(args) -> dict:
+    """Measure every body with every encoding."""
+    rows = make_rows(args.rows)
+    encodings = available_encodings(
+        ["br", "zstd", "gzip"], config.COMPRESSION_LEVELS
+    )
+    report = {}
+    bodies = (("json", make_json_app), ("ndjson", make_ndjson_app))
+    for body, make_app in bodies:
+        application = make_app(rows)
+        compressed = CompressionMiddleware(
+            application, encodings, config.COMPRESSION_MINIMUM_SIZE
+        )
+        identity = await measure(application, "identity", args.repeat)
+        report[body] = {"identity": identity}
+        for encoding in encodings:
+            report[body][encoding] = await measure(
+                compressed, encoding, args.repeat
+            )
+        for encoding, result in report[body].items():
+            result["ratio"] = identity["bytes"] / result["bytes"]
+            result["overhead_ms"] = result["cpu_ms"] - identity["cpu_ms"]
+            print(  # noqa: T201
+                f"{body:>6} | {encoding:>8} | {result['bytes']:>10,} B | "
+                f"x{result['ratio']:>5.1f} | "
+                f"{result['cpu_ms']:>8.2f} ms CPU | "
+                f"{result['overhead_ms']:>+7.2f} ms"
+            )
+    return report
+
+
+def main(args):
+    """Run the benchmark and report its results."""
+    report = asyncio.run(run(args))
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Write the results as JSON")
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+"""Benchmark of event loop latency during a login storm.
+
+Usage:
+    python -m tests.benchmarks.hashing --logins 200 --concurrency 50
+
+A probe task sleeps for ``--interval`` seconds in a loop and records
+how late it wakes up, which is the latency every other request of the
+worker would see. Meanwhile ``--logins`` password verifications run
+with at most ``--concurrency`` in flight, first inline on the event
+loop as the user manager used to, then on the thread and process
+password hashing executors. Lag percentiles, login throughput and
+logins rejected by admission control are reported. No database is
+needed: a login's database work is negligible next to the password
+verification measured here.
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException
+
+from app.utils.hashing import PasswordHasher, password_helper
+from tests.benchmarks.utils import percentile, write_report
+
+PASSWORD = "Benchmark-Passw0rd!"
+
+
+async def probe(interval: float, lags: list, stop: asyncio.Event):
+    """Record how late the event loop wakes a sleeping task.
+
+    Args:
+        interval (float): The sleep interval in seconds.
+        lags (list): Receives the measured lags in seconds.
+        stop (asyncio.Event): Set when the probe must stop.
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+def inline_login(hashed_password: str):
+    """Build a login verifying the password on the event loop."""
+
+    async def login():
+        return password_helper.verify_and_update(PASSWORD, hashed_password)
+
+    return login
+
+
+def executor_login(hasher: PasswordHasher, hashed_password: str):
+    """Build a login verifying the password on the executor."""
+
+    async def login():
+        return await hasher.verify_and_update(PASSWORD, hashed_password)
+
+    return login
+
+
+async def storm(login, logins: int, concurrency: int, interval: float):
+    """Run the logins while probing the event loop.
+
+    Returns:
+        dict: The event loop lag, the throughput and the rejections.
+    """
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(interval, lags, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def one():
+        nonlocal rejected
+        async with semaphore:
+            try:
+                await login()
+            except HTTPException:
+                rejected += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    lags = lags or [0.0]
+    return {
+        "lag_p50_ms": percentile(lags, 50) * 1000,
+        "lag_p99_ms": percentile(lags, 99) * 1000,
+        "lag_max_ms": max(lags) * 1000,
+        "logins_per_second": (logins - rejected) / elapsed,
+        "rejected": rejected,
+    }
+
+
+async def main(args):
+    """Run the benchmark and report its results."""
+    hashed_password = password_helper.hash(PASSWORD)
+    strategies = {"inline": inline_login(hashed_password)}
+    hashers = []
+    for executor_type in ("thread", "process"):
+        hasher = PasswordHasher(
+            executor_type=executor_type,
+            max_workers=args.workers,
+            max_pending=args.max_pending,
+        )
+        hashers.append(hasher)
+        strategies[executor_type] = executor_login(hasher, hashed_password)
+
+    report = {}
+    for name, login in strategies.items():
+        report[name] = await storm(
+            login, args.logins, args.concurrency, args.interval
+        )
+        print(  # noqa: T201
+            f"{name:>8} | lag p50 {report[name]['lag_p50_ms']:>8.2f} ms "
+            f"p99 {report[name]['lag_p99_ms']:>8.2f} ms "
+            f"max {report[name]['lag_max_ms']:>8.2f} ms | "
+            f"{report[name]['logins_per_second']:>7.1f} logins/s | "
+            f"{report[name]['rejected']:>4} rejected"
+        )
+
+    for hasher in hashers:
+        hasher.shutdown()
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--interval", type=float, default=0.005)
+    parser.add_argument("--output", help="Write the results as JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,263 @@
+r"""Load test of the HTTP API against a real database.
+
+Usage:
+    python -m tests.benchmarks.load --users 20 --requests 500 \
+        --concurrency 20 --output bench.json
+
+The schema is recreated in the benchmark database (``TEST_DATABASE_URI``
+unless ``--database-uri`` is given), users, products and cart lines are
+seeded through the repositories, and every scenario drives the real
+routers in-process, through the connection pool of the application.
+For each endpoint the report holds the p50, p95 and p99 latency, the
+throughput and the number of SQL statements per request, as JSON that
+can be diffed between releases.
+
+The database must be PostgreSQL: the cart relies on ``ON CONFLICT``
+upserts and on the ``cart_summary`` trigger, which SQLite lacks. A
+throwaway container is enough::
+
+    docker run --rm -p 5433:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+from fastapi_users.password import PasswordHelper
+from httpx import AsyncClient
+
+from app.main import app
+from app.settings import config
+from app.utils.unitofwork import UnitOfWork
+from tests.benchmarks.utils import (
+    QueryCounter,
+    create_benchmark_engine,
+    percentile,
+    reset_schema,
+    write_report,
+)
+
+PASSWORD = "Q1!benchmark"
+
+
+async def seed(users_count, products_count, cart_lines):
+    """Seed users, products and cart lines through the repositories.
+
+    Args:
+        users_count (int): The number of users.
+        products_count (int): The number of products of each user.
+        cart_lines (int): The number of cart lines of each user.
+
+    Returns:
+        list: The email and product IDs of every user.
+    """
+    hashed_password = PasswordHelper().hash(PASSWORD)
+    seeded = []
+    for number in range(users_count):
+        uow = UnitOfWork()
+        async with uow:
+            email = f"bench{number}@example.com"
+            user_id = await uow.users.add(
+                {
+                    "email": email,
+                    "hashed_password": hashed_password,
+                    "telephone": f"+7{number:010d}",
+                    "is_active": True,
+                    "is_superuser": False,
+                    "is_verified": True,
+                }
+            )
+            prices = [
+                round(random.uniform(1, 1000), 2)
+                for _ in range(products_count)
+            ]
+            product_ids = await uow.products.add_many(
+                [
+                    {
+                        "name": f"Product {index}",
+                        "description": "Benchmark product",
+                        "price": price,
+                        "owner_id": user_id,
+                        "is_active": True,
+                    }
+                    for index, price in enumerate(prices)
+                ]
+            )
+            await uow.cart.add_many(
+                [
+                    {
+                        "product_id": product_id,
+                        "quantity": 1,
+                        "price": price,
+                        "owner_id": user_id,
+                    }
+                    for product_id, price in zip(
+                        product_ids[:cart_lines], prices
+                    )
+                ]
+            )
+            await uow.commit()
+        seeded.append((email, product_ids))
+    return seeded
+
+
+async def login(client: AsyncClient, email: str) -> dict:
+    """Log a user in and get its authentication cookies.
+
+    Args:
+        client (AsyncClient): The HTTP client.
+        email (str): The email of the user.
+
+    Returns:
+        dict: The cookies of the session.
+    """
+    response = await client.post(
+        "/api/v1/jwt/login", data={"username": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return dict(response.cookies)
+
+
+def scenarios(seeded, sessions):
+    """Build the request factories of every benchmarked endpoint.
+
+    Args:
+        seeded (list): The email and product IDs of every user.
+        sessions (list): The cookies and product IDs of every user.
+
+    Returns:
+        dict: Endpoint names mapped to functions returning the
+            arguments of ``AsyncClient.request``.
+    """
+
+    def pick():
+        return random.choice(sessions)
+
+    def login_request():
+        email, _ = random.choice(seeded)
+        return (
+            "POST",
+            "/api/v1/jwt/login",
+            None,
+            {"data": {"username": email, "password": PASSWORD}},
+        )
+
+    def product_detail():
+        cookies, product_ids = pick()
+        return "GET", f"/products/{random.choice(product_ids)}", cookies, {}
+
+    def cart_increment():
+        cookies, product_ids = pick()
+        return (
+            "POST",
+            "/cart/?increment=true",
+            cookies,
+            {"json": {"product_id": random.choice(product_ids)}},
+        )
+
+    def simple(method, url):
+        def factory():
+            return method, url, pick()[0], {}
+
+        return factory
+
+    return {
+        "POST /api/v1/jwt/login": login_request,
+        "GET /products/": simple("GET", "/products/"),
+        "GET /products/{id}": product_detail,
+        "GET /cart/get_all/": simple("GET", "/cart/get_all/"),
+        "GET /cart/get_all/?expand=product": simple(
+            "GET", "/cart/get_all/?expand=product"
+        ),
+        "GET /cart/total_price/": simple("GET", "/cart/total_price/"),
+        "POST /cart/?increment=true": cart_increment,
+    }
+
+
+async def run_scenario(client, engine, factory, requests, concurrency):
+    """Send ``requests`` requests with ``concurrency`` workers.
+
+    Returns:
+        dict: The latency percentiles, throughput, error count and
+            statements per request of the scenario.
+    """
+    latencies = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < requests:
+            method, url, cookies, kwargs = factory()
+            started = time.perf_counter()
+            response = await client.request(
+                method, url, cookies=cookies, **kwargs
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": len(latencies) / elapsed,
+        "queries_per_request": counter.count / len(latencies),
+    }
+
+
+async def main(args):
+    """Run the benchmark and report its results."""
+    random.seed(args.seed)
+    engine = create_benchmark_engine(args.database_uri, pooled=True)
+    await reset_schema(engine)
+    seeded = await seed(args.users, args.products, args.cart_lines)
+
+    report = {"parameters": vars(args).copy(), "endpoints": {}}
+    report["parameters"].pop("database_uri")
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        sessions = [
+            (await login(client, email), product_ids)
+            for email, product_ids in seeded
+        ]
+        for name, factory in scenarios(seeded, sessions).items():
+            report["endpoints"][name] = await run_scenario(
+                client, engine, factory, args.requests, args.concurrency
+            )
+
+    await engine.dispose()
+    for name, stats in report["endpoints"].items():
+        print(  # noqa: T201
+            f"{name:<36} p50 {stats['p50_ms']:>8.2f} ms "
+            f"p95 {stats['p95_ms']:>8.2f} ms "
+            f"p99 {stats['p99_ms']:>8.2f} ms "
+            f"{stats['throughput_rps']:>8.1f} req/s "
+            f"{stats['queries_per_request']:>5.1f} queries/req "
+            f"{stats['errors']} errors"
+        )
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--cart-lines", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-uri", default=config.TEST_DATABASE_URI)
+    parser.add_argument("--output", help="Write the results as JSON")
+    asyncio.run(main(parser.parse_args()))
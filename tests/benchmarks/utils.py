@@ -0,0 +1,99 @@
+"""Shared helpers for the benchmark scripts."""
+
+import json
+import math
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db import Base
+from app.db.db import async_session_maker, get_engine_options
+from app.settings import config
+
+
+class QueryCounter:
+    """Count the SQL statements executed through an engine.
+
+    Args:
+        engine (AsyncEngine): The engine to listen on.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        """Start counting the statements."""
+        event.listen(
+            self.engine.sync_engine, "before_cursor_execute", self._on_execute
+        )
+        return self
+
+    def __exit__(self, *args):
+        """Stop counting the statements."""
+        event.remove(
+            self.engine.sync_engine, "before_cursor_execute", self._on_execute
+        )
+
+
+def create_benchmark_engine(
+    database_uri: str, pooled: bool = False
+) -> AsyncEngine:
+    """Create an engine and bind the application session factory to it.
+
+    Args:
+        database_uri (str): The URI of the benchmark database.
+        pooled (bool): Use the connection pool of the application
+            instead of opening a connection per session.
+
+    Returns:
+        AsyncEngine: The benchmark engine.
+    """
+    options = get_engine_options(config) if pooled else {}
+    engine = create_async_engine(
+        database_uri, **{"poolclass": NullPool, **options}
+    )
+    async_session_maker.configure(bind=engine)
+    return engine
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    """Drop and recreate all tables of the application.
+
+    Args:
+        engine (AsyncEngine): The benchmark engine.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Get the percentile of a list of values (nearest rank).
+
+    Args:
+        values (List[float]): The measured values.
+        pct (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The value at the given percentile.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def write_report(report: dict, output: str) -> None:
+    """Write a benchmark report as JSON.
+
+    Args:
+        report (dict): The benchmark results.
+        output (str): The destination path.
+    """
+    Path(output).write_text(json.dumps(report, indent=2, sort_keys=True))
@@ -0,0 +1,99 @@
+"""Tests for the cache backends."""
+
+from fakeredis import aioredis
+
+from app.schemas.products import ProductRead
+from app.utils.cache import LRUCache, RedisCache
+
+PRODUCT = ProductRead(
+    id=1,
+    name="Cached product",
+    description="Some description",
+    price=10.0,
+    owner_id=1,
+    is_active=True,
+    created_at="2023-11-17T12:00:00+04:00",
+    updated_at="2023-11-17T12:00:00+04:00",
+)
+
+
+class TestLRUCache:
+    @staticmethod
+    async def test_hit_and_miss():
+        """Test that the counters follow the lookups."""
+        cache = LRUCache(maxsize=10, ttl=60)
+
+        assert await cache.get("1:1") is None
+        await cache.set("1:1", PRODUCT)
+        assert await cache.get("1:1") == PRODUCT
+        await cache.delete("1:1")
+        assert await cache.get("1:1") is None
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    @staticmethod
+    async def test_evicts_least_recently_used():
+        """Test that the size bound evicts the oldest entry."""
+        cache = LRUCache(maxsize=2, ttl=60)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    @staticmethod
+    async def test_expires_entries():
+        """Test that entries are dropped once their TTL has passed."""
+        cache = LRUCache(maxsize=10, ttl=0)
+        await cache.set("a", 1)
+
+        assert await cache.get("a") is None
+
+    @staticmethod
+    async def test_fill_after_invalidation_is_skipped():
+        """Test that a value read before a deletion is not stored."""
+        cache = LRUCache(maxsize=10, ttl=60)
+
+        version = await cache.version()
+        await cache.delete("1:1")
+        assert not await cache.set_if_unchanged("1:1", PRODUCT, version)
+        assert await cache.get("1:1") is None
+
+        version = await cache.version()
+        assert await cache.set_if_unchanged("1:1", PRODUCT, version)
+        assert await cache.get("1:1") == PRODUCT
+
+
+class TestRedisCache:
+    @staticmethod
+    async def test_shared_backend():
+        """Test that a deletion is seen by every process sharing Redis."""
+        client = aioredis.FakeRedis()
+        writer = RedisCache(client, ProductRead, ttl=60, prefix="test")
+        reader = RedisCache(client, ProductRead, ttl=60, prefix="test")
+        await writer.set("1:1", PRODUCT)
+
+        assert await reader.get("1:1") == PRODUCT
+
+        await writer.delete("1:1")
+        assert await reader.get("1:1") is None
+
+    @staticmethod
+    async def test_fill_after_invalidation_is_skipped():
+        """Test that a value read before a deletion is not stored."""
+        client = aioredis.FakeRedis()
+        writer = RedisCache(client, ProductRead, ttl=60, prefix="test")
+        reader = RedisCache(client, ProductRead, ttl=60, prefix="test")
+
+        version = await reader.version()
+        await writer.delete("1:1")
+        assert not await reader.set_if_unchanged("1:1", PRODUCT, version)
+        assert await reader.get("1:1") is None
+
+        version = await reader.version()
+        assert await reader.set_if_unchanged("1:1", PRODUCT, version)
+        assert await writer.get("1:1") == PRODUCT
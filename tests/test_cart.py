@@ -1,9 +1,49 @@
 """Tests for the cart endpoints."""
 
+import asyncio
+
+import pytest
 from httpx import AsyncClient
+from sqlalchemy import text, update
 from starlette import status
 
-from tests.conftest import login_user
+from app.models import Product, User
+from app.repositories.products import ProductsRepository
+from app.schemas.products import ProductRead
+from app.utils.cache import LRUCache
+from tests.conftest import engine_test, login_user
+
+
+async def during_price_change(product_id: int, price: float, request):
+    """Send a request while a price change holds its product locked.
+
+    The change is committed once the request waits for the lock, or
+    has completed without waiting.
+
+    Args:
+        product_id (int): The ID of the product.
+        price (float): The new price of the product.
+        request: The coroutine sending the request.
+
+    Returns:
+        The response to the request.
+    """
+    waiting = text(
+        "SELECT count(*) FROM pg_stat_activity "
+        "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+    )
+    async with engine_test.connect() as connection:
+        await connection.execute(
+            update(Product).where(Product.id == product_id).values(price=price)
+        )
+        task = asyncio.ensure_future(request)
+        async with engine_test.connect() as monitor:
+            for _ in range(100):
+                if task.done() or (await monitor.execute(waiting)).scalar():
+                    break
+                await asyncio.sleep(0.05)
+        await connection.commit()
+    return await task
 
 
 class TestCart:
@@ -64,3 +104,486 @@ class TestCart:
         )
 
         assert response.status_code == status.HTTP_200_OK
+
+    @staticmethod
+    async def test_add_many_to_cart(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test adding several products to the cart in one request.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product_ids = []
+        for number in range(3):
+            product = await ac.post(
+                "/products/",
+                json={
+                    "name": f"Bulk product {number}",
+                    "description": "Some description",
+                    "price": 100,
+                },
+                headers=headers,
+            )
+            product_ids.append(int(product.text))
+
+        response = await ac.post(
+            "/cart/",
+            json=[
+                {"product_id": product_id, "quantity": 2}
+                for product_id in product_ids
+            ],
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == product_ids
+
+        response = await ac.post(
+            "/cart/",
+            json=[{"product_id": product_ids[0], "quantity": 1}],
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    @staticmethod
+    async def test_add_to_cart_increment(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test adding a product twice with the increment mode.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Incremented product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+
+        for _ in range(2):
+            response = await ac.post(
+                "/cart/?increment=true",
+                json={"product_id": product_id, "quantity": 2},
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        response = await ac.get(f"/cart/{product_id}", headers=headers)
+
+        assert response.json()["quantity"] == 4
+        assert response.json()["price"] == 40
+
+    @staticmethod
+    async def test_get_total_price(register_user, login_user, ac: AsyncClient):
+        """Test that the cart summary matches the cart lines.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        lines = await ac.get("/cart/get_all/", headers=headers)
+        response = await ac.get("/cart/total_price/", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == pytest.approx(
+            sum(line["price"] for line in lines.json())
+        )
+
+    @staticmethod
+    async def test_get_all_expanded(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test retrieving the cart with its products in one request.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        response = await ac.get(
+            "/cart/get_all/",
+            params={"expand": "product"},
+            headers={
+                "Content-Type": "application/json",
+                "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+            },
+        )
+        cart = response.json()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert cart["total_price"] == pytest.approx(
+            sum(item["price"] for item in cart["items"])
+        )
+        for item in cart["items"]:
+            assert item["product"]["id"] == item["product_id"]
+
+    @staticmethod
+    async def test_get_all_conditional(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that an unchanged cart is answered with 304.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        response = await ac.get("/cart/get_all/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+
+        response = await ac.get(
+            "/cart/get_all/", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Conditional product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        await ac.post(
+            "/cart/",
+            json={"product_id": int(product.text), "quantity": 1},
+            headers=headers,
+        )
+
+        response = await ac.get(
+            "/cart/get_all/", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    @staticmethod
+    async def test_batch_update_and_delete(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test changing and removing several cart lines in one request.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product_ids = []
+        for number in range(2):
+            product = await ac.post(
+                "/products/",
+                json={
+                    "name": f"Batch product {number}",
+                    "description": "Some description",
+                    "price": 5,
+                },
+                headers=headers,
+            )
+            product_ids.append(int(product.text))
+        await ac.post(
+            "/cart/",
+            json=[
+                {"product_id": product_id, "quantity": 1}
+                for product_id in product_ids
+            ],
+            headers=headers,
+        )
+        missing_id = max(product_ids) + 1000
+
+        response = await ac.patch(
+            "/cart/",
+            json=[
+                {"product_id": product_ids[0], "quantity": 3},
+                {"product_id": product_ids[1], "quantity": 4},
+                {"product_id": missing_id, "quantity": 1},
+            ],
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"product_id": product_ids[0], "status": "updated"},
+            {"product_id": product_ids[1], "status": "updated"},
+            {"product_id": missing_id, "status": "not_found"},
+        ]
+        line = await ac.get(f"/cart/{product_ids[1]}", headers=headers)
+        assert line.json()["quantity"] == 4
+        assert line.json()["price"] == 20
+
+        response = await ac.delete(
+            "/cart/",
+            params={"product_ids": [product_ids[0], missing_id]},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"product_id": product_ids[0], "status": "deleted"},
+            {"product_id": missing_id, "status": "not_found"},
+        ]
+        line = await ac.get(f"/cart/{product_ids[0]}", headers=headers)
+        assert line.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await ac.delete("/cart/", headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @staticmethod
+    async def test_batch_rejects_duplicates(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that batch changes naming a product twice are rejected.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Duplicated product",
+                "description": "Some description",
+                "price": 5,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 1},
+            headers=headers,
+        )
+
+        response = await ac.patch(
+            "/cart/",
+            json=[
+                {"product_id": product_id, "quantity": 2},
+                {"product_id": product_id, "quantity": 3},
+            ],
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await ac.delete(
+            "/cart/",
+            params={"product_ids": [product_id, product_id]},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["quantity"] == 1
+
+    @staticmethod
+    async def test_add_to_cart_ignores_cached_price(
+        register_user, login_user, ac: AsyncClient, monkeypatch
+    ):
+        """Test that a new cart line is priced from the database.
+
+        A stale product is cached, as another process would still hold
+        it after a price change.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+            monkeypatch: The pytest monkeypatch fixture.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Repriced product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        response = await ac.get(f"/products/{product_id}", headers=headers)
+        stale = ProductRead(**response.json()).model_copy(update={"price": 1})
+        cache = LRUCache(maxsize=10, ttl=60)
+        await cache.set(
+            ProductsRepository.cache_key(product_id, User(id=stale.owner_id)),
+            stale,
+        )
+        monkeypatch.setattr(ProductsRepository, "cache", cache)
+
+        response = await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 3},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = await ac.get(f"/cart/{product_id}", headers=headers)
+
+        assert response.json()["price"] == 30
+
+    @staticmethod
+    async def test_add_to_cart_increment_empty(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test adding an empty list of products with the increment mode.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        response = await ac.post(
+            "/cart/?increment=true",
+            json=[],
+            headers={
+                "Content-Type": "application/json",
+                "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == []
+
+    @staticmethod
+    async def test_increment_during_price_change(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that an increment racing a price change gets the new price.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Raced increment",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 1},
+            headers=headers,
+        )
+
+        response = await during_price_change(
+            product_id,
+            20,
+            ac.post(
+                "/cart/?increment=true",
+                json={"product_id": product_id, "quantity": 2},
+                headers=headers,
+            ),
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["quantity"] == 3
+        assert line.json()["price"] == 60
+
+    @staticmethod
+    async def test_batch_update_during_price_change(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that a batch update racing a price change gets the new
+        price.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Raced update",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 1},
+            headers=headers,
+        )
+
+        response = await during_price_change(
+            product_id,
+            20,
+            ac.patch(
+                "/cart/",
+                json=[{"product_id": product_id, "quantity": 4}],
+                headers=headers,
+            ),
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["quantity"] == 4
+        assert line.json()["price"] == 80
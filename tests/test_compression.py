@@ -0,0 +1,117 @@
+"""Tests for the response compression middleware."""
+
+import gzip
+
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.utils.compression import (
+    CompressionMiddleware,
+    available_encodings,
+    negotiate,
+)
+
+BODY = b'{"items": []}' * 200
+
+
+async def large(request):
+    """Send a large JSON body with a strong ETag."""
+    return Response(BODY, headers={"ETag": '"abc"'})
+
+
+async def small(request):
+    """Send a body below the minimum size."""
+    return Response(b"{}")
+
+
+async def streamed(request):
+    """Stream NDJSON lines."""
+
+    async def lines():
+        for number in range(100):
+            yield b'{"id": %d}\n' % number
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def make_client() -> AsyncClient:
+    """Build a client of an application compressing with gzip."""
+    application = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/streamed", streamed),
+        ]
+    )
+    application.add_middleware(
+        CompressionMiddleware,
+        encodings=available_encodings(["gzip"], {"gzip": 6}),
+        minimum_size=1024,
+    )
+    return AsyncClient(app=application, base_url="http://test")
+
+
+class TestCompression:
+    @staticmethod
+    def test_negotiate():
+        """Test that the preferred encoding accepted by the client wins."""
+        supported = ["br", "gzip"]
+
+        assert negotiate("gzip, br", supported) == "br"
+        assert negotiate("gzip, br;q=0", supported) == "gzip"
+        assert negotiate("*", supported) == "br"
+        assert negotiate("identity", supported) is None
+        assert negotiate("", supported) is None
+
+    @staticmethod
+    async def test_compresses_large_body():
+        """Test that a large body is gzipped and its ETag weakened."""
+        async with make_client() as client:
+            response = await client.get(
+                "/large", headers={"Accept-Encoding": "gzip"}
+            )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.content == BODY
+
+    @staticmethod
+    async def test_skips_small_body():
+        """Test that bodies below the minimum size are sent as is."""
+        async with make_client() as client:
+            response = await client.get(
+                "/small", headers={"Accept-Encoding": "gzip"}
+            )
+
+        assert "content-encoding" not in response.headers
+        assert response.content == b"{}"
+
+    @staticmethod
+    async def test_identity():
+        """Test that clients not accepting gzip get the identity body."""
+        async with make_client() as client:
+            response = await client.get(
+                "/large", headers={"Accept-Encoding": "identity"}
+            )
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+        assert response.content == BODY
+
+    @staticmethod
+    async def test_compresses_stream():
+        """Test that a streamed body is compressed as it is sent."""
+        async with make_client() as client, client.stream(
+            "GET", "/streamed", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = gzip.decompress(raw).splitlines()
+        assert len(lines) == 100
+        assert lines[-1] == b'{"id": 99}'
@@ -0,0 +1,75 @@
+"""Tests for the database engine configuration."""
+
+from unittest.mock import MagicMock
+
+from sqlalchemy import text
+
+from app.db.db import InstrumentedQueuePool, get_engine_options
+from app.settings.config import ProductionConfig, TestingConfig
+from app.utils.unitofwork import UnitOfWork
+from tests.conftest import async_session_maker
+
+
+class TestEngineOptions:
+    @staticmethod
+    def test_pool_options_follow_config():
+        """Test that the pool is sized from the configuration class."""
+        options = get_engine_options(ProductionConfig)
+
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == ProductionConfig.DB_POOL_SIZE
+        assert options["max_overflow"] == ProductionConfig.DB_MAX_OVERFLOW
+        assert options["pool_timeout"] == ProductionConfig.DB_POOL_TIMEOUT
+        assert options["connect_args"]["server_settings"] == (
+            ProductionConfig.DB_SERVER_SETTINGS
+        )
+
+    @staticmethod
+    def test_testing_pool_is_small():
+        """Test that the testing pool fails fast when exhausted."""
+        options = get_engine_options(TestingConfig)
+        production = get_engine_options(ProductionConfig)
+
+        assert options["pool_size"] <= production["pool_size"]
+        assert options["pool_timeout"] <= production["pool_timeout"]
+
+
+class TestInstrumentedQueuePool:
+    @staticmethod
+    def test_records_checkouts():
+        """Test that checkouts are counted with their wait time."""
+        pool = InstrumentedQueuePool(
+            lambda: MagicMock(), pool_size=1, max_overflow=0
+        )
+
+        connection = pool.connect()
+
+        assert pool.checkedout() == 1
+        assert pool.checkouts == 1
+        assert pool.wait_time >= 0
+        connection.close()
+        assert pool.checkedout() == 0
+
+
+class TestUnitOfWork:
+    @staticmethod
+    async def test_shared_session_is_left_open():
+        """Test that a unit of work does not close a shared session."""
+        async with async_session_maker() as session:
+            uow = UnitOfWork(session=session)
+            async with uow:
+                await uow.session.execute(text("SELECT 1"))
+                assert session.in_transaction()
+
+            assert uow.session is session
+            assert not session.in_transaction()
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+
+    @staticmethod
+    async def test_own_session_is_closed():
+        """Test that a unit of work closes the session it opened."""
+        uow = UnitOfWork()
+        async with uow:
+            session = uow.session
+
+        assert uow.session is not session
@@ -0,0 +1,37 @@
+"""Tests for the password hashing executor."""
+
+import pytest
+from fastapi import HTTPException
+from starlette import status
+
+from app.utils.hashing import PasswordHasher
+
+
+class TestPasswordHasher:
+    @staticmethod
+    async def test_hash_and_verify():
+        """Test that a password hashed on the executor verifies."""
+        hasher = PasswordHasher("thread", max_workers=1, max_pending=4)
+
+        hashed_password = await hasher.hash("Passw0rd!")
+        verified, _ = await hasher.verify_and_update(
+            "Passw0rd!", hashed_password
+        )
+        rejected, _ = await hasher.verify_and_update("wrong", hashed_password)
+        hasher.shutdown()
+
+        assert verified is True
+        assert rejected is False
+        assert hasher.pending == 0
+
+    @staticmethod
+    async def test_rejects_when_saturated():
+        """Test that admission control answers 429 when saturated."""
+        hasher = PasswordHasher("thread", max_workers=1, max_pending=1)
+        hasher.pending = 1
+
+        with pytest.raises(HTTPException) as error:
+            await hasher.hash("Passw0rd!")
+
+        assert error.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert error.value.headers == {"Retry-After": "1"}
@@ -0,0 +1,140 @@
+"""Tests for the background job queue."""
+
+import asyncio
+
+from sqlalchemy import select
+
+from app.models import Job
+from app.models.jobs import JOB_FAILED, JOB_RUNNING
+from app.utils.jobs import JobRegistry, JobWorker, parse_queues
+from app.utils.unitofwork import UnitOfWork
+from tests.conftest import async_session_maker, engine_test
+
+registry = JobRegistry(max_attempts=2)
+recorded = []
+active = []
+max_active = []
+
+
+@registry.job("test.record")
+async def record(payload: dict) -> None:
+    """Record the value of the payload."""
+    recorded.append(payload["value"])
+
+
+@registry.job("test.fail", queue="failing")
+async def fail(payload: dict) -> None:
+    """Fail every attempt."""
+    raise RuntimeError("boom")
+
+
+@registry.job("test.slow", queue="slow")
+async def slow(payload: dict) -> None:
+    """Run for a while, tracking how many run at once."""
+    active.append(payload)
+    max_active.append(len(active))
+    await asyncio.sleep(0.05)
+    active.remove(payload)
+
+
+def make_worker(concurrency: dict) -> JobWorker:
+    """Build a worker of the test database retrying without delay."""
+    return JobWorker(
+        registry,
+        concurrency,
+        poll_interval=0.01,
+        retry_base_delay=0,
+        retry_max_delay=0,
+        bind=engine_test,
+    )
+
+
+async def enqueue(name: str, payload: dict, commit: bool = True) -> int:
+    """Enqueue a job in its own unit of work."""
+    async with UnitOfWork(bind=engine_test) as uow:
+        job_id = await registry.enqueue(uow, name, payload)
+        if commit:
+            await uow.commit()
+    return job_id
+
+
+class TestJobs:
+    @staticmethod
+    def test_parse_queues():
+        """Test that queues default to one job at a time."""
+        assert parse_queues("default:4, repricing") == {
+            "default": 4,
+            "repricing": 1,
+        }
+        assert parse_queues("") == {}
+
+    @staticmethod
+    async def test_job_follows_transaction():
+        """Test that a job only runs if its transaction commits."""
+        worker = make_worker({"default": 2})
+        recorded.clear()
+
+        await enqueue("test.record", {"value": "rolled back"}, commit=False)
+        assert await worker.run_pending("default") == 0
+
+        job_id = await enqueue("test.record", {"value": "committed"})
+        assert await worker.run_pending("default") == 1
+        assert recorded == ["committed"]
+        async with async_session_maker() as session:
+            assert await session.get(Job, job_id) is None
+
+    @staticmethod
+    async def test_failed_job_is_retried_then_failed():
+        """Test that a failing job is retried up to its attempts."""
+        worker = make_worker({"failing": 1})
+        job_id = await enqueue("test.fail", {})
+
+        assert await worker.run_pending("failing") == 2
+
+        assert worker.retried == 1
+        assert worker.failed == 1
+        async with async_session_maker() as session:
+            job = await session.get(Job, job_id)
+        assert job.status == JOB_FAILED
+        assert job.attempts == 2
+        assert job.last_error == "RuntimeError: boom"
+
+    @staticmethod
+    async def test_locked_jobs_are_skipped():
+        """Test that a job taken by a worker is skipped by the others."""
+        job_id = await enqueue("test.record", {"value": "locked"})
+
+        async with UnitOfWork(bind=engine_test) as first, UnitOfWork(
+            bind=engine_test
+        ) as second:
+            taken = await first.jobs.dequeue("default", 10, 60)
+            assert [job.id for job in taken] == [job_id]
+            assert await second.jobs.dequeue("default", 10, 60) == []
+            await first.rollback()
+            taken = await second.jobs.dequeue("default", 10, 60)
+            assert [job.id for job in taken] == [job_id]
+            await second.commit()
+
+        async with async_session_maker() as session:
+            job = await session.execute(
+                select(Job.attempts, Job.status).where(Job.id == job_id)
+            )
+        assert job.one() == (1, JOB_RUNNING)
+
+    @staticmethod
+    async def test_queue_concurrency_limit():
+        """Test that a queue runs no more jobs at once than its limit."""
+        worker = make_worker({"slow": 2})
+        max_active.clear()
+        for number in range(6):
+            await enqueue("test.slow", {"number": number})
+
+        await worker.start()
+        for _ in range(200):
+            if worker.succeeded == 6:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+
+        assert worker.succeeded == 6
+        assert max(max_active) == 2
@@ -0,0 +1,70 @@
+"""Tests for the SQL instrumentation and the metrics endpoint."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette import status
+
+from app.settings import config
+from app.utils.instrumentation import instrument_engine
+
+
+class TestMetrics:
+    @staticmethod
+    async def test_server_timing(register_user, login_user, ac: AsyncClient):
+        """Test that responses report their database time.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        response = await ac.get(
+            "/products/",
+            headers={
+                "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "db;dur=" in response.headers["Server-Timing"]
+
+    @staticmethod
+    async def test_metrics(ac: AsyncClient):
+        """Test that the metrics are aggregated per route.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        response = await ac.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'route="/products/"' in response.text
+        assert "unimart_db_statements_total" in response.text
+
+    @staticmethod
+    async def test_failed_statement_timing():
+        """Test that a failed statement leaves no start time behind.
+
+        Returns:
+            None
+        """
+        engine = create_async_engine(
+            config.TEST_DATABASE_URI, poolclass=NullPool
+        )
+        instrument_engine(engine, slow_query_threshold=60)
+        try:
+            async with engine.connect() as connection:
+                with pytest.raises(DBAPIError):
+                    await connection.execute(text("SELECT 1 / 0"))
+
+                assert not connection.info.get("query_started")
+        finally:
+            await engine.dispose()
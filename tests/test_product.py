@@ -1,8 +1,21 @@
 """Tests for the product endpoints."""
 
+import csv
+import io
+from datetime import timedelta
+
 from httpx import AsyncClient
 from starlette import status
 
+from app.models import User
+from app.repositories.products import ProductsRepository
+from app.schemas.products import ProductRead
+from app.services.repricing import REPRICING_QUEUE, cart_repricer
+from app.utils.cache import LRUCache
+from app.utils.conditional import make_etag
+from app.utils.jobs import JobWorker, job_registry
+from tests.conftest import engine_test
+
 
 class TestProducts:
     @staticmethod
@@ -35,3 +48,452 @@ class TestProducts:
         assert product_data["name"] == test_product["name"]
         assert product_data["description"] == test_product["description"]
         assert product_data["price"] == test_product["price"]
+
+    @staticmethod
+    async def test_get_products_pages(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test walking through the product list with the cursor.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        for number in range(3):
+            await ac.post(
+                "/products/",
+                json={
+                    "name": f"Paged product {number}",
+                    "description": "Some description",
+                    "price": 10,
+                },
+                headers=headers,
+            )
+
+        product_ids = []
+        params = {"limit": 2}
+        while True:
+            response = await ac.get(
+                "/products/", params=params, headers=headers
+            )
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert len(page["items"]) <= 2
+            product_ids.extend(item["id"] for item in page["items"])
+            if page["next_cursor"] is None:
+                break
+            params["after"] = page["next_cursor"]
+
+        assert len(product_ids) == len(set(product_ids))
+        assert len(product_ids) >= 3
+
+        response = await ac.get("/products/stream", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.text.splitlines()) == len(product_ids)
+
+    @staticmethod
+    async def test_import_products_ndjson(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test importing products with an invalid row from NDJSON.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        body = (
+            '{"name": "Imported 1", "description": "First", "price": 1}\n'
+            '{"name": "Imported 2", "description": "Second"}\n'
+            "not json\n"
+            '{"name": "Imported 3", "description": "Third", "price": 3}\n'
+        )
+
+        response = await ac.post(
+            "/products/import",
+            content=body.encode(),
+            headers={
+                "Content-Type": "application/x-ndjson",
+                "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["failed"] == 2
+        assert [error["line"] for error in result["errors"]] == [2, 3]
+
+    @staticmethod
+    async def test_import_products_csv(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test importing products from CSV with a multi-line field.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        body = (
+            "name,description,price\n"
+            'CSV product 1,"Two\nlines",10.5\n'
+            "CSV product 2,Plain,not a price\n"
+            "CSV product 3,Plain,7\n"
+        )
+
+        response = await ac.post(
+            "/products/import",
+            content=body.encode(),
+            headers={
+                "Content-Type": "text/csv",
+                "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["failed"] == 1
+        assert result["errors"][0]["line"] == 4
+
+    @staticmethod
+    async def test_export_products_csv(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test exporting the products as CSV.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        await ac.post(
+            "/products/",
+            json={
+                "name": "Exported product",
+                "description": "Some, description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+
+        response = await ac.get(
+            "/products/export", params={"format": "csv"}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert {"id", "name", "description", "price"} <= set(rows[0])
+        assert "Some, description" in [row["description"] for row in rows]
+
+    @staticmethod
+    async def test_search_products(register_user, login_user, ac: AsyncClient):
+        """Test the ranked prefix search of products.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        for name, description in (
+            ("Espresso machine", "Makes coffee"),
+            ("Coffee grinder", "Grinds espresso beans"),
+            ("Kettle", "Boils water"),
+        ):
+            await ac.post(
+                "/products/",
+                json={"name": name, "description": description, "price": 1},
+                headers=headers,
+            )
+
+        response = await ac.get(
+            "/products/search", params={"q": "espr"}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        names = [item["name"] for item in response.json()["items"]]
+        assert names == ["Espresso machine", "Coffee grinder"]
+
+    @staticmethod
+    async def test_get_products_filtered_and_sorted(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test listing products in a price range, most expensive first.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        for price in (5001, 5002, 5003, 9999):
+            await ac.post(
+                "/products/",
+                json={
+                    "name": f"Priced product {price}",
+                    "description": "Some description",
+                    "price": price,
+                },
+                headers=headers,
+            )
+
+        response = await ac.get(
+            "/products/",
+            params={
+                "price_min": 5000,
+                "price_max": 6000,
+                "sort": "-price",
+                "limit": 2,
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert [item["price"] for item in page["items"]] == [5003, 5002]
+
+        response = await ac.get(
+            "/products/",
+            params={
+                "price_min": 5000,
+                "price_max": 6000,
+                "sort": "-price",
+                "after": page["next_cursor"],
+            },
+            headers=headers,
+        )
+        assert [item["price"] for item in response.json()["items"]] == [5001]
+
+    @staticmethod
+    async def test_get_product_conditional(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test the validators of a single product.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Conditional product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        url = f"/products/{int(product.text)}"
+
+        response = await ac.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+
+        response = await ac.get(
+            url, headers={**headers, "If-None-Match": f"W/{etag}"}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = await ac.get(
+            url, headers={**headers, "If-Modified-Since": last_modified}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @staticmethod
+    async def test_get_product_ignores_stale_cache(
+        register_user, login_user, ac: AsyncClient, monkeypatch
+    ):
+        """Test that the validators of a product come from the database.
+
+        A stale product is cached, as another worker could still fill
+        it after a change.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+            monkeypatch: The pytest monkeypatch fixture.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Stale product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        url = f"/products/{product_id}"
+        response = await ac.get(url, headers=headers)
+        current = ProductRead(**response.json())
+        etag = response.headers["etag"]
+        stale = current.model_copy(
+            update={
+                "price": 1,
+                "updated_at": current.updated_at - timedelta(minutes=1),
+            }
+        )
+        cache = LRUCache(maxsize=10, ttl=60)
+        await cache.set(
+            ProductsRepository.cache_key(product_id, User(id=stale.owner_id)),
+            stale,
+        )
+        monkeypatch.setattr(ProductsRepository, "cache", cache)
+
+        response = await ac.get(
+            url,
+            headers={
+                **headers,
+                "If-None-Match": make_etag(product_id, stale.updated_at),
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] == etag
+        assert response.json()["price"] == 10
+
+        response = await ac.get(
+            url, headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @staticmethod
+    async def test_price_change_reprices_carts(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that a price change is carried to the cart lines.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Repriced product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 3},
+            headers=headers,
+        )
+
+        response = await ac.patch(
+            f"/products/{product_id}",
+            json={
+                "name": "Repriced product",
+                "description": "Some description",
+                "price": 12,
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["price"] == 36
+
+    @staticmethod
+    async def test_price_change_reprices_carts_in_batches(
+        register_user, login_user, ac: AsyncClient, monkeypatch
+    ):
+        """Test that a large fan-out is repriced by a job.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+            monkeypatch: Lowers the inline limit and the batch size.
+
+        Returns:
+            None
+        """
+        monkeypatch.setattr(cart_repricer, "inline_limit", 0)
+        monkeypatch.setattr(cart_repricer, "batch_size", 1)
+        monkeypatch.setattr(cart_repricer, "batch_pause", 0)
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": "unimartcookie=" + ac.cookies["unimartcookie"],
+        }
+        product = await ac.post(
+            "/products/",
+            json={
+                "name": "Batch repriced product",
+                "description": "Some description",
+                "price": 10,
+            },
+            headers=headers,
+        )
+        product_id = int(product.text)
+        await ac.post(
+            "/cart/",
+            json={"product_id": product_id, "quantity": 2},
+            headers=headers,
+        )
+        deferred_runs = cart_repricer.deferred_runs
+
+        await ac.patch(
+            f"/products/{product_id}",
+            json={
+                "name": "Batch repriced product",
+                "description": "Some description",
+                "price": 7,
+            },
+            headers=headers,
+        )
+
+        assert cart_repricer.deferred_runs == deferred_runs + 1
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["price"] == 20
+
+        worker = JobWorker(
+            job_registry, {REPRICING_QUEUE: 1}, bind=engine_test
+        )
+        assert await worker.run_pending(REPRICING_QUEUE) == 1
+        line = await ac.get(f"/cart/{product_id}", headers=headers)
+        assert line.json()["price"] == 14
@@ -0,0 +1,72 @@
+"""Query plan tests for the product listing indexes."""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.models import User
+from app.repositories.products import ProductsRepository
+from app.schemas.products import ProductFilter
+from tests.conftest import async_session_maker
+
+OWNER = User(id=1)
+
+
+async def explain(filters: ProductFilter) -> str:
+    """Get the plan of the listing query for the given filters.
+
+    Sequential scans are disabled, as the planner would rightly prefer
+    them on the small test tables. The parameters are inlined, as
+    ``EXPLAIN`` must precede the whole statement.
+
+    Args:
+        filters (ProductFilter): The filters and order of the listing.
+
+    Returns:
+        str: The text of the query plan.
+    """
+    async with async_session_maker() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        statement = ProductsRepository(session).page_statement(
+            OWNER, 50, filters=filters
+        )
+        compiled = statement.compile(
+            dialect=session.bind.dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        result = await session.execute(text(f"EXPLAIN {compiled}"))
+        return "\n".join(result.scalars().all())
+
+
+class TestProductListingPlans:
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("filters", "index"),
+        [
+            (
+                ProductFilter(is_active=True, sort="price"),
+                "ix_product_owner_id_is_active_price_id",
+            ),
+            (
+                ProductFilter(price_min=10, price_max=100, sort="-price"),
+                "ix_product_owner_id_price_id",
+            ),
+            (
+                ProductFilter(is_active=True, sort="-created_at"),
+                "ix_product_active_owner_id_created_at_id",
+            ),
+            (
+                ProductFilter(
+                    created_after=datetime(2023, 1, 1, tzinfo=timezone.utc)
+                ),
+                "ix_product_owner_id_created_at_id",
+            ),
+        ],
+    )
+    async def test_listing_uses_index(filters: ProductFilter, index: str):
+        """Test that each kind of listing is served by its index."""
+        plan = await explain(filters)
+
+        assert index in plan
+        assert "Seq Scan" not in plan
@@ -0,0 +1,39 @@
+"""Tests for the fast JSON serialization of rows."""
+
+import json
+from datetime import datetime, timezone
+
+from app.schemas.products import ProductPage, ProductRead
+from app.utils.serialization import dumps, rows_to_dicts
+
+ROW = (
+    1,
+    "Product",
+    "Some description",
+    10.5,
+    1,
+    True,
+    datetime(2023, 11, 17, 8, 0, 0, 123456, tzinfo=timezone.utc),
+    datetime(2023, 11, 17, 8, 0, 0, tzinfo=timezone.utc),
+)
+
+
+class TestSerialization:
+    @staticmethod
+    def test_matches_pydantic_output():
+        """Test that rows serialize exactly as the response model."""
+        names = list(ProductRead.model_fields)
+        page = ProductPage(
+            items=[ProductRead(**dict(zip(names, ROW)))], next_cursor="abc"
+        )
+
+        content = dumps(
+            {"items": rows_to_dicts(names, [ROW]), "next_cursor": "abc"}
+        )
+
+        assert json.loads(content) == json.loads(page.model_dump_json())
+
+    @staticmethod
+    def test_ignores_extra_columns():
+        """Test that trailing columns without a name are dropped."""
+        assert rows_to_dicts(["id"], [(1, 0.5)]) == [{"id": 1}]
@@ -28,3 +28,30 @@ class TestUsers:
         )
 
         assert response.status_code == status.HTTP_200_OK
+
+    @staticmethod
+    async def test_update_current_user_invalidates_cache(
+        register_user, login_user, ac: AsyncClient
+    ):
+        """Test that an update is visible while the user is cached.
+
+        Args:
+            ac (AsyncClient): The asynchronous HTTP client.
+
+        Returns:
+            None
+        """
+        headers = {"Cookie": "unimartcookie=" + ac.cookies["unimartcookie"]}
+        response = await ac.get("/users/me", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await ac.patch(
+            "/users/me",
+            json={"first_name": "Renamed", "confirm_password": ""},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await ac.get("/users/me", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["first_name"] == "Renamed"